@@ -13,12 +13,14 @@
 #    under the License.
 
 import abc
+import contextlib
 import threading
 
 import six
 
 from taskflow import engines
 from taskflow import exceptions as excp
+from taskflow.persistence import base as p_base
 from taskflow.utils import lock_utils
 
 
@@ -93,6 +95,28 @@ class Conductor(object):
                                         backend=self._persistence,
                                         **self._engine_options)
 
+    def prune(self, older_than, states=p_base.FINISHED_STATES,
+              batch_size=p_base.PRUNE_BATCH_SIZE):
+        """Prunes the logbooks of flows that finished long ago.
+
+        Destroys (in bulk) the logbooks in the persistence backend of this
+        conductor that only contain flow details that are in one of the
+        given states and were last updated before the given time (see
+        :py:meth:`taskflow.persistence.base.Connection.prune`), returning
+        how many were destroyed. As a maintenance task this is typically
+        called periodically, for example::
+
+            worker = periodic.PeriodicWorker([
+                periodic.periodic(3600)(functools.partial(
+                    conductor.prune, datetime.timedelta(days=7))),
+            ])
+        """
+        if self._persistence is None:
+            return 0
+        with contextlib.closing(self._persistence.get_connection()) as conn:
+            return conn.prune(older_than, states=states,
+                              batch_size=batch_size)
+
     @lock_utils.locked
     def connect(self):
         """Ensures the jobboard is connected (noop if it is already)."""
@@ -17,10 +17,14 @@
 import functools
 
 from taskflow.engines.action_engine.actions import base
+from taskflow.engines.action_engine import executor as ex
+from taskflow import exceptions as exc
 from taskflow import logging
 from taskflow import states
 from taskflow import task as task_atom
 from taskflow.types import failure
+from taskflow.types import timing
+from taskflow.utils import async_utils
 
 LOG = logging.getLogger(__name__)
 
@@ -28,9 +32,14 @@ LOG = logging.getLogger(__name__)
 class TaskAction(base.Action):
     """An action that handles scheduling, state changes, ... of task atoms."""
 
-    def __init__(self, storage, notifier, walker_factory, task_executor):
+    def __init__(self, storage, notifier, walker_factory, task_executor,
+                 task_statistics=None, task_timeout=None):
         super(TaskAction, self).__init__(storage, notifier, walker_factory)
         self._task_executor = task_executor
+        self._task_statistics = task_statistics
+        if task_timeout is not None:
+            task_timeout = float(task_timeout)
+        self._task_timeout = task_timeout
 
     @staticmethod
     def handles(atom):
@@ -110,9 +119,13 @@ class TaskAction(base.Action):
         else:
             progress_callback = None
         task_uuid = self._storage.get_atom_uuid(task.name)
-        return self._task_executor.execute_task(
+        future = self._task_executor.execute_task(
             task, task_uuid, arguments,
             progress_callback=progress_callback)
+        if self._task_statistics is not None:
+            self._task_statistics.track(task, future, outcome=ex.EXECUTED)
+        self._start_deadline(task, future, ex.EXECUTED)
+        return future
 
     def complete_execution(self, task, result):
         if isinstance(result, failure.Failure):
@@ -138,6 +151,9 @@ class TaskAction(base.Action):
         future = self._task_executor.revert_task(
             task, task_uuid, arguments, task_result, failures,
             progress_callback=progress_callback)
+        if self._task_statistics is not None:
+            self._task_statistics.track(task, future, outcome=ex.REVERTED)
+        self._start_deadline(task, future, ex.REVERTED)
         return future
 
     def complete_reversion(self, task, result):
@@ -146,5 +162,41 @@ class TaskAction(base.Action):
         else:
             self.change_state(task, states.REVERTED, progress=1.0)
 
+    def _fetch_timeout(self, task):
+        if task.timeout is not None:
+            return task.timeout
+        return self._task_timeout
+
+    def _start_deadline(self, task, future, outcome):
+        timeout = self._fetch_timeout(task)
+        if timeout is not None and not future.done():
+            future.deadline = timing.StopWatch(duration=timeout).start()
+            future.outcome = outcome
+
+    def expire(self, future):
+        """Abandons a future whose deadline expired (returning a replacement).
+
+        The task executor is asked to stop running (or at least stop
+        reserving resources for) the task and a (done) future is returned
+        in its place whose result is a failure (wrapping a
+        :py:class:`~taskflow.exceptions.ExecutionTimeout`) so that the
+        timeout is handled like any other task failure (by reverting or
+        retrying).
+        """
+        task = future.atom
+        self._task_executor.abandon_task(future)
+        if future.outcome == ex.EXECUTED:
+            activity = 'executing'
+        else:
+            activity = 'reverting'
+        timeout_failure = failure.Failure.from_exception(
+            exc.ExecutionTimeout("Task '%s' did not finish %s within %s"
+                                 " seconds" % (task.name, activity,
+                                               self._fetch_timeout(task))))
+        expired = async_utils.make_completed_future((future.outcome,
+                                                     timeout_failure))
+        expired.atom = task
+        return expired
+
     def wait_for_any(self, fs, timeout):
         return self._task_executor.wait_for_any(fs, timeout)
@@ -25,6 +25,7 @@ import six
 from taskflow.engines.action_engine import compiler
 from taskflow.engines.action_engine import executor
 from taskflow.engines.action_engine import runtime
+from taskflow.engines.action_engine import statistics
 from taskflow.engines import base
 from taskflow import exceptions as exc
 from taskflow import states
@@ -69,6 +70,22 @@ class ActionEngine(base.Engine):
         self._lock = threading.RLock()
         self._state_lock = threading.RLock()
         self._storage_ensured = False
+        self._task_statistics = statistics.TaskStatistics()
+
+    def statistics(self):
+        """Returns a snapshot of the statistics gathered while running.
+
+        The returned dictionary has (under its ``tasks`` key) a dictionary
+        of the task class names that have ran (or reverted) and for each one
+        the number of its executions (and reversions) that are in flight
+        (and that finished) and summaries of the histograms of how long those
+        waited before starting (``waiting``, when the executor used knows
+        that) and how long they took to run (``executing`` and
+        ``reverting``); all durations are in seconds.
+        """
+        return {
+            'tasks': self._task_statistics.to_dict(),
+        }
 
     def suspend(self):
         if not self._compiled:
@@ -212,7 +229,10 @@ class ActionEngine(base.Engine):
         self._runtime = runtime.Runtime(self._compilation,
                                         self.storage,
                                         self.atom_notifier,
-                                        self._task_executor)
+                                        self._task_executor,
+                                        task_statistics=self._task_statistics,
+                                        task_timeout=self._options.get(
+                                            'task_timeout'))
         self._compiled = True
 
 
@@ -256,6 +276,9 @@ Type provided              Executor used
 |cf|._base.Executor        :class:`~.executor.ParallelThreadTaskExecutor`
 =========================  ===============================================
 
+    * ``executor``: a :class:`~.executor.TaskExecutor` object; it will be
+      used (as is) for scheduling tasks.
+
     * ``executor``: a string that will be used to select a :pep:`3148`
       compatible executor; it will be used for scheduling tasks. The following
       string are applicable (other unknown strings passed will cause a value
@@ -264,13 +287,22 @@ Type provided              Executor used
 ===========================  ===============================================
 String (case insensitive)    Executor used
 ===========================  ===============================================
+``asyncio``                  :class:`~.executor.ParallelAsyncioTaskExecutor`
+``autoscaling``              :class:`.ParallelAutoScalingThreadTaskExecutor`
 ``process``                  :class:`~.executor.ParallelProcessTaskExecutor`
 ``processes``                :class:`~.executor.ParallelProcessTaskExecutor`
+``routing``                  :class:`~.executor.RoutingTaskExecutor`
 ``thread``                   :class:`~.executor.ParallelThreadTaskExecutor`
 ``threaded``                 :class:`~.executor.ParallelThreadTaskExecutor`
 ``threads``                  :class:`~.executor.ParallelThreadTaskExecutor`
 ===========================  ===============================================
 
+    When the ``routing`` executor is used the ``executors`` option must be a
+    dictionary of names to executors (each of these can be any of the strings
+    or objects listed above) and the ``routes``, ``route_policy`` and
+    ``default_executor`` options decide which one of those each task is
+    routed to (see :class:`~.executor.RoutingTaskExecutor`).
+
     .. |cfp| replace:: concurrent.futures.process
     .. |cft| replace:: concurrent.futures.thread
     .. |cf| replace:: concurrent.futures
@@ -297,10 +329,16 @@ String (case insensitive)    Executor used
     # 'executor' option (a mixed case equivalent is allowed since the match
     # will be lower-cased before checking).
     _executor_str_matchers = [
+        _ExecutorTextMatch(frozenset(['asyncio']),
+                           executor.ParallelAsyncioTaskExecutor),
+        _ExecutorTextMatch(frozenset(['autoscaling']),
+                           executor.ParallelAutoScalingThreadTaskExecutor),
         _ExecutorTextMatch(frozenset(['processes', 'process']),
                            executor.ParallelProcessTaskExecutor),
         _ExecutorTextMatch(frozenset(['thread', 'threads', 'threaded']),
                            executor.ParallelThreadTaskExecutor),
+        _ExecutorTextMatch(frozenset(['routing']),
+                           executor.RoutingTaskExecutor),
     ]
 
     # Used when no executor is provided (either a string or object)...
@@ -319,6 +357,8 @@ String (case insensitive)    Executor used
         executor_cls = cls._default_executor_cls
         # Match the desired executor to a class that will work with it...
         desired_executor = options.get('executor')
+        if isinstance(desired_executor, executor.TaskExecutor):
+            return desired_executor
         if isinstance(desired_executor, six.string_types):
             matched_executor_cls = None
             for m in cls._executor_str_matchers:
@@ -358,4 +398,15 @@ String (case insensitive)    Executor used
                 kwargs[k] = options[k]
             except KeyError:
                 pass
+        if executor_cls is executor.RoutingTaskExecutor:
+            # Each executor routed to is matched (and made) just like the
+            # 'executor' option is (and using the same options).
+            routed_options = dict(options)
+            routed_options.pop('executors', None)
+            executors = {}
+            for name, routed_executor in six.iteritems(
+                    kwargs.get('executors', {})):
+                routed_options['executor'] = routed_executor
+                executors[name] = cls._fetch_task_executor(routed_options)
+            kwargs['executors'] = executors
         return executor_cls(**kwargs)
@@ -16,24 +16,35 @@
 
 import abc
 import collections
-from multiprocessing import managers
+import functools
+import itertools
+import mmap
+import multiprocessing
+from multiprocessing import connection as mp_connection
 import os
 import pickle
+import select
+import shutil
+import tempfile
+import threading
+import weakref
 
 from oslo_utils import excutils
 from oslo_utils import reflection
 from oslo_utils import timeutils
-from oslo_utils import uuidutils
 import six
-from six.moves import queue as compat_queue
 
+from taskflow import exceptions as exc
 from taskflow import logging
 from taskflow import task as task_atom
+from taskflow.types import cache
 from taskflow.types import failure
 from taskflow.types import futures
 from taskflow.types import notifier
 from taskflow.types import timing
 from taskflow.utils import async_utils
+from taskflow.utils import asyncio_utils as au
+from taskflow.utils import misc
 from taskflow.utils import threading_utils
 
 # Execution and reversion events.
@@ -48,15 +59,98 @@ try:
 except ImportError:
     pass
 _PICKLE_ERRORS = tuple(_PICKLE_ERRORS)
-_SEND_ERRORS = (IOError, EOFError)
+_SEND_ERRORS = (IOError, EOFError, OSError)
+_CONNECT_ERRORS = (IOError, EOFError, OSError,
+                   multiprocessing.AuthenticationError)
 _UPDATE_PROGRESS = task_atom.EVENT_UPDATE_PROGRESS
 
 # Message types/kind sent from worker/child processes...
 _KIND_COMPLETE_ME = 'complete_me'
 _KIND_EVENT = 'event'
+_KIND_FETCH_TEMPLATE = 'fetch_template'
 
 LOG = logging.getLogger(__name__)
 
+# Find a monotonic providing time (or fallback to using time.time()
+# which isn't *always* accurate but will suffice).
+_now = misc.find_monotonic(allow_time_time=True)
+
+# The connection (and the address it is connected to) that a worker/child
+# process uses to send messages back to the process that created it (and
+# the task templates it has fetched using that connection).
+_CHILD_CONNECTION = {}
+_CHILD_CONNECTION_LOCK = threading.Lock()
+
+# The channel of the work a worker/child process is currently running.
+_CURRENT_CHANNEL = {}
+
+# How many bytes of (pickled) task templates are kept by a process executor
+# (and by each worker process) when not provided.
+DEFAULT_TEMPLATE_CACHE_SIZE = 64 * 1024 * 1024
+
+# Process pools that are shared by (and outlive) process executors.
+_SHARED_POOLS = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def _wait_readable(connections, timeout):
+    wait = getattr(mp_connection, 'wait', None)
+    if wait is not None:
+        return wait(connections, timeout=timeout)
+    # Older pythons (that lack the above) get select instead (which only
+    # works on posix systems).
+    return select.select(connections, [], [], timeout)[0]
+
+
+class Timings(object):
+    """When a task execution (or reversion) was submitted, started and ended.
+
+    Task executors attach one of these (as the ``timings`` attribute) to the
+    futures they return; the ``started`` and ``finished`` times (in seconds,
+    from a monotonic clock when one is available) are filled in as the work
+    happens (they stay ``None`` if it never happened).
+    """
+
+    __slots__ = ('submitted', 'started', 'finished')
+
+    def __init__(self, submitted=None):
+        if submitted is None:
+            submitted = _now()
+        self.submitted = submitted
+        self.started = None
+        self.finished = None
+
+    @property
+    def waiting(self):
+        """Seconds spent waiting to start (or ``None`` if not started)."""
+        if self.started is None:
+            return None
+        return max(0.0, self.started - self.submitted)
+
+    @property
+    def running(self):
+        """Seconds spent running (or ``None`` if not finished)."""
+        if self.started is None or self.finished is None:
+            return None
+        return max(0.0, self.finished - self.started)
+
+
+class _TimedCall(object):
+    """Calls a function (recording when it started and finished)."""
+
+    __slots__ = ('_timings', '_func')
+
+    def __init__(self, timings, func):
+        self._timings = timings
+        self._func = func
+
+    def __call__(self, *args, **kwargs):
+        self._timings.started = _now()
+        try:
+            return self._func(*args, **kwargs)
+        finally:
+            self._timings.finished = _now()
+
 
 def _execute_task(task, arguments, progress_callback=None):
     with notifier.register_deregister(task.notifier,
@@ -93,21 +187,189 @@ def _revert_task(task, arguments, result, failures, progress_callback=None):
     return (REVERTED, result)
 
 
-class _ViewableSyncManager(managers.SyncManager):
-    """Manager that exposes its state as methods."""
+# The (pre, run, post) methods of a task called to get some outcome...
+_OUTCOME_METHODS = {
+    EXECUTED: ('pre_execute', 'execute', 'post_execute'),
+    REVERTED: ('pre_revert', 'revert', 'post_revert'),
+}
+
+
+def _start_coroutine_task(loop, fut, outcome, task, arguments,
+                          progress_callback=None, timings=None,
+                          coroutines=None):
+    # This is called in the event loops thread; it does what the above
+    # functions do, except that it does not wait for the coroutine to finish
+    # (the future is completed after it does).
+    if not fut.set_running_or_notify_cancel():
+        return
+    if timings is not None:
+        timings.started = _now()
+    (pre, run, post) = [getattr(task, name)
+                        for name in _OUTCOME_METHODS[outcome]]
+    if progress_callback is not None:
+        task.notifier.register(_UPDATE_PROGRESS, progress_callback)
+
+    def finish(result):
+        if timings is not None:
+            timings.finished = _now()
+        if coroutines is not None:
+            coroutines.pop(fut, None)
+        try:
+            post()
+        except Exception as e:
+            fut.set_exception(e)
+        else:
+            fut.set_result((outcome, result))
+        finally:
+            if progress_callback is not None:
+                task.notifier.deregister(_UPDATE_PROGRESS, progress_callback)
+
+    def on_done(coro_fut):
+        if coro_fut.cancelled():
+            result = failure.Failure.from_exception(
+                au.asyncio.CancelledError())
+        else:
+            try:
+                result = coro_fut.result()
+            except Exception:
+                result = failure.Failure()
+        finish(result)
+
+    try:
+        pre()
+        coro_fut = au.ensure_future(run(**arguments), loop=loop)
+    except Exception:
+        finish(failure.Failure())
+    else:
+        if coroutines is not None:
+            coroutines[fut] = coro_fut
+        coro_fut.add_done_callback(on_done)
+
+
+class _ChannelServer(object):
+    """Accepts the connections worker processes open back to this process.
+
+    Each worker process opens one connection (the first time it needs to
+    send a message) that it then keeps using for all its messages; these
+    connections are handed to the dispatcher which waits (without polling)
+    for any of them to become readable.
+    """
 
-    def is_shutdown(self):
-        return self._state.value == managers.State.SHUTDOWN
+    def __init__(self):
+        self.authkey = os.urandom(32)
+        if os.name == 'posix':
+            # Use our own directory (instead of the one multiprocessing
+            # would pick and then remember for the rest of this processes
+            # lifetime) so that it can be removed when closed.
+            self._path = tempfile.mkdtemp()
+            self._listener = mp_connection.Listener(
+                address=os.path.join(self._path, 'channel'),
+                family='AF_UNIX', authkey=self.authkey)
+        else:
+            self._path = None
+            self._listener = mp_connection.Listener(authkey=self.authkey)
+        self._accepted = []
+        self._lock = threading.Lock()
+        self._closed = False
+        (self.waker, self._wake_sender) = multiprocessing.Pipe(duplex=False)
+        self._acceptor = threading_utils.daemon_thread(self._accept)
+        self._acceptor.start()
 
-    def is_running(self):
-        return self._state.value == managers.State.STARTED
+    @property
+    def address(self):
+        return self._listener.address
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except _CONNECT_ERRORS:
+                if not self._closed:
+                    LOG.warn("Failed accepting a worker connection",
+                             exc_info=True)
+                continue
+            with self._lock:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._accepted.append(conn)
+            self.wake()
+
+    def fetch_accepted(self):
+        """Returns (and forgets) the connections accepted since last time."""
+        with self._lock:
+            accepted = self._accepted
+            self._accepted = []
+        return accepted
+
+    def wake(self):
+        """Wakes up whoever is waiting on the waker connection."""
+        self._wake_sender.send_bytes(b'x')
+
+    def drain(self):
+        """Clears the wake ups that have been sent so far."""
+        while self.waker.poll():
+            self.waker.recv_bytes()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            leftover = self._accepted
+            self._accepted = []
+        # Connect (and disconnect) once more so that the acceptor (which is
+        # likely blocked accepting) notices that it should stop...
+        try:
+            mp_connection.Client(self.address, authkey=self.authkey).close()
+        except _CONNECT_ERRORS:
+            pass
+        self._acceptor.join()
+        self._listener.close()
+        if self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+        for conn in leftover:
+            conn.close()
+        self._wake_sender.close()
+        self.waker.close()
+
+
+def _fetch_child_connection(address, authkey):
+    # Each child keeps one connection (to the last parent address it was
+    # asked to use) for all of its messages; it is opened lazily so that it
+    # is opened in the child process (and not where the channel was made).
+    pid = os.getpid()
+    child_conn = _CHILD_CONNECTION.get('connection')
+    if (child_conn is not None and
+            _CHILD_CONNECTION.get('pid') == pid and
+            _CHILD_CONNECTION.get('address') == address):
+        return child_conn
+    if child_conn is not None and _CHILD_CONNECTION.get('pid') == pid:
+        child_conn.close()
+    _CHILD_CONNECTION.clear()
+    child_conn = mp_connection.Client(address, authkey=authkey)
+    _CHILD_CONNECTION.update({
+        'pid': pid,
+        'address': address,
+        'connection': child_conn,
+        'templates': cache.LRUCache(DEFAULT_TEMPLATE_CACHE_SIZE),
+    })
+    return child_conn
+
+
+def _drop_child_connection(child_conn):
+    if _CHILD_CONNECTION.get('connection') is child_conn:
+        _CHILD_CONNECTION.clear()
+        try:
+            child_conn.close()
+        except _SEND_ERRORS:
+            pass
 
 
 class _Channel(object):
-    """Helper wrapper around a multiprocessing queue used by a worker."""
+    """Sends messages from a worker to the process that created it."""
 
-    def __init__(self, queue, identity):
-        self._queue = queue
+    def __init__(self, address, authkey, identity):
+        self._address = address
+        self._authkey = authkey
         self._identity = identity
         self._sent_messages = collections.defaultdict(int)
         self._pid = None
@@ -117,6 +379,37 @@ class _Channel(object):
         return self._sent_messages
 
     def put(self, message):
+        """Sends a message (returning whether it was sent)."""
+        return self._send(message)[0]
+
+    def request(self, message):
+        """Sends a message and waits for (and returns) the reply to it."""
+        return self._send(message, wait_for_reply=True)[1]
+
+    def fetch_template(self, key):
+        """Returns a new task made from the (cached) template with the key."""
+        blob = None
+        with _CHILD_CONNECTION_LOCK:
+            if (_CHILD_CONNECTION.get('pid') == os.getpid() and
+                    _CHILD_CONNECTION.get('address') == self._address):
+                blob = _CHILD_CONNECTION['templates'].get(key)
+        if blob is None:
+            blob = self.request({
+                'created_on': timeutils.utcnow(),
+                'kind': _KIND_FETCH_TEMPLATE,
+                'body': {
+                    'key': key,
+                },
+            })
+            if blob is None:
+                raise RuntimeError("Unable to fetch task template '%s'"
+                                   % key)
+            with _CHILD_CONNECTION_LOCK:
+                if _CHILD_CONNECTION.get('address') == self._address:
+                    _CHILD_CONNECTION['templates'].put(key, blob, len(blob))
+        return pickle.loads(blob)
+
+    def _send(self, message, wait_for_reply=False):
         # NOTE(harlowja): this is done in late in execution to ensure that this
         # happens in the child process and not the parent process (where the
         # constructor is called).
@@ -131,17 +424,34 @@ class _Channel(object):
         })
         if 'body' not in message:
             message['body'] = {}
-        try:
-            self._queue.put(message)
-        except _PICKLE_ERRORS:
-            LOG.warn("Failed serializing message %s", message, exc_info=True)
-            return False
-        except _SEND_ERRORS:
-            LOG.warn("Failed sending message %s", message, exc_info=True)
-            return False
-        else:
+        with _CHILD_CONNECTION_LOCK:
+            try:
+                child_conn = _fetch_child_connection(self._address,
+                                                     self._authkey)
+            except _CONNECT_ERRORS:
+                LOG.warn("Failed connecting to send message %s", message,
+                         exc_info=True)
+                return (False, None)
+            try:
+                child_conn.send(message)
+            except _PICKLE_ERRORS:
+                LOG.warn("Failed serializing message %s", message,
+                         exc_info=True)
+                return (False, None)
+            except _SEND_ERRORS:
+                LOG.warn("Failed sending message %s", message, exc_info=True)
+                _drop_child_connection(child_conn)
+                return (False, None)
             self._sent_messages[message['kind']] += 1
-            return True
+            if not wait_for_reply:
+                return (True, None)
+            try:
+                return (True, child_conn.recv())
+            except _SEND_ERRORS:
+                LOG.warn("Failed receiving reply to message %s", message,
+                         exc_info=True)
+                _drop_child_connection(child_conn)
+                return (True, None)
 
 
 class _WaitWorkItem(object):
@@ -158,10 +468,11 @@ class _WaitWorkItem(object):
     previously finished task...
     """
 
-    def __init__(self, channel, barrier,
-                 func, task, *args, **kwargs):
+    def __init__(self, channel, func, task, *args, **kwargs):
         self._channel = channel
-        self._barrier = barrier
+        # When set this is the directory and minimum size of the (bytes or
+        # bytearray) results that are sent back using shared buffers.
+        self.shared = None
         self._func = func
         self._task = task
         self._args = args
@@ -174,30 +485,172 @@ class _WaitWorkItem(object):
                 'created_on': timeutils.utcnow(),
                 'kind': _KIND_COMPLETE_ME,
             }
-            if self._channel.put(message):
-                watch = timing.StopWatch()
-                watch.start()
-                self._barrier.wait()
+            # The reply only arrives after all the messages sent before
+            # this one have been dispatched (they all share the same
+            # connection, which delivers messages in order).
+            watch = timing.StopWatch()
+            watch.start()
+            if self._channel.request(message):
                 LOG.blather("Waited %s seconds until task '%s' %s emitted"
                             " notifications were depleted", watch.elapsed(),
                             self._task, sent_events)
 
+    def _share_result(self, result):
+        if not isinstance(result, (six.binary_type, bytearray, memoryview)):
+            return result
+        (directory, threshold) = self.shared
+        shared = _SharedBuffer.create(directory, result, threshold)
+        if shared is not None:
+            return shared
+        if isinstance(result, memoryview):
+            # Likely one of the (shared) views this task was given, those
+            # can not be pickled (so send back a copy instead).
+            result = result.tobytes()
+        return result
+
     def __call__(self):
         args = self._args
         kwargs = self._kwargs
+        task = self._task
+        _CURRENT_CHANNEL['channel'] = self._channel
         try:
-            return self._func(self._task, *args, **kwargs)
+            if isinstance(task, _TaskTemplate):
+                task = self._channel.fetch_template(task.key)
+            if self.shared is not None:
+                args = _map_shareables(args, _open_shared)
+            started = _now()
+            (outcome, result) = self._func(task, *args, **kwargs)
+            elapsed = max(0.0, _now() - started)
+            if self.shared is not None:
+                result = self._share_result(result)
+            return (outcome, result, elapsed)
         finally:
+            _CURRENT_CHANNEL.clear()
             self._on_finish()
 
 
+class _SharedBuffer(object):
+    """A (large) buffer that is transferred using a shared (mmap-ed) file.
+
+    Instead of pickling the buffer (and copying it through a pipe) the
+    buffer is written once to a file (in a memory backed directory, when
+    one exists) that the receiving process then maps into its memory.
+    """
+
+    def __init__(self, path, size, format='B', shape=None, kind=None):
+        self.path = path
+        self.size = size
+        self.format = format
+        self.shape = shape
+        self.kind = kind
+
+    @classmethod
+    def create(cls, directory, value, threshold):
+        """Writes the value out if it is a large enough buffer.
+
+        Returns ``None`` when the value is not a (large enough) buffer.
+        """
+        try:
+            view = memoryview(value)
+        except TypeError:
+            return None
+        size = getattr(view, 'nbytes', None)
+        if size is None:
+            size = len(view) * view.itemsize
+        if size < max(1, threshold):
+            return None
+        if not getattr(view, 'contiguous', True):
+            view = memoryview(view.tobytes())
+        (fd, path) = tempfile.mkstemp(prefix='buffer-', dir=directory)
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(view)
+        return cls(path, size, format=view.format, shape=view.shape,
+                   kind=type(value).__name__)
+
+    def open(self):
+        """Returns a read-only view of the buffer (mapped into memory)."""
+        with open(self.path, 'rb') as fp:
+            mapped = mmap.mmap(fp.fileno(), self.size,
+                               access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if self.format != 'B' or (self.shape and len(self.shape) > 1):
+            try:
+                view = view.cast(self.format, self.shape)
+            except (AttributeError, TypeError, ValueError):
+                pass
+        return view
+
+    def read(self):
+        """Reads (and returns a copy of) the buffer."""
+        with open(self.path, 'rb') as fp:
+            data = fp.read()
+        if self.kind == 'bytearray':
+            return bytearray(data)
+        return data
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _open_shared(value):
+    if isinstance(value, _SharedBuffer):
+        return value.open()
+    return value
+
+
+def _map_shareables(args, functor):
+    # Only the top level positional arguments (and the values of the
+    # top level positional dictionary arguments, which is how the task
+    # arguments are passed) are considered.
+    mapped = []
+    for arg in args:
+        if isinstance(arg, dict):
+            arg = dict((k, functor(v)) for (k, v) in six.iteritems(arg))
+        else:
+            arg = functor(arg)
+        mapped.append(arg)
+    return tuple(mapped)
+
+
+def _shared_buffers_directory():
+    # Prefer a memory backed (tmpfs) location when one is around...
+    for candidate in ('/dev/shm',):
+        if os.path.isdir(candidate) and os.access(candidate, os.W_OK):
+            return tempfile.mkdtemp(prefix='taskflow-', dir=candidate)
+    return tempfile.mkdtemp(prefix='taskflow-')
+
+
+class _TaskTemplate(object):
+    """Refers to a pickled task that workers fetch (once) and then reuse.
+
+    Each time the task runs a new task is unpickled from the template (so
+    that each run still gets its own task object, just as if a copy of the
+    task had been sent).
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+
 class _EventSender(object):
-    """Sends event information from a child worker process to its creator."""
+    """Sends event information from a child worker process to its creator.
+
+    When no channel is given the channel of the work that is currently
+    running (in the child worker process) is used.
+    """
 
-    def __init__(self, channel):
+    def __init__(self, channel=None):
         self._channel = channel
 
     def __call__(self, event_type, details):
+        channel = self._channel
+        if channel is None:
+            channel = _CURRENT_CHANNEL.get('channel')
+            if channel is None:
+                return
         message = {
             'created_on': timeutils.utcnow(),
             'kind': _KIND_EVENT,
@@ -206,15 +659,14 @@ class _EventSender(object):
                 'details': details,
             },
         }
-        self._channel.put(message)
+        channel.put(message)
 
 
 class _Target(object):
     """An immutable helper object that represents a target of a message."""
 
-    def __init__(self, task, barrier, identity):
+    def __init__(self, task, identity):
         self.task = task
-        self.barrier = barrier
         self.identity = identity
         # Counters used to track how many message 'kinds' were proxied...
         self.dispatched = collections.defaultdict(int)
@@ -228,9 +680,10 @@ class _Target(object):
 class _Dispatcher(object):
     """Dispatches messages received from child worker processes."""
 
-    # When the run() method is busy (typically in a thread) we want to set
-    # these so that the thread can know how long to sleep when there is no
-    # active work to dispatch.
+    # When the run() method is busy (typically in a thread) this is the
+    # longest it will wait for messages before checking if it should stop
+    # (it is woken up earlier when new connections arrive or when it is
+    # interrupted).
     _SPIN_PERIODICITY = 0.01
 
     def __init__(self, dispatch_periodicity=None):
@@ -240,6 +693,7 @@ class _Dispatcher(object):
             raise ValueError("Provided dispatch periodicity must be greater"
                              " than zero and not '%s'" % dispatch_periodicity)
         self._targets = {}
+        self._templates = {}
         self._dead = threading_utils.Event()
         self._dispatch_periodicity = dispatch_periodicity
         self._stop_when_empty = False
@@ -247,14 +701,18 @@ class _Dispatcher(object):
     def register(self, identity, target):
         self._targets[identity] = target
 
+    def add_template(self, key, blob):
+        self._templates[key] = blob
+
+    def remove_template(self, key):
+        self._templates.pop(key, None)
+
     def deregister(self, identity):
         try:
             target = self._targets.pop(identity)
         except KeyError:
             pass
         else:
-            # Just incase set the barrier to unblock any worker...
-            target.barrier.set()
             if LOG.isEnabledFor(logging.BLATHER):
                 LOG.blather("Dispatched %s messages %s to target '%s' during"
                             " the lifetime of its existence in the dispatcher",
@@ -264,6 +722,7 @@ class _Dispatcher(object):
     def reset(self):
         self._stop_when_empty = False
         self._dead.clear()
+        self._templates.clear()
         if self._targets:
             leftover = set(six.iterkeys(self._targets))
             while leftover:
@@ -273,7 +732,16 @@ class _Dispatcher(object):
         self._stop_when_empty = True
         self._dead.set()
 
-    def _dispatch(self, message):
+    @staticmethod
+    def _reply(conn, reply):
+        if conn is None:
+            return
+        try:
+            conn.send(reply)
+        except _SEND_ERRORS:
+            LOG.warn("Failed sending reply %s", reply, exc_info=True)
+
+    def _dispatch(self, message, conn=None):
         if LOG.isEnabledFor(logging.BLATHER):
             LOG.blather("Dispatching message %s (it took %s seconds"
                         " for it to arrive for processing after being"
@@ -288,13 +756,18 @@ class _Dispatcher(object):
             LOG.warn("Badly formatted message %s received", message,
                      exc_info=True)
             return
+        if kind == _KIND_FETCH_TEMPLATE:
+            self._reply(conn, self._templates.get(body['key']))
+            return
         target = self._targets.get(sender['id'])
-        if target is None:
+        if kind == _KIND_COMPLETE_ME:
+            if target is not None:
+                target.dispatched[kind] += 1
+            # Always reply, so that the worker never waits forever...
+            self._reply(conn, True)
+        elif target is None:
             # Must of been removed...
             return
-        if kind == _KIND_COMPLETE_ME:
-            target.dispatched[kind] += 1
-            target.barrier.set()
         elif kind == _KIND_EVENT:
             task = target.task
             target.dispatched[kind] += 1
@@ -303,23 +776,49 @@ class _Dispatcher(object):
             LOG.warn("Unknown message '%s' found in message from sender"
                      " %s to target '%s'", kind, sender, target)
 
-    def run(self, queue):
-        watch = timing.StopWatch(duration=self._dispatch_periodicity)
-        while (not self._dead.is_set() or
-               (self._stop_when_empty and self._targets)):
-            watch.restart()
-            leftover = watch.leftover()
-            while leftover:
-                try:
-                    message = queue.get(timeout=leftover)
-                except compat_queue.Empty:
-                    break
-                else:
-                    self._dispatch(message)
-                    leftover = watch.leftover()
-            leftover = watch.leftover()
-            if leftover:
-                self._dead.wait(leftover)
+    def _receive(self, conn):
+        try:
+            message = conn.recv()
+        except (EOFError, IOError, OSError):
+            # The worker process went away (or closed its connection).
+            return False
+        except Exception:
+            LOG.warn("Failed receiving a message", exc_info=True)
+        else:
+            self._dispatch(message, conn=conn)
+        return True
+
+    def run(self, server):
+        connections = []
+        try:
+            while (not self._dead.is_set() or
+                   (self._stop_when_empty and self._targets)):
+                readable = _wait_readable([server.waker] + connections,
+                                          self._dispatch_periodicity)
+                for conn in readable:
+                    if conn is server.waker:
+                        server.drain()
+                        connections.extend(server.fetch_accepted())
+                    elif not self._receive(conn):
+                        connections.remove(conn)
+                        conn.close()
+        finally:
+            for conn in connections:
+                conn.close()
+
+
+def shutdown_shared_pools(wait=True):
+    """Shuts down the process pools shared by process executors.
+
+    The pools are recreated when process executors that share them are
+    started again (the ones that are running when this is called should be
+    stopped first).
+    """
+    with _SHARED_POOLS_LOCK:
+        pools = list(six.itervalues(_SHARED_POOLS))
+        _SHARED_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -334,7 +833,12 @@ class TaskExecutor(object):
     @abc.abstractmethod
     def execute_task(self, task, task_uuid, arguments,
                      progress_callback=None):
-        """Schedules task execution."""
+        """Schedules task execution.
+
+        The returned future has the task as its ``atom`` attribute and (when
+        this executor knows when the task started and finished running) a
+        :py:class:`.Timings` object as its ``timings`` attribute.
+        """
 
     @abc.abstractmethod
     def revert_task(self, task, task_uuid, arguments, result, failures,
@@ -345,6 +849,17 @@ class TaskExecutor(object):
         """Wait for futures returned by this executor to complete."""
         return async_utils.wait_for_any(fs, timeout=timeout)
 
+    def abandon_task(self, future):
+        """Stops (or stops reserving resources for) a task that is not done.
+
+        This is called with a future returned by this executor when the
+        engine stops waiting on it (for example when the task did not finish
+        before its deadline); the future may still complete afterwards (but
+        its result will be ignored). By default the future is cancelled
+        (which only works if the task has not started running).
+        """
+        future.cancel()
+
     def start(self):
         """Prepare to execute tasks."""
         pass
@@ -367,18 +882,22 @@ class SerialTaskExecutor(TaskExecutor):
         self._executor.shutdown()
 
     def execute_task(self, task, task_uuid, arguments, progress_callback=None):
-        fut = self._executor.submit(_execute_task,
+        timings = Timings()
+        fut = self._executor.submit(_TimedCall(timings, _execute_task),
                                     task, arguments,
                                     progress_callback=progress_callback)
         fut.atom = task
+        fut.timings = timings
         return fut
 
     def revert_task(self, task, task_uuid, arguments, result, failures,
                     progress_callback=None):
-        fut = self._executor.submit(_revert_task,
+        timings = Timings()
+        fut = self._executor.submit(_TimedCall(timings, _revert_task),
                                     task, arguments, result, failures,
                                     progress_callback=progress_callback)
         fut.atom = task
+        fut.timings = timings
         return fut
 
 
@@ -396,14 +915,19 @@ class ParallelTaskExecutor(TaskExecutor):
         self._executor = executor
         self._max_workers = max_workers
         self._own_executor = executor is None
+        # Futures that were abandoned while running (and are still running).
+        self._abandoned = set()
 
     @abc.abstractmethod
     def _create_executor(self, max_workers=None):
         """Called when an executor has not been provided to make one."""
 
     def _submit_task(self, func, task, *args, **kwargs):
-        fut = self._executor.submit(func, task, *args, **kwargs)
+        timings = Timings()
+        fut = self._executor.submit(_TimedCall(timings, func),
+                                    task, *args, **kwargs)
         fut.atom = task
+        fut.timings = timings
         return fut
 
     def execute_task(self, task, task_uuid, arguments, progress_callback=None):
@@ -415,6 +939,17 @@ class ParallelTaskExecutor(TaskExecutor):
         return self._submit_task(_revert_task, task, arguments, result,
                                  failures, progress_callback=progress_callback)
 
+    def abandon_task(self, future):
+        if future.cancel() or future.done():
+            return
+        # Pools that can not interrupt running work may still be able to
+        # stop counting it against how much work they can run at once.
+        abandon = getattr(self._executor, 'abandon', None)
+        if abandon is not None:
+            abandon(future)
+        self._abandoned.add(future)
+        future.add_done_callback(self._abandoned.discard)
+
     def start(self):
         if self._own_executor:
             if self._max_workers is not None:
@@ -425,16 +960,165 @@ class ParallelTaskExecutor(TaskExecutor):
 
     def stop(self):
         if self._own_executor:
-            self._executor.shutdown(wait=True)
+            self._destroy_executor(self._executor)
             self._executor = None
 
+    def _destroy_executor(self, executor):
+        """Called when an executor that was made is no longer needed."""
+        # Abandoned work may never finish, so do not wait on it...
+        executor.shutdown(wait=not self._abandoned)
+
 
 class ParallelThreadTaskExecutor(ParallelTaskExecutor):
-    """Executes tasks in parallel using a thread pool executor."""
+    """Executes tasks in parallel using a thread pool executor.
+
+    The thread pool this executor creates (when one is not provided) starts
+    threads as soon as work is waiting (up to ``max_workers`` of them) and
+    can stop counting the thread running an abandoned task against that
+    limit (see
+    :py:meth:`~taskflow.types.futures.AutoScalingThreadPoolExecutor.abandon`);
+    abandoned tasks keep using a worker of provided thread pools that can
+    not do this.
+    """
+
+    def _create_executor(self, max_workers=None):
+        # Never waits for the waiting work to be slow enough to start more
+        # threads (like a standard thread pool executor).
+        return futures.AutoScalingThreadPoolExecutor(max_workers=max_workers,
+                                                     wait_ratio=0.0)
+
+
+class ParallelAutoScalingThreadTaskExecutor(ParallelTaskExecutor):
+    """Executes tasks in parallel using a thread pool that grows and shrinks.
+
+    See :py:class:`~taskflow.types.futures.AutoScalingThreadPoolExecutor`
+    for how the ``max_workers``, ``min_workers``, ``idle_timeout`` and
+    ``wait_ratio`` options alter when threads are started and stopped (and
+    the statistics of the scaling decisions it made are available from the
+    executors ``statistics`` attribute).
+    """
+
+    #: Options this executor supports (passed in from engine options).
+    OPTIONS = frozenset(['max_workers', 'min_workers', 'idle_timeout',
+                         'wait_ratio'])
+
+    def __init__(self, executor=None, max_workers=None, min_workers=None,
+                 idle_timeout=None, wait_ratio=None):
+        super(ParallelAutoScalingThreadTaskExecutor, self).__init__(
+            executor=executor, max_workers=max_workers)
+        self._scaling_options = {}
+        if min_workers is not None:
+            self._scaling_options['min_workers'] = misc.as_int(min_workers)
+        if idle_timeout is not None:
+            self._scaling_options['idle_timeout'] = float(idle_timeout)
+        if wait_ratio is not None:
+            self._scaling_options['wait_ratio'] = float(wait_ratio)
+
+    def _create_executor(self, max_workers=None):
+        return futures.AutoScalingThreadPoolExecutor(
+            max_workers=max_workers, **self._scaling_options)
+
+    def start(self):
+        if self._own_executor:
+            # The pool picks its own (larger) maximum when none is given...
+            self._executor = self._create_executor(
+                max_workers=self._max_workers)
+
+
+class ParallelAsyncioTaskExecutor(ParallelTaskExecutor):
+    """Executes tasks in parallel using an asyncio event loop.
+
+    Tasks whose ``execute`` (or ``revert``) method is a coroutine function
+    are ran on an event loop this executor owns (and runs in its own
+    thread); since those tasks give up control while they wait (for I/O
+    for example) many of them can be running at the same time without each
+    one needing its own thread. Other tasks (whose methods block) are
+    offloaded to a thread pool executor.
+
+    Progress (and other) notifications that coroutine tasks emit are sent
+    from the event loops thread, so callbacks registered to receive them
+    should not block.
+    """
+
+    def __init__(self, executor=None, max_workers=None):
+        au.check_for_asyncio()
+        super(ParallelAsyncioTaskExecutor, self).__init__(
+            executor=executor, max_workers=max_workers)
+        self._loop = None
+        self._loop_thread = None
+        # The asyncio futures of the coroutines that are running (keyed by
+        # the future returned for each one).
+        self._coroutines = {}
 
     def _create_executor(self, max_workers=None):
         return futures.ThreadPoolExecutor(max_workers=max_workers)
 
+    def _submit_coroutine_task(self, outcome, task, arguments,
+                               progress_callback=None):
+        fut = futures.Future()
+        fut.atom = task
+        fut.timings = Timings()
+        self._loop.call_soon_threadsafe(_start_coroutine_task, self._loop,
+                                        fut, outcome, task, arguments,
+                                        progress_callback, fut.timings,
+                                        self._coroutines)
+        return fut
+
+    def execute_task(self, task, task_uuid, arguments, progress_callback=None):
+        if au.iscoroutinefunction(task.execute):
+            return self._submit_coroutine_task(
+                EXECUTED, task, arguments,
+                progress_callback=progress_callback)
+        return super(ParallelAsyncioTaskExecutor, self).execute_task(
+            task, task_uuid, arguments, progress_callback=progress_callback)
+
+    def revert_task(self, task, task_uuid, arguments, result, failures,
+                    progress_callback=None):
+        if au.iscoroutinefunction(task.revert):
+            arguments = arguments.copy()
+            arguments[task_atom.REVERT_RESULT] = result
+            arguments[task_atom.REVERT_FLOW_FAILURES] = failures
+            return self._submit_coroutine_task(
+                REVERTED, task, arguments,
+                progress_callback=progress_callback)
+        return super(ParallelAsyncioTaskExecutor, self).revert_task(
+            task, task_uuid, arguments, result, failures,
+            progress_callback=progress_callback)
+
+    def abandon_task(self, future):
+        if future.cancel():
+            return
+        coro_fut = self._coroutines.get(future)
+        if coro_fut is not None:
+            # Cancelling it raises a cancelled error inside the coroutine
+            # (at the point where it is waiting).
+            self._loop.call_soon_threadsafe(coro_fut.cancel)
+        else:
+            super(ParallelAsyncioTaskExecutor, self).abandon_task(future)
+
+    def _run_loop(self, loop):
+        au.asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def start(self):
+        super(ParallelAsyncioTaskExecutor, self).start()
+        if self._loop is None:
+            self._loop = au.asyncio.new_event_loop()
+            self._loop_thread = threading_utils.daemon_thread(
+                self._run_loop, self._loop)
+            self._loop_thread.start()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop = None
+            self._loop_thread = None
+        super(ParallelAsyncioTaskExecutor, self).stop()
+
 
 class ParallelProcessTaskExecutor(ParallelTaskExecutor):
     """Executes tasks in parallel using a process pool executor.
@@ -446,68 +1130,262 @@ class ParallelProcessTaskExecutor(ParallelTaskExecutor):
     particular) are proxied correctly from that external process to the one
     that is alive in the parent process to ensure that callbacks registered in
     the parent are executed on events in the child.
+
+    When this executor makes its own process pool the following (optional)
+    options alter how it does so:
+
+    * ``preload``: names of modules each worker process imports when it
+      starts (for example the modules the tasks are defined in, or modules
+      that take a long time to import).
+    * ``start_method``: the multiprocessing start method used to start
+      worker processes (``'fork'``, ``'spawn'`` or ``'forkserver'``); when
+      this is ``'forkserver'`` the fork server itself imports the preloaded
+      modules, so that forked worker processes start with them imported.
+    * ``share_pool``: when true the process pool is shared with (and
+      reused by) all other process executors (in this process) that have
+      the same number of workers, preloaded modules and start method,
+      instead of being created when started and shut down when stopped;
+      this avoids starting (cold) worker processes on every engine run
+      when engines are ran one after another (for example by a
+      conductor). See :py:func:`.shutdown_shared_pools`.
+
+    The following (optional) option alters how arguments are sent:
+
+    * ``shared_memory_threshold``: when provided, task arguments (and the
+      previous result given when reverting) that support the buffer
+      protocol (``bytes``, ``bytearray``, ``array.array``, numpy arrays...)
+      and are at least this many bytes are not pickled but are written once
+      to a (memory backed, when possible) file that the worker process maps
+      into its memory; tasks then receive read-only ``memoryview`` objects
+      instead. Task results that are ``bytes``, ``bytearray`` or
+      ``memoryview`` objects of at least this size are sent back the same way
+      (and are read back as ``bytearray`` objects for ``bytearray`` results
+      and as ``bytes`` objects otherwise). The files are removed when the
+      task finishes (or when the executor stops).
+
+    Tasks are pickled once (per set of events they need proxied) and the
+    worker processes unpickle each run from that snapshot; so changes made to
+    a task after it was first submitted are not seen by later runs of it
+    (until the snapshot is evicted or the executor is restarted). The
+    following (optional) option bounds how many are kept:
+
+    * ``template_cache_size``: how many bytes of pickled tasks are kept
+      (least recently used ones are dropped first, once no submitted work
+      still needs them), defaults to ``DEFAULT_TEMPLATE_CACHE_SIZE``.
+
+    When a running task is abandoned (for example when its deadline
+    expired) the process pool it was submitted to is retired (see
+    :py:meth:`~taskflow.types.futures.ProcessPoolExecutor.retire`); new work
+    is submitted to a new process pool and once the other work submitted to
+    the retired pool is done its worker processes are terminated (which
+    stops the abandoned task, even when it is blocked). Until then the
+    retired pool runs an extra worker process for each abandoned task. The
+    task is never interrupted while it is running (it is terminated along
+    with its process), so tasks that must release resources that outlive
+    their process should not be given deadlines. Process pools that were
+    provided (and not created by this executor) are not retired (their
+    abandoned work keeps running), and neither are pools on python versions
+    that do not support retiring them (see
+    :py:attr:`~taskflow.types.futures.ProcessPoolExecutor.retirable`).
     """
 
     #: Options this executor supports (passed in from engine options).
-    OPTIONS = frozenset(['max_workers', 'dispatch_periodicity'])
+    OPTIONS = frozenset(['max_workers', 'dispatch_periodicity', 'preload',
+                         'start_method', 'share_pool',
+                         'shared_memory_threshold', 'template_cache_size'])
 
     def __init__(self, executor=None, max_workers=None,
-                 dispatch_periodicity=None):
+                 dispatch_periodicity=None, preload=None, start_method=None,
+                 share_pool=False, shared_memory_threshold=None,
+                 template_cache_size=None):
         super(ParallelProcessTaskExecutor, self).__init__(
             executor=executor, max_workers=max_workers)
-        self._manager = _ViewableSyncManager()
+        if isinstance(preload, six.string_types):
+            preload = [preload]
+        # Fail now (instead of when starting) if these can not be used...
+        futures.ProcessPoolExecutor.validate_options(
+            preload=preload, start_method=start_method)
+        self._preload = tuple(preload or ())
+        self._start_method = start_method
+        self._share_pool = share_pool
+        if shared_memory_threshold is not None:
+            shared_memory_threshold = misc.as_int(shared_memory_threshold)
+            if shared_memory_threshold < 0:
+                raise ValueError("Shared memory threshold must be greater"
+                                 " than or equal to zero and not '%s'"
+                                 % shared_memory_threshold)
+        self._shared_memory_threshold = shared_memory_threshold
+        self._shared_directory = None
+        # The futures (and the pools they were submitted to) of the work that
+        # has been submitted but is not done yet.
+        self._submitted = {}
         self._dispatcher = _Dispatcher(
             dispatch_periodicity=dispatch_periodicity)
         # Only created after starting...
         self._worker = None
-        self._queue = None
+        self._server = None
+        self._identities = None
+        if template_cache_size is None:
+            template_cache_size = DEFAULT_TEMPLATE_CACHE_SIZE
+        # The templates (and the tasks they were made from, so that their ids
+        # can not be reused while cached) of the recently submitted tasks.
+        self._templates = cache.LRUCache(
+            misc.as_int(template_cache_size),
+            on_evict=self._on_template_evicted)
+        self._templates_lock = threading.RLock()
+        self._template_keys = itertools.count()
+        # How much submitted work (that is not done) uses each template, and
+        # the templates that were evicted while still used.
+        self._template_users = collections.Counter()
+        self._evicted_templates = set()
 
     def _create_executor(self, max_workers=None):
-        return futures.ProcessPoolExecutor(max_workers=max_workers)
+        if not self._share_pool:
+            return futures.ProcessPoolExecutor(
+                max_workers=max_workers, preload=self._preload,
+                start_method=self._start_method)
+        key = (max_workers, self._preload, self._start_method)
+        with _SHARED_POOLS_LOCK:
+            pool = _SHARED_POOLS.get(key)
+            if pool is None or not pool.alive:
+                pool = futures.ProcessPoolExecutor(
+                    max_workers=max_workers, preload=self._preload,
+                    start_method=self._start_method)
+                _SHARED_POOLS[key] = pool
+            return pool
+
+    def _destroy_executor(self, executor):
+        if not self._share_pool:
+            super(ParallelProcessTaskExecutor,
+                  self)._destroy_executor(executor)
 
     def start(self):
         if threading_utils.is_alive(self._worker):
             raise RuntimeError("Worker thread must be stopped via stop()"
                                " before starting/restarting")
         super(ParallelProcessTaskExecutor, self).start()
-        # These don't seem restartable; make a new one...
-        if self._manager.is_shutdown():
-            self._manager = _ViewableSyncManager()
-        if not self._manager.is_running():
-            self._manager.start()
         self._dispatcher.reset()
-        self._queue = self._manager.Queue()
+        self._identities = itertools.count()
+        self._clear_templates()
+        if self._shared_memory_threshold is not None:
+            self._shared_directory = _shared_buffers_directory()
+        self._server = _ChannelServer()
         self._worker = threading_utils.daemon_thread(self._dispatcher.run,
-                                                     self._queue)
+                                                     self._server)
         self._worker.start()
 
     def stop(self):
         self._dispatcher.interrupt()
+        if self._server is not None:
+            self._server.wake()
         super(ParallelProcessTaskExecutor, self).stop()
         if threading_utils.is_alive(self._worker):
             self._worker.join()
             self._worker = None
-            self._queue = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
         self._dispatcher.reset()
-        self._manager.shutdown()
-        self._manager.join()
-
-    def _rebind_task(self, task, clone, channel, progress_callback=None):
-        # Creates and binds proxies for all events the task could receive
-        # so that when the clone runs in another process that this task
-        # can recieve the same notifications (thus making it look like the
-        # the notifications are transparently happening in this process).
+        self._clear_templates()
+        if self._shared_directory is not None:
+            shutil.rmtree(self._shared_directory, ignore_errors=True)
+            self._shared_directory = None
+        self._submitted.clear()
+
+    @staticmethod
+    def _find_needed_events(task, progress_callback=None):
         needed = set()
         for (event_type, listeners) in task.notifier.listeners_iter():
             if listeners:
                 needed.add(event_type)
         if progress_callback is not None:
             needed.add(_UPDATE_PROGRESS)
+        return frozenset(needed)
+
+    def _rebind_task(self, task, clone, channel, progress_callback=None):
+        # Creates and binds proxies for all events the task could receive
+        # so that when the clone runs in another process that this task
+        # can recieve the same notifications (thus making it look like the
+        # the notifications are transparently happening in this process).
+        needed = self._find_needed_events(task,
+                                          progress_callback=progress_callback)
         if needed:
             sender = _EventSender(channel)
             for event_type in needed:
                 clone.notifier.register(event_type, sender)
 
+    def _fetch_template(self, task, progress_callback=None):
+        # Tasks are (typically) ran more than once (or reverted after being
+        # ran) so instead of copying and pickling them for each submission
+        # they are copied and pickled once (per needed events) and workers
+        # fetch (and keep) that pickled template the first time they need it.
+        needed = self._find_needed_events(task,
+                                          progress_callback=progress_callback)
+        cache_key = (id(task), needed)
+        with self._templates_lock:
+            cached = self._templates.get(cache_key)
+            if cached is not None:
+                template = cached[1]
+                if template is not None:
+                    self._template_users[template.key] += 1
+                return template
+        clone = task.copy(retain_listeners=False)
+        if needed:
+            sender = _EventSender()
+            for event_type in needed:
+                clone.notifier.register(event_type, sender)
+        try:
+            blob = pickle.dumps(clone, pickle.HIGHEST_PROTOCOL)
+        except _PICKLE_ERRORS + (AttributeError,):
+            # Let the (slower) per-submission path deal with (and report)
+            # the failure...
+            LOG.blather("Failed pickling a template of task '%s'", task,
+                        exc_info=True)
+            template = None
+            size = 1
+        else:
+            template = _TaskTemplate(six.next(self._template_keys))
+            size = len(blob)
+            self._dispatcher.add_template(template.key, blob)
+        with self._templates_lock:
+            if template is not None:
+                self._template_users[template.key] += 1
+            # The task is kept so that its id can not be reused (while
+            # cached).
+            self._templates.put(cache_key, (task, template), size)
+            if template is not None and cache_key not in self._templates:
+                # Too big to be cached, so only kept until it is released.
+                self._evicted_templates.add(template.key)
+        return template
+
+    def _on_template_evicted(self, cache_key, cached):
+        template = cached[1]
+        if template is None:
+            return
+        with self._templates_lock:
+            if self._template_users[template.key]:
+                # Still needed by submitted work, removed once released.
+                self._evicted_templates.add(template.key)
+            else:
+                self._template_users.pop(template.key, None)
+                self._dispatcher.remove_template(template.key)
+
+    def _release_template(self, template):
+        with self._templates_lock:
+            self._template_users[template.key] -= 1
+            if self._template_users[template.key] <= 0:
+                self._template_users.pop(template.key, None)
+                if template.key in self._evicted_templates:
+                    self._evicted_templates.discard(template.key)
+                    self._dispatcher.remove_template(template.key)
+
+    def _clear_templates(self):
+        with self._templates_lock:
+            self._templates.clear()
+            self._template_users.clear()
+            self._evicted_templates.clear()
+            self._template_keys = itertools.count()
+
     def _submit_task(self, func, task, *args, **kwargs):
         """Submit a function to run the given task (with given args/kwargs).
 
@@ -541,14 +1419,25 @@ class ParallelProcessTaskExecutor(ParallelTaskExecutor):
         then trigger a callback that will remove the task + target from the
         dispatcher (which will stop any further proxying back to the original
         task).
+
+        Since the same task is typically submitted more than once the copy of
+        the task is only made (and pickled) once; the workers fetch (and keep)
+        that pickled template the first time they need it, so that further
+        submissions only send a reference to it along with the arguments.
         """
         progress_callback = kwargs.pop('progress_callback', None)
-        clone = task.copy(retain_listeners=False)
-        identity = uuidutils.generate_uuid()
-        target = _Target(task, self._manager.Event(), identity)
-        channel = _Channel(self._queue, identity)
-        self._rebind_task(task, clone, channel,
-                          progress_callback=progress_callback)
+        identity = six.next(self._identities)
+        target = _Target(task, identity)
+        channel = _Channel(self._server.address, self._server.authkey,
+                           identity)
+        template = self._fetch_template(task,
+                                        progress_callback=progress_callback)
+        if template is not None:
+            clone = template
+        else:
+            clone = task.copy(retain_listeners=False)
+            self._rebind_task(task, clone, channel,
+                              progress_callback=progress_callback)
 
         def register():
             if progress_callback is not None:
@@ -559,16 +1448,263 @@ class ParallelProcessTaskExecutor(ParallelTaskExecutor):
             if progress_callback is not None:
                 task.notifier.deregister(_UPDATE_PROGRESS, progress_callback)
             self._dispatcher.deregister(identity)
+            if template is not None:
+                self._release_template(template)
+
+        shared = []
+        if self._shared_directory is not None:
+            args = _map_shareables(
+                args, functools.partial(self._share, shared))
 
         register()
-        work = _WaitWorkItem(channel, target.barrier,
-                             func, clone, *args, **kwargs)
+        timings = Timings()
+        work = _WaitWorkItem(channel, func, clone, *args, **kwargs)
+        if self._shared_directory is not None:
+            work.shared = (self._shared_directory,
+                           self._shared_memory_threshold)
+        if self._own_executor and not self._executor.alive:
+            # Retired (or broken) pools do not accept new work...
+            self._replace_executor()
+        pool = self._executor
         try:
-            fut = self._executor.submit(work)
+            submitted_fut = pool.submit(work)
         except RuntimeError:
             with excutils.save_and_reraise_exception():
                 deregister()
+                for buf in shared:
+                    buf.remove()
 
+        fut = self._unwrap_result(submitted_fut, timings, shared)
         fut.atom = task
+        fut.timings = timings
+        self._submitted[fut] = (submitted_fut, pool)
         fut.add_done_callback(lambda fut: deregister())
+        fut.add_done_callback(
+            lambda fut: self._submitted.pop(fut, None))
         return fut
+
+    def _replace_executor(self):
+        if self._max_workers is not None:
+            max_workers = self._max_workers
+        else:
+            max_workers = threading_utils.get_optimal_thread_count()
+        self._executor = self._create_executor(max_workers=max_workers)
+
+    def abandon_task(self, future):
+        try:
+            (submitted_fut, pool) = self._submitted[future]
+        except KeyError:
+            return
+        if submitted_fut.cancel() or submitted_fut.done():
+            return
+        submitted_fut.abandoned = True
+        if not self._own_executor:
+            return
+        if not pool.retirable:
+            LOG.warn("Unable to retire the process pool running abandoned"
+                     " task '%s' (not supported by this python version), it"
+                     " will keep running (and using a worker process)",
+                     future.atom)
+            return
+        # The worker process running it is terminated (along with the other
+        # worker processes of its pool) once the pool is not running any
+        # other work, so new work goes to a new pool...
+        pool.retire(submitted_fut)
+        if pool is self._executor:
+            self._replace_executor()
+
+    def _share(self, shared, value):
+        if isinstance(value, six.text_type):
+            return value
+        buf = _SharedBuffer.create(self._shared_directory, value,
+                                   self._shared_memory_threshold)
+        if buf is None:
+            return value
+        shared.append(buf)
+        return buf
+
+    @staticmethod
+    def _unwrap_result(fut, timings, shared):
+        # The workers send back how long the task ran for along with its
+        # outcome (and results sent back using a shared buffer are read
+        # back, and their buffer removed) before the future that is returned
+        # instead is marked as done.
+        unshared_fut = futures.Future()
+
+        def on_done(fut):
+            timings.finished = _now()
+            for buf in shared:
+                buf.remove()
+            if fut.cancelled():
+                unshared_fut.cancel()
+                return
+            if getattr(fut, 'abandoned', False):
+                unshared_fut.set_exception(exc.ExecutionTimeout(
+                    "Work was abandoned (and the process running it was"
+                    " terminated)"))
+                return
+            try:
+                (outcome, result, elapsed) = fut.result()
+                timings.started = max(timings.submitted,
+                                      timings.finished - elapsed)
+                if isinstance(result, _SharedBuffer):
+                    buf = result
+                    try:
+                        result = buf.read()
+                    finally:
+                        buf.remove()
+            except Exception as e:
+                unshared_fut.set_exception(e)
+            else:
+                unshared_fut.set_result((outcome, result))
+
+        fut.add_done_callback(on_done)
+        return unshared_fut
+
+
+class RoutingTaskExecutor(TaskExecutor):
+    """Executes (and reverts) each task using one of many task executors.
+
+    This allows a single engine to run some tasks in (for example) external
+    processes and others in threads (or on an asyncio event loop). The name
+    of the executor a task is routed to is found using (in order):
+
+    #. The ``route_policy`` callable (if provided); it is called with the
+       task and returns the name of the executor to use (or ``None`` to
+       let the following decide).
+    #. The ``executor_route`` attribute of the task (if it has one).
+    #. The ``routes`` dictionary (if provided) that maps task classes to
+       executor names (the class of the task, or the closest base class of
+       it that is in the dictionary, decides).
+    #. The ``default_executor`` name (which can be omitted when there is
+       only one executor to route to).
+
+    The futures returned come from the executor each task was routed to;
+    when they all come from one executor that executor does the waiting on
+    them (otherwise they are waited on together, which will not work for
+    green and non-green futures that are waited on at the same time).
+    """
+
+    #: Options this executor supports (passed in from engine options).
+    OPTIONS = frozenset(['executors', 'routes', 'route_policy',
+                         'default_executor'])
+
+    #: Task attribute that (when it exists) names the executor to use.
+    ROUTE_ATTRIBUTE = 'executor_route'
+
+    def __init__(self, executors, routes=None, route_policy=None,
+                 default_executor=None):
+        if not executors:
+            raise ValueError("At least one executor to route to must be"
+                             " provided")
+        self._executors = dict(executors)
+        if default_executor is None and len(self._executors) == 1:
+            default_executor = list(self._executors)[0]
+        if default_executor is None:
+            raise ValueError("A default executor name must be provided when"
+                             " routing to more than one executor")
+        self._routes = dict(routes or {})
+        for name in itertools.chain([default_executor],
+                                    six.itervalues(self._routes)):
+            if name not in self._executors:
+                raise ValueError("Unknown executor '%s' expected one of %s"
+                                 % (name, sorted(self._executors)))
+        self._default_executor = default_executor
+        self._route_policy = route_policy
+        # Class -> executor name (for classes looked up in the routes).
+        self._class_routes = {}
+        # Future -> executor (of the futures returned that are not done).
+        self._owners = weakref.WeakKeyDictionary()
+
+    @property
+    def executors(self):
+        """Dictionary of the executors (by name) that tasks are routed to."""
+        return self._executors.copy()
+
+    def _find_class_route(self, task_cls):
+        try:
+            return self._class_routes[task_cls]
+        except KeyError:
+            name = None
+            for cls in task_cls.__mro__:
+                if cls in self._routes:
+                    name = self._routes[cls]
+                    break
+            self._class_routes[task_cls] = name
+            return name
+
+    def route(self, task):
+        """Returns the name of the executor the given task is routed to."""
+        name = None
+        if self._route_policy is not None:
+            name = self._route_policy(task)
+        if name is None:
+            name = getattr(task, self.ROUTE_ATTRIBUTE, None)
+        if name is None and self._routes:
+            name = self._find_class_route(type(task))
+        if name is None:
+            name = self._default_executor
+        return name
+
+    def _fetch_executor(self, task):
+        name = self.route(task)
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise ValueError("Task '%s' was routed to unknown executor '%s'"
+                             " expected one of %s" % (task, name,
+                                                      sorted(self._executors)))
+
+    def execute_task(self, task, task_uuid, arguments, progress_callback=None):
+        executor = self._fetch_executor(task)
+        fut = executor.execute_task(task, task_uuid, arguments,
+                                    progress_callback=progress_callback)
+        self._owners[fut] = executor
+        return fut
+
+    def revert_task(self, task, task_uuid, arguments, result, failures,
+                    progress_callback=None):
+        executor = self._fetch_executor(task)
+        fut = executor.revert_task(task, task_uuid, arguments, result,
+                                   failures,
+                                   progress_callback=progress_callback)
+        self._owners[fut] = executor
+        return fut
+
+    def wait_for_any(self, fs, timeout=None):
+        owners = set(self._owners.get(fut) for fut in fs)
+        if len(owners) == 1:
+            owner = owners.pop()
+            if owner is not None:
+                return owner.wait_for_any(fs, timeout=timeout)
+        return async_utils.wait_for_any(fs, timeout=timeout)
+
+    def abandon_task(self, future):
+        owner = self._owners.get(future)
+        if owner is not None:
+            owner.abandon_task(future)
+        else:
+            future.cancel()
+
+    def _unique_executors(self):
+        executors = []
+        for name in sorted(self._executors):
+            executor = self._executors[name]
+            if not any(executor is e for e in executors):
+                executors.append(executor)
+        return executors
+
+    def start(self):
+        started = []
+        try:
+            for executor in self._unique_executors():
+                executor.start()
+                started.append(executor)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                for executor in reversed(started):
+                    executor.stop()
+
+    def stop(self):
+        for executor in reversed(self._unique_executors()):
+            executor.stop()
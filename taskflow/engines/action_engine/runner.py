@@ -88,6 +88,7 @@ class _MachineBuilder(object):
         self._completer = runtime.completer
         self._scheduler = runtime.scheduler
         self._storage = runtime.storage
+        self._task_action = runtime.task_action
         self._waiter = waiter
 
     def runnable(self):
@@ -142,8 +143,20 @@ class _MachineBuilder(object):
             # call sometime in the future, or equivalent that will work in
             # py2 and py3.
             if memory.not_done:
+                # Wake up in time to notice any task deadline expiring (and
+                # replace the futures of those tasks with ones that failed).
+                wait_timeout = timeout
+                for fut in memory.not_done:
+                    deadline = getattr(fut, 'deadline', None)
+                    if deadline is not None:
+                        wait_timeout = min(wait_timeout, deadline.leftover())
                 done, not_done = self._waiter.wait_for_any(memory.not_done,
-                                                           timeout)
+                                                           wait_timeout)
+                for fut in list(not_done):
+                    deadline = getattr(fut, 'deadline', None)
+                    if deadline is not None and deadline.expired():
+                        not_done.remove(fut)
+                        done.add(self._task_action.expire(fut))
                 memory.done.update(done)
                 memory.not_done = not_done
             return _ANALYZE
@@ -33,9 +33,12 @@ class Runtime(object):
     action engine to run to completion.
     """
 
-    def __init__(self, compilation, storage, atom_notifier, task_executor):
+    def __init__(self, compilation, storage, atom_notifier, task_executor,
+                 task_statistics=None, task_timeout=None):
         self._atom_notifier = atom_notifier
         self._task_executor = task_executor
+        self._task_statistics = task_statistics
+        self._task_timeout = task_timeout
         self._storage = storage
         self._compilation = compilation
         self._scopes = {}
@@ -73,7 +76,9 @@ class Runtime(object):
     def task_action(self):
         return ta.TaskAction(self._storage,
                              self._atom_notifier, self._fetch_scopes_for,
-                             self._task_executor)
+                             self._task_executor,
+                             task_statistics=self._task_statistics,
+                             task_timeout=self._task_timeout)
 
     def _fetch_scopes_for(self, atom):
         """Fetches a tuple of the visible scopes for the given atom."""
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import threading
+
+from oslo_utils import reflection
+import six
+
+from taskflow.engines.action_engine import executor as ex
+from taskflow.types import histogram
+from taskflow.utils import misc
+
+# Find a monotonic providing time (or fallback to using time.time()
+# which isn't *always* accurate but will suffice).
+_now = misc.find_monotonic(allow_time_time=True)
+
+# Histograms kept for each task class.
+WAITING = 'waiting'
+EXECUTING = 'executing'
+REVERTING = 'reverting'
+
+
+class _ClassStatistics(object):
+    __slots__ = ('in_flight', 'executed', 'reverted', 'histograms')
+
+    def __init__(self, histogram_factory):
+        self.in_flight = 0
+        self.executed = 0
+        self.reverted = 0
+        self.histograms = {
+            WAITING: histogram_factory(),
+            EXECUTING: histogram_factory(),
+            REVERTING: histogram_factory(),
+        }
+
+
+class TaskStatistics(object):
+    """Gathers latency histograms and in-flight gauges per task class.
+
+    The futures returned from a task executor are tracked (until they are
+    done); the time each execution (or reversion) waited before starting
+    (when the executor provides :py:class:`~.executor.Timings`) and the
+    time it took are recorded into fixed memory histograms of that tasks
+    class (so that gathering these is cheap enough to always do).
+    """
+
+    def __init__(self, histogram_factory=histogram.Histogram):
+        self._histogram_factory = histogram_factory
+        self._lock = threading.Lock()
+        self._classes = {}
+
+    def _fetch(self, task):
+        task_cls = type(task)
+        try:
+            return self._classes[task_cls]
+        except KeyError:
+            with self._lock:
+                stats = self._classes.get(task_cls)
+                if stats is None:
+                    stats = _ClassStatistics(self._histogram_factory)
+                    self._classes[task_cls] = stats
+                return stats
+
+    def track(self, task, future, outcome=ex.EXECUTED):
+        """Tracks a future (of a task execution or reversion) until done."""
+        stats = self._fetch(task)
+        with self._lock:
+            stats.in_flight += 1
+        future.add_done_callback(functools.partial(self._on_done, stats,
+                                                   outcome, _now()))
+
+    def _on_done(self, stats, outcome, tracked_at, future):
+        timings = getattr(future, 'timings', None)
+        running = None
+        if timings is not None:
+            running = timings.running
+            waiting = timings.waiting
+            if waiting is not None:
+                stats.histograms[WAITING].record(waiting)
+        if running is None:
+            # Best we can do is how long it took to finish (from when it
+            # was submitted).
+            running = max(0.0, _now() - tracked_at)
+        if outcome == ex.REVERTED:
+            stats.histograms[REVERTING].record(running)
+        else:
+            stats.histograms[EXECUTING].record(running)
+        with self._lock:
+            stats.in_flight -= 1
+            if outcome == ex.REVERTED:
+                stats.reverted += 1
+            else:
+                stats.executed += 1
+
+    @property
+    def in_flight(self):
+        """How many tracked executions (or reversions) are not done."""
+        with self._lock:
+            return sum(stats.in_flight
+                       for stats in six.itervalues(self._classes))
+
+    def clear(self):
+        """Forgets all gathered statistics (of tasks that are done)."""
+        with self._lock:
+            for stats in six.itervalues(self._classes):
+                stats.executed = 0
+                stats.reverted = 0
+                for hist in six.itervalues(stats.histograms):
+                    hist.clear()
+
+    def to_dict(self):
+        """Returns a snapshot of the statistics (keyed by task class name)."""
+        with self._lock:
+            classes = list(six.iteritems(self._classes))
+            gauges = dict((task_cls, (stats.in_flight, stats.executed,
+                                      stats.reverted))
+                          for task_cls, stats in classes)
+        data = {}
+        for task_cls, stats in classes:
+            (in_flight, executed, reverted) = gauges[task_cls]
+            cls_data = {
+                'in_flight': in_flight,
+                'executed': executed,
+                'reverted': reverted,
+            }
+            for name, hist in six.iteritems(stats.histograms):
+                cls_data[name] = hist.to_dict()
+            data[reflection.get_class_name(task_cls)] = cls_data
+        return data
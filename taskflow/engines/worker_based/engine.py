@@ -44,6 +44,11 @@ class WorkerBasedActionEngine(engine.ActionEngine):
                               options imply and are expected to be)
     :param retry_options: retry specific options
                           (see: :py:attr:`~.proxy.Proxy.DEFAULT_RETRY_OPTIONS`)
+    :param validate_messages: boolean that when false skips validating
+                              received messages against the message schemas
+                              (only turn this off when the workers and
+                              engines are on a trusted network and run the
+                              same version of this library)
     """
 
     _storage_factory = t_storage.SingleThreadedStorage
@@ -75,4 +80,5 @@ class WorkerBasedActionEngine(engine.ActionEngine):
                 transport=options.get('transport'),
                 transport_options=options.get('transport_options'),
                 transition_timeout=options.get('transition_timeout',
-                                               pr.REQUEST_TIMEOUT))
+                                               pr.REQUEST_TIMEOUT),
+                validate_messages=options.get('validate_messages', True))
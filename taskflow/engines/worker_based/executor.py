@@ -39,16 +39,21 @@ class WorkerTaskExecutor(executor.TaskExecutor):
     def __init__(self, uuid, exchange, topics,
                  transition_timeout=pr.REQUEST_TIMEOUT,
                  url=None, transport=None, transport_options=None,
-                 retry_options=None):
+                 retry_options=None, validate_messages=True):
         self._uuid = uuid
         self._requests_cache = wt.RequestsCache()
         self._transition_timeout = transition_timeout
-        type_handlers = {
-            pr.RESPONSE: [
-                self._process_response,
-                pr.Response.validate,
-            ],
-        }
+        if validate_messages:
+            type_handlers = {
+                pr.RESPONSE: [
+                    self._process_response,
+                    pr.Response.validate,
+                ],
+            }
+        else:
+            type_handlers = {
+                pr.RESPONSE: self._process_response,
+            }
         self._proxy = proxy.Proxy(uuid, exchange,
                                   type_handlers=type_handlers,
                                   on_wait=self._on_wait, url=url,
@@ -61,7 +66,8 @@ class WorkerTaskExecutor(executor.TaskExecutor):
         # to workers to 'learn' of the tasks they can perform (and requires
         # pre-existing knowledge of the topics those workers are on to gather
         # and update this information).
-        self._finder = wt.ProxyWorkerFinder(uuid, self._proxy, topics)
+        self._finder = wt.ProxyWorkerFinder(
+            uuid, self._proxy, topics, validate_messages=validate_messages)
         self._finder.on_worker = self._on_worker
         self._helpers = tu.ThreadBundle()
         self._helpers.bind(lambda: tu.daemon_thread(self._proxy.start),
@@ -100,10 +106,18 @@ class WorkerTaskExecutor(executor.TaskExecutor):
                     request.transition_and_log_error(pr.RUNNING, logger=LOG)
                 elif response.state == pr.EVENT:
                     # Proxy the event + details to the task/request notifier...
-                    event_type = response.data['event_type']
-                    details = response.data['details']
-                    request.notifier.notify(event_type, details)
+                    if 'events' in response.data:
+                        self._notify_events(request,
+                                            response.data['events'])
+                    else:
+                        event_type = response.data['event_type']
+                        details = response.data['details']
+                        request.notifier.notify(event_type, details)
                 elif response.state in (pr.FAILURE, pr.SUCCESS):
+                    # Any events that were coalesced with the result happened
+                    # before it, so proxy them first...
+                    self._notify_events(request,
+                                        response.data.pop('events', []))
                     moved = request.transition_and_log_error(response.state,
                                                              logger=LOG)
                     if moved:
@@ -119,6 +133,11 @@ class WorkerTaskExecutor(executor.TaskExecutor):
             else:
                 LOG.debug("Request with id='%s' not found", task_uuid)
 
+    @staticmethod
+    def _notify_events(request, events):
+        for event in events:
+            request.notifier.notify(event['event_type'], event['details'])
+
     @staticmethod
     def _handle_expired_request(request):
         """Handle expired request.
@@ -186,6 +205,7 @@ class WorkerTaskExecutor(executor.TaskExecutor):
                   " response identified by reply_to=%s and"
                   " correlation_id=%s)", request, worker, self._uuid,
                   request.uuid)
+        self._finder.track_request(worker, request.result)
         try:
             self._proxy.publish(request, worker.topic,
                                 reply_to=self._uuid,
@@ -18,8 +18,8 @@ import abc
 import threading
 
 from concurrent import futures
-import jsonschema
 from jsonschema import exceptions as schema_exc
+from jsonschema import validators as schema_validators
 from oslo_utils import reflection
 from oslo_utils import timeutils
 import six
@@ -104,9 +104,31 @@ _SCHEMA_TYPES = {
     'array': (list, tuple),
 }
 
+# Validators (that have been made once, after checking the schema they are
+# made from) of the schemas messages are validated against.
+_VALIDATORS = {}
+_VALIDATORS_LOCK = threading.Lock()
+
 LOG = logging.getLogger(__name__)
 
 
+def _fetch_validator(schema):
+    # NOTE: the schema is kept along with its validator, so that its id can
+    # not be reused (while its validator is cached).
+    try:
+        return _VALIDATORS[id(schema)][1]
+    except KeyError:
+        with _VALIDATORS_LOCK:
+            try:
+                return _VALIDATORS[id(schema)][1]
+            except KeyError:
+                cls = schema_validators.validator_for(schema)
+                cls.check_schema(schema)
+                validator = cls(schema, types=_SCHEMA_TYPES)
+                _VALIDATORS[id(schema)] = (schema, validator)
+                return validator
+
+
 @six.add_metaclass(abc.ABCMeta)
 class Message(object):
     """Base class for all message types."""
@@ -141,7 +163,17 @@ class Notify(Message):
                 "items": {
                     "type": "string",
                 },
-            }
+            },
+            # These two are only sent by workers that report their load
+            # (that is why they are not included in the required section).
+            'capacity': {
+                "type": "integer",
+                "minimum": 1,
+            },
+            'in_flight': {
+                "type": "integer",
+                "minimum": 0,
+            },
         },
         "required": ["topic", 'tasks'],
         "additionalProperties": False,
@@ -166,7 +198,7 @@ class Notify(Message):
         else:
             schema = cls.SENDER_SCHEMA
         try:
-            jsonschema.validate(data, schema, types=_SCHEMA_TYPES)
+            _fetch_validator(schema).validate(data)
         except schema_exc.ValidationError as e:
             if response:
                 raise excp.InvalidFormat("%s message response data not of the"
@@ -358,7 +390,7 @@ class Request(Message):
     @classmethod
     def validate(cls, data):
         try:
-            jsonschema.validate(data, cls.SCHEMA, types=_SCHEMA_TYPES)
+            _fetch_validator(cls.SCHEMA).validate(data)
         except schema_exc.ValidationError as e:
             raise excp.InvalidFormat("%s message response data not of the"
                                      " expected format: %s"
@@ -384,6 +416,9 @@ class Response(Message):
                     {
                         "$ref": "#/definitions/event",
                     },
+                    {
+                        "$ref": "#/definitions/events",
+                    },
                     {
                         "$ref": "#/definitions/completion",
                     },
@@ -409,6 +444,20 @@ class Response(Message):
                 "required": ["event_type", 'details'],
                 "additionalProperties": False,
             },
+            # Used when sending many (coalesced) events at once.
+            "events": {
+                "type": "object",
+                "properties": {
+                    'events': {
+                        "type": "array",
+                        "items": {
+                            "$ref": "#/definitions/event",
+                        },
+                    },
+                },
+                "required": ["events"],
+                "additionalProperties": False,
+            },
             # Used when sending *only* request state changes (and no data is
             # expected).
             "empty": {
@@ -422,6 +471,14 @@ class Response(Message):
                     # thats why we can't be strict about what type it is since
                     # any of the json serializable types are allowed.
                     "result": {},
+                    # Any (coalesced) events that were not yet sent before
+                    # the task completed.
+                    'events': {
+                        "type": "array",
+                        "items": {
+                            "$ref": "#/definitions/event",
+                        },
+                    },
                 },
                 "required": ["result"],
                 "additionalProperties": False,
@@ -455,7 +512,7 @@ class Response(Message):
     @classmethod
     def validate(cls, data):
         try:
-            jsonschema.validate(data, cls.SCHEMA, types=_SCHEMA_TYPES)
+            _fetch_validator(cls.SCHEMA).validate(data)
         except schema_exc.ValidationError as e:
             raise excp.InvalidFormat("%s message response data not of the"
                                      " expected format: %s"
@@ -15,14 +15,17 @@
 #    under the License.
 
 import functools
+import threading
 
 import six
 
 from taskflow.engines.worker_based import protocol as pr
 from taskflow.engines.worker_based import proxy
 from taskflow import logging
+from taskflow import task as t_task
 from taskflow.types import failure as ft
 from taskflow.types import notifier as nt
+from taskflow.types import timing as tt
 from taskflow.utils import kombu_utils as ku
 from taskflow.utils import misc
 
@@ -43,28 +46,108 @@ def delayed(executor):
     return decorator
 
 
+class _EventCoalescer(object):
+    """Coalesces the events a task emits into fewer messages.
+
+    The first event is sent right away, after that events are sent (all
+    at once) at most once per window; progress events that are waiting to
+    be sent are replaced by the next progress event (since it supersedes
+    them). The events still waiting when the task finishes are returned from
+    :py:meth:`.close` (so that they can be sent along with the result).
+    """
+
+    def __init__(self, send, window):
+        self._send = send
+        self._window = window
+        self._watch = None
+        self._timer = None
+        self._pending = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def add(self, event_type, details):
+        with self._lock:
+            if self._closed:
+                return
+            event = {
+                'event_type': event_type,
+                'details': details,
+            }
+            if (event_type == t_task.EVENT_UPDATE_PROGRESS and
+                    self._pending and
+                    self._pending[-1]['event_type'] == event_type):
+                self._pending[-1] = event
+            else:
+                self._pending.append(event)
+            if self._timer is not None:
+                return
+            if self._watch is None or self._watch.expired():
+                self._flush()
+            else:
+                self._timer = threading.Timer(self._watch.leftover(),
+                                              self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self):
+        events, self._pending = self._pending, []
+        self._timer = None
+        self._watch = tt.StopWatch(duration=self._window).start()
+        if events:
+            self._send(events)
+
+    def flush(self):
+        """Sends any events that are waiting to be sent."""
+        with self._lock:
+            if not self._closed:
+                self._flush()
+
+    def close(self):
+        """Stops sending events and returns the ones that were not sent."""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            events, self._pending = self._pending, []
+            return events
+
+
 class Server(object):
     """Server implementation that waits for incoming tasks requests."""
 
     def __init__(self, topic, exchange, executor, endpoints,
                  url=None, transport=None, transport_options=None,
-                 retry_options=None):
-        type_handlers = {
-            pr.NOTIFY: [
-                delayed(executor)(self._process_notify),
-                functools.partial(pr.Notify.validate, response=False),
-            ],
-            pr.REQUEST: [
-                delayed(executor)(self._process_request),
-                pr.Request.validate,
-            ],
-        }
+                 retry_options=None, validate_messages=True,
+                 event_window=None, report_load=False, capacity=None):
+        self._submit_request = delayed(executor)(self._process_request)
+        if validate_messages:
+            type_handlers = {
+                pr.NOTIFY: [
+                    delayed(executor)(self._process_notify),
+                    functools.partial(pr.Notify.validate, response=False),
+                ],
+                pr.REQUEST: [
+                    self._on_request,
+                    pr.Request.validate,
+                ],
+            }
+        else:
+            type_handlers = {
+                pr.NOTIFY: delayed(executor)(self._process_notify),
+                pr.REQUEST: self._on_request,
+            }
         self._proxy = proxy.Proxy(topic, exchange,
                                   type_handlers=type_handlers,
                                   url=url, transport=transport,
                                   transport_options=transport_options,
                                   retry_options=retry_options)
         self._topic = topic
+        self._event_window = event_window
+        self._report_load = report_load
+        self._capacity = capacity
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
         self._endpoints = dict([(endpoint.name, endpoint)
                                 for endpoint in endpoints])
 
@@ -134,6 +217,13 @@ class Server(object):
                          exc_info=True)
         return published
 
+    @staticmethod
+    def _reply_with_events(reply_callback, coalescer, **kwargs):
+        events = coalescer.close()
+        if events:
+            kwargs['events'] = events
+        return reply_callback(**kwargs)
+
     def _on_event(self, reply_to, task_uuid, event_type, details):
         """Send out a task event notification."""
         # NOTE(harlowja): the executor that will trigger this using the
@@ -142,6 +232,13 @@ class Server(object):
         self._reply(False, reply_to, task_uuid, pr.EVENT,
                     event_type=event_type, details=details)
 
+    def _on_events(self, reply_to, task_uuid, events):
+        """Send out (coalesced) task event notifications."""
+        if len(events) == 1:
+            self._reply(True, reply_to, task_uuid, pr.EVENT, **events[0])
+        else:
+            self._reply(True, reply_to, task_uuid, pr.EVENT, events=events)
+
     def _process_notify(self, notify, message):
         """Process notify message and reply back."""
         LOG.debug("Started processing notify message '%s'",
@@ -153,8 +250,15 @@ class Server(object):
                      " in received notify message '%s'",
                      ku.DelayedPretty(message), exc_info=True)
         else:
-            response = pr.Notify(topic=self._topic,
-                                 tasks=self._endpoints.keys())
+            details = {
+                'topic': self._topic,
+                'tasks': list(self._endpoints.keys()),
+            }
+            if self._report_load:
+                if self._capacity is not None:
+                    details['capacity'] = self._capacity
+                details['in_flight'] = self._in_flight
+            response = pr.Notify(**details)
             try:
                 self._proxy.publish(response, routing_key=reply_to)
             except Exception:
@@ -162,6 +266,22 @@ class Server(object):
                              " response '%s'", reply_to, response,
                              exc_info=True)
 
+    def _on_request(self, request, message):
+        """Submit request message for processing (and count it until done)."""
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            fut = self._submit_request(request, message)
+        except Exception:
+            self._on_request_done(None)
+            raise
+        else:
+            fut.add_done_callback(self._on_request_done)
+
+    def _on_request_done(self, fut):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
     def _process_request(self, request, message):
         """Process request message and reply back."""
         LOG.debug("Started processing request message '%s'",
@@ -231,16 +351,22 @@ class Server(object):
         # associate *any* events this task emits with a proxy that will
         # emit them back to the engine... for handling at the engine side
         # of things...
+        if self._event_window is not None:
+            coalescer = _EventCoalescer(
+                functools.partial(self._on_events, reply_to, task_uuid),
+                self._event_window)
+            on_event = coalescer.add
+            # the events that were not sent yet are sent with the result...
+            reply_callback = functools.partial(self._reply_with_events,
+                                               reply_callback, coalescer)
+        else:
+            on_event = functools.partial(self._on_event, reply_to, task_uuid)
         if task.notifier.can_be_registered(nt.Notifier.ANY):
-            task.notifier.register(nt.Notifier.ANY,
-                                   functools.partial(self._on_event,
-                                                     reply_to, task_uuid))
+            task.notifier.register(nt.Notifier.ANY, on_event)
         elif isinstance(task.notifier, nt.RestrictedNotifier):
             # only proxy the allowable events then...
             for event_type in task.notifier.events_iter():
-                task.notifier.register(event_type,
-                                       functools.partial(self._on_event,
-                                                         reply_to, task_uuid))
+                task.notifier.register(event_type, on_event)
 
         # perform the task action
         try:
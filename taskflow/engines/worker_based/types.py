@@ -101,6 +101,8 @@ class WorkerFinder(object):
 
     def __init__(self):
         self._cond = threading.Condition()
+        self._outstanding = {}
+        self._reported_loads = {}
         self.on_worker = None
 
     @abc.abstractmethod
@@ -127,44 +129,85 @@ class WorkerFinder(object):
                 self._cond.wait(watch.leftover(return_none=True))
             return 0
 
-    @staticmethod
-    def _match_worker(task, available_workers):
+    def track_request(self, worker, future):
+        """Tracks a request (until its future is done) sent to a worker."""
+        with self._cond:
+            self._outstanding[worker.topic] = (
+                self._outstanding.get(worker.topic, 0) + 1)
+        future.add_done_callback(
+            lambda fut: self._untrack_request(worker.topic))
+
+    def _untrack_request(self, topic):
+        with self._cond:
+            outstanding = self._outstanding.get(topic, 0) - 1
+            if outstanding > 0:
+                self._outstanding[topic] = outstanding
+            else:
+                self._outstanding.pop(topic, None)
+
+    def _worker_load(self, worker):
+        """Returns how loaded a worker is (relative to other workers).
+
+        This uses the larger of how many requests were sent
+        to the worker (and have not finished) and how many requests the worker
+        last reported it was processing (which includes the ones from others)
+        and divides that by how many requests the worker can process at once
+        (if it reported that, otherwise it is assumed to process one at once).
+        """
+        outstanding = self._outstanding.get(worker.topic, 0)
+        capacity, in_flight = self._reported_loads.get(worker.topic,
+                                                       (None, 0))
+        return max(outstanding, in_flight) / float(capacity or 1)
+
+    def _match_worker(self, task, available_workers):
         """Select a worker (from geq 1 workers) that can best perform the task.
 
         NOTE(harlowja): this method will be activated when there exists
         one one greater than one potential workers that can perform a task,
         the arguments provided will be the potential workers located and the
         task that is being requested to perform and the result should be one
-        of those workers using whatever best-fit algorithm is possible (or
-        random at the least).
+        of those workers using whatever best-fit algorithm is possible. This
+        picks two of the workers at random and then the least loaded one of
+        those two (aka, the power of two choices), which avoids sending
+        requests to slow or saturated workers without every request going to
+        the same least loaded worker (when the loads known are stale).
         """
         if len(available_workers) == 1:
             return available_workers[0]
         else:
-            return random.choice(available_workers)
+            first, second = random.sample(available_workers, 2)
+            if self._worker_load(second) < self._worker_load(first):
+                return second
+            return first
 
     @abc.abstractmethod
     def get_worker_for_task(self, task):
         """Gets a worker that can perform a given task."""
 
     def clear(self):
-        pass
+        with self._cond:
+            self._outstanding.clear()
+            self._reported_loads.clear()
 
 
 class ProxyWorkerFinder(WorkerFinder):
     """Requests and receives responses about workers topic+task details."""
 
-    def __init__(self, uuid, proxy, topics):
+    def __init__(self, uuid, proxy, topics, validate_messages=True):
         super(ProxyWorkerFinder, self).__init__()
         self._proxy = proxy
         self._topics = topics
         self._workers = {}
         self._uuid = uuid
-        self._proxy.dispatcher.type_handlers.update({
-            pr.NOTIFY: [
+        if validate_messages:
+            handler = [
                 self._process_response,
                 functools.partial(pr.Notify.validate, response=True),
-            ],
+            ]
+        else:
+            handler = self._process_response
+        self._proxy.dispatcher.type_handlers.update({
+            pr.NOTIFY: handler,
         })
         self._counter = itertools.count()
 
@@ -209,6 +252,11 @@ class ProxyWorkerFinder(WorkerFinder):
         tasks = response['tasks']
         with self._cond:
             worker, new_or_updated = self._add(topic, tasks)
+            if 'capacity' in response or 'in_flight' in response:
+                self._reported_loads[topic] = (response.get('capacity'),
+                                               response.get('in_flight', 0))
+            else:
+                self._reported_loads.pop(topic, None)
             if new_or_updated:
                 LOG.debug("Received notification about worker '%s' (%s"
                           " total workers are currently known)", worker,
@@ -220,6 +268,7 @@ class ProxyWorkerFinder(WorkerFinder):
     def clear(self):
         with self._cond:
             self._workers.clear()
+            super(ProxyWorkerFinder, self).clear()
             self._cond.notify_all()
 
     def get_worker_for_task(self, task):
@@ -228,7 +277,7 @@ class ProxyWorkerFinder(WorkerFinder):
             for worker in six.itervalues(self._workers):
                 if worker.performs(task):
                     available_workers.append(worker)
-        if available_workers:
-            return self._match_worker(task, available_workers)
-        else:
-            return None
+            if available_workers:
+                return self._match_worker(task, available_workers)
+            else:
+                return None
@@ -86,12 +86,32 @@ class Worker(object):
                               options imply and are expected to be)
     :param retry_options: retry specific options
                           (see: :py:attr:`~.proxy.Proxy.DEFAULT_RETRY_OPTIONS`)
+    :param validate_messages: whether received messages are validated
+                              against the message schemas before being
+                              processed (only turn this off when the workers
+                              and engines are on a trusted network and run
+                              the same version of this library)
+    :param event_window: when provided the events (for example progress
+                         updates) that tasks emit are sent back at most once
+                         per this many seconds (coalesced together, with
+                         only the latest progress update being kept); any
+                         events not yet sent when a task finishes are sent
+                         along with its result (this requires engines that
+                         understand coalesced events)
+    :param report_load: whether the worker reports (in its replies to the
+                        notifications engines periodically send) how many
+                        requests it is processing and how many it can
+                        process at once (when it created its own executor);
+                        engines use this to send requests to the least
+                        loaded workers (this requires engines that
+                        understand these reports)
     """
 
     def __init__(self, exchange, topic, tasks,
                  executor=None, threads_count=None, url=None,
                  transport=None, transport_options=None,
-                 retry_options=None):
+                 retry_options=None, validate_messages=True,
+                 event_window=None, report_load=False):
         self._topic = topic
         self._executor = executor
         self._owns_executor = False
@@ -105,11 +125,19 @@ class Worker(object):
             self._owns_executor = True
         self._endpoints = self._derive_endpoints(tasks)
         self._exchange = exchange
+        if self._owns_executor:
+            capacity = self._threads_count
+        else:
+            capacity = None
         self._server = server.Server(topic, exchange, self._executor,
                                      self._endpoints, url=url,
                                      transport=transport,
                                      transport_options=transport_options,
-                                     retry_options=retry_options)
+                                     retry_options=retry_options,
+                                     validate_messages=validate_messages,
+                                     event_window=event_window,
+                                     report_load=report_load,
+                                     capacity=capacity)
 
     @staticmethod
     def _derive_endpoints(tasks):
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import os
+import sys
+
+logging.basicConfig(level=logging.ERROR)
+
+self_dir = os.path.abspath(os.path.dirname(__file__))
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir,
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+sys.path.insert(0, self_dir)
+
+
+# INTRO: this examples shows how a (large) number of items can be mapped
+# over (in parallel) without making a task for each item; the items are
+# split into a few chunks, each chunk is mapped by a single task (whose
+# results are saved once it finishes) and then those results are gathered
+# into a single list that a reducer then sums up.
+
+from taskflow import engines
+from taskflow.patterns import linear_flow
+from taskflow.patterns import map_flow
+from taskflow import task
+
+
+def square_all(numbers):
+    # Called once per chunk (with all the numbers in that chunk).
+    return [number * number for number in numbers]
+
+
+class SumReducer(task.Task):
+    def execute(self, squares):
+        return sum(squares)
+
+
+# Upper bound of numbers to square (and then sum).
+UPPER_BOUND = 1000000
+
+# How many chunks (and therefore mapping tasks) the numbers are split into.
+CHUNKS = 10
+
+w = linear_flow.Flow("root")
+w.add(map_flow.Flow("square", square_all, "numbers", "squares",
+                    chunks=CHUNKS, per_chunk=True))
+w.add(SumReducer("reducer"))
+
+e = engines.load(w, engine='parallel', max_workers=4,
+                 store={'numbers': list(range(0, UPPER_BOUND))})
+e.run()
+
+total = e.storage.get('reducer')
+print("Calculated result = %s" % total)
+
+# Calculate it manually to verify that it worked...
+calc_total = sum(i * i for i in range(0, UPPER_BOUND))
+if calc_total != total:
+    sys.exit(1)
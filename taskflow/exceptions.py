@@ -106,6 +106,10 @@ class RequestTimeout(ExecutionFailure):
     """Raised when a worker request was not finished within allotted time."""
 
 
+class ExecutionTimeout(ExecutionFailure):
+    """Raised when a task did not finish running within its allotted time."""
+
+
 class InvalidState(ExecutionFailure):
     """Raised when a invalid state transition is attempted while executing."""
 
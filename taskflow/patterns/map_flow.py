@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from taskflow import flow
+from taskflow import task
+
+# How many chunks the items are split into (when not provided).
+DEFAULT_CHUNKS = 8
+
+_LINK_METADATA = {flow.LINK_INVARIANT: True}
+
+
+class Flow(flow.Flow):
+    """Batch map flow pattern.
+
+    Maps a callable over the items of a sequence (required under the
+    ``requires`` name) and provides the list of the results (under the
+    ``provides`` name, in the order of the items they were produced from).
+
+    Instead of using a task per item the items are split into ``chunks``
+    chunks, each one mapped by a :py:class:`~taskflow.task.BatchMapTask`
+    (these can run in parallel, using whichever executor the engine uses)
+    and then a :py:class:`~taskflow.task.BatchGatherTask` gathers the
+    results of those. Since the number of atoms (and the number of atom
+    details that are persisted, and the number of futures that are waited
+    on) depends on the number of chunks and not on the number of items
+    this makes mapping over (very) large sequences feasible; the results of
+    each chunk are persisted when it finishes, so resuming only maps the
+    chunks that had not finished.
+
+    Each chunk task requires the whole sequence and slices its own chunk out
+    of it, so the chunks themselves are never persisted (only the sequence
+    and the results are); executors that run tasks in other processes (or
+    on other workers) do send the whole sequence to each chunk task though,
+    so fewer chunks are better when using those.
+
+    When ``per_chunk`` is false the callable is called with each item; when
+    true it is called with the list of items in each chunk (and returns an
+    iterable of the results for those items).
+
+    The atoms are created by this flow, so other atoms (or flows) can not be
+    added to it; since the atoms names (and the names of what they provide)
+    are derived from this flows name those should be unique.
+    """
+
+    def __init__(self, name, functor, requires, provides,
+                 chunks=DEFAULT_CHUNKS, per_chunk=False, retry=None):
+        super(Flow, self).__init__(name, retry)
+        if chunks <= 0:
+            raise ValueError("Chunks must be greater than zero")
+        self._mappers = []
+        for i in range(0, chunks):
+            mapper_name = "%s-chunk-%s" % (self.name, i)
+            self._mappers.append(task.BatchMapTask(functor, i, chunks,
+                                                   requires,
+                                                   name=mapper_name,
+                                                   provides=mapper_name,
+                                                   per_chunk=per_chunk))
+        self._gatherer = task.BatchGatherTask(
+            [mapper.name for mapper in self._mappers],
+            name="%s-gather" % self.name, provides=provides)
+
+    def add(self, *items):
+        """Not supported (the atoms of this flow are created by it)."""
+        raise TypeError("Atoms (or flows) can not be added to a batch map"
+                        " flow")
+
+    def __len__(self):
+        return len(self._mappers) + 1
+
+    def __iter__(self):
+        for mapper in self._mappers:
+            yield mapper
+        yield self._gatherer
+
+    def iter_links(self):
+        for mapper in self._mappers:
+            yield (mapper, self._gatherer, _LINK_METADATA.copy())
+
+    @property
+    def requires(self):
+        requires = set()
+        retry_provides = set()
+        if self._retry is not None:
+            requires.update(self._retry.requires)
+            retry_provides.update(self._retry.provides)
+        for mapper in self._mappers:
+            requires.update(mapper.requires - retry_provides)
+        return frozenset(requires)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+import functools
+
+import six
+
+from taskflow.utils import asyncio_utils as au
+
+# What ends an ``async for`` loop (this does not exist before python 3.5,
+# but then again neither does ``async for``).
+_StopAsyncIteration = getattr(six.moves.builtins, 'StopAsyncIteration',
+                              StopIteration)
+
+
+class AsyncIterator(object):
+    """An asynchronous iterator over the items some asyncio future produces.
+
+    Usable with ``async for`` (the items are fetched lazily, when the first
+    item is asked for the iterable the future produced is iterated over).
+    """
+
+    def __init__(self, loop, future):
+        self._loop = loop
+        self._future = future
+        self._iterator = None
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        fetched = au.asyncio.Future(loop=self._loop)
+        if self._future.done():
+            self._fetch(fetched)
+        else:
+            self._future.add_done_callback(
+                lambda _future: self._fetch(fetched))
+        return fetched
+
+    def _fetch(self, fetched):
+        if fetched.cancelled():
+            return
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._future.result())
+            fetched.set_result(six.next(self._iterator))
+        except StopIteration:
+            fetched.set_exception(_StopAsyncIteration())
+        except Exception as e:
+            fetched.set_exception(e)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class AsyncConnection(object):
+    """Base class for asyncio friendly backend connections.
+
+    Wraps a (blocking) :py:class:`~taskflow.persistence.base.Connection` and
+    mirrors its methods, except that each method here returns an asyncio
+    future (that can be awaited on) instead of blocking and the methods that
+    return iterators return :py:class:`.AsyncIterator` objects (that can be
+    used with ``async for``).
+    """
+
+    def __init__(self, connection, loop=None):
+        au.check_for_asyncio()
+        self._connection = connection
+        self._loop = loop
+
+    @property
+    def connection(self):
+        """The (blocking) connection this connection wraps."""
+        return self._connection
+
+    @property
+    def backend(self):
+        """Returns the backend this connection is associated with."""
+        return self._connection.backend
+
+    @property
+    def loop(self):
+        """The event loop the returned futures are associated with."""
+        if self._loop is None:
+            return au.asyncio.get_event_loop()
+        return self._loop
+
+    @abc.abstractmethod
+    def _submit(self, functor, *args, **kwargs):
+        """Calls the functor and returns an asyncio future of its outcome."""
+
+    def _iterate(self, functor, *args, **kwargs):
+        return AsyncIterator(self.loop, self._submit(functor, *args, **kwargs))
+
+    def close(self):
+        """Closes any resources this connection has open."""
+        return self._submit(self._connection.close)
+
+    def upgrade(self):
+        """Migrate the persistence backend to the most recent version."""
+        return self._submit(self._connection.upgrade)
+
+    def clear_all(self):
+        """Clear all entries from this backend."""
+        return self._submit(self._connection.clear_all)
+
+    def validate(self):
+        """Validates that a backend is still ok to be used."""
+        return self._submit(self._connection.validate)
+
+    def update_atom_details(self, atom_detail):
+        """Updates a given atom details and returns the updated version."""
+        return self._submit(self._connection.update_atom_details,
+                            atom_detail)
+
+    def update_flow_details(self, flow_detail):
+        """Updates a given flow details and returns the updated version."""
+        return self._submit(self._connection.update_flow_details,
+                            flow_detail)
+
+    def save_logbook(self, book):
+        """Saves a logbook, and all its contained information."""
+        return self._submit(self._connection.save_logbook, book)
+
+    def destroy_logbook(self, book_uuid):
+        """Deletes/destroys a logbook matching the given uuid."""
+        return self._submit(self._connection.destroy_logbook, book_uuid)
+
+    def get_logbook(self, book_uuid):
+        """Fetches a logbook object matching the given uuid."""
+        return self._submit(self._connection.get_logbook, book_uuid)
+
+    def get_logbooks(self):
+        """Asynchronously iterates over all logbooks."""
+        return self._iterate(self._connection.get_logbooks)
+
+    def iter_flow_details(self, states=None, updated_before=None):
+        """Asynchronously iterates over (filtered) flow details."""
+        return self._iterate(self._connection.iter_flow_details,
+                             states=states, updated_before=updated_before)
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        """Asynchronously iterates over (filtered) atom details of a flow."""
+        return self._iterate(self._connection.iter_atom_details,
+                             flow_uuid, states=states)
+
+    def prune(self, *args, **kwargs):
+        """Destroys (in bulk) the logbooks of flows that finished long ago."""
+        return self._submit(self._connection.prune, *args, **kwargs)
+
+
+class ThreadedAsyncConnection(AsyncConnection):
+    """Runs the wrapped connections (blocking) calls in an executor.
+
+    The loops default executor is used when no executor is provided. Since
+    the iterators of most connections are not safe to resume from different
+    threads the iterator methods gather all items in one executor call (and
+    then hand them out one at a time).
+    """
+
+    def __init__(self, connection, loop=None, executor=None):
+        super(ThreadedAsyncConnection, self).__init__(connection, loop=loop)
+        self._executor = executor
+
+    def _submit(self, functor, *args, **kwargs):
+        if kwargs:
+            functor = functools.partial(functor, **kwargs)
+        return self.loop.run_in_executor(self._executor, functor, *args)
+
+    def _iterate(self, functor, *args, **kwargs):
+
+        def _gather():
+            return list(functor(*args, **kwargs))
+
+        return AsyncIterator(self.loop, self._submit(_gather))
+
+
+class InlineAsyncConnection(AsyncConnection):
+    """Runs the wrapped connections calls directly (in the loops thread).
+
+    This is only appropriate for connections that never block (for example
+    connections to the in-memory backend); the returned futures are already
+    done and the iterator methods iterate lazily over the wrapped
+    connections iterators.
+    """
+
+    def _submit(self, functor, *args, **kwargs):
+        return au.make_completed_future(self.loop, functor, *args, **kwargs)
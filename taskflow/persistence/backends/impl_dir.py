@@ -15,6 +15,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 import errno
 import os
 import shutil
@@ -25,12 +26,33 @@ import six
 from taskflow import exceptions as exc
 from taskflow import logging
 from taskflow.persistence import base
+from taskflow.persistence import codec
 from taskflow.persistence import logbook
+from taskflow.types import cache
 from taskflow.utils import lock_utils
 from taskflow.utils import misc
 
 LOG = logging.getLogger(__name__)
 
+# Default maximum size (in bytes, of the files they were read from) of the
+# objects that each backend will keep cached.
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
+
+
+def _make_validator(stat):
+    # A cached object is only valid while the file it was read from still
+    # has the same modification time, size and inode (this is how changes
+    # made by other processes, or other backend instances, are noticed).
+    return (stat.st_mtime, stat.st_size, stat.st_ino)
+
+
+def _clone(obj):
+    # The cached objects are never handed out directly (so that callers can
+    # freely alter what they get without altering what is cached).
+    if isinstance(obj, (logbook.LogBook, logbook.FlowDetail)):
+        return obj.copy(retain_contents=False)
+    return obj.copy()
+
 
 class DirBackend(base.Backend):
     """A directory and file based backend.
@@ -46,6 +68,18 @@ class DirBackend(base.Backend):
     guarantee that there will be no interprocess race conditions when
     writing and reading by using a consistent hierarchy of file based locks.
 
+    Atom details are written using the codec that the ``serializer``,
+    ``compression`` and ``compression_threshold`` configuration keys select
+    (see :py:func:`~taskflow.persistence.codec.fetch`); atom details written
+    with any codec (or written before codecs were selectable) can be read.
+
+    The objects read from (and written to) files are kept in a least recently
+    used cache, that holds objects read from at most ``cache_size`` bytes
+    worth of files (defaults to 16MiB, zero disables caching); each cached
+    object is validated against the modification time, size and inode of its
+    file before it is used. The :py:attr:`.file_cache` statistics can be used
+    to see how effective this cache is.
+
     Example configuration::
 
         conf = {
@@ -56,7 +90,9 @@ class DirBackend(base.Backend):
         super(DirBackend, self).__init__(conf)
         self._path = os.path.abspath(conf['path'])
         self._lock_path = os.path.join(self._path, 'locks')
-        self._file_cache = {}
+        self._file_cache = cache.LRUCache(misc.as_int(
+            self._conf.get('cache_size', DEFAULT_CACHE_SIZE)))
+        self._codec = codec.fetch(self._conf)
 
     @property
     def lock_path(self):
@@ -66,6 +102,18 @@ class DirBackend(base.Backend):
     def base_path(self):
         return self._path
 
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def file_cache(self):
+        """The cache of objects read from (and written to) files.
+
+        See :py:class:`~taskflow.types.cache.LRUCache`.
+        """
+        return self._file_cache
+
     def get_connection(self):
         return Connection(self)
 
@@ -76,7 +124,8 @@ class DirBackend(base.Backend):
 class Connection(base.Connection):
     def __init__(self, backend):
         self._backend = backend
-        self._file_cache = self._backend._file_cache
+        self._file_cache = self._backend.file_cache
+        self._codec = self._backend.codec
         self._flow_path = os.path.join(self._backend.base_path, 'flows')
         self._atom_path = os.path.join(self._backend.base_path, 'atoms')
         self._book_path = os.path.join(self._backend.base_path, 'books')
@@ -94,24 +143,42 @@ class Connection(base.Connection):
             if not os.path.isdir(p):
                 raise RuntimeError("Missing required directory: %s" % (p))
 
-    def _read_from(self, filename):
-        # This is very similar to the oslo-incubator fileutils module, but
-        # tweaked to not depend on a global cache, as well as tweaked to not
-        # pull-in the oslo logging module (which is a huge pile of code).
-        mtime = os.path.getmtime(filename)
-        cache_info = self._file_cache.setdefault(filename, {})
-        if not cache_info or mtime > cache_info.get('mtime', 0):
+    def _read_from(self, filename, loader):
+        """Reads (and loads) a files object (using the cache if valid)."""
+        validator = _make_validator(os.stat(filename))
+        obj = self._file_cache.get(filename, validator=validator)
+        if obj is None:
             with open(filename, 'rb') as fp:
-                cache_info['data'] = fp.read().decode('utf-8')
-                cache_info['mtime'] = mtime
-        return cache_info['data']
-
-    def _write_to(self, filename, contents):
+                contents = fp.read()
+            obj = loader(contents)
+            self._file_cache.put(filename, obj, len(contents),
+                                 validator=validator)
+        return _clone(obj)
+
+    def _write_to(self, filename, contents, obj):
+        """Writes a files contents (and caches the object it came from)."""
         if isinstance(contents, six.text_type):
             contents = contents.encode('utf-8')
         with open(filename, 'wb') as fp:
             fp.write(contents)
-        self._file_cache.pop(filename, None)
+            fp.flush()
+            validator = _make_validator(os.fstat(fp.fileno()))
+        self._file_cache.put(filename, _clone(obj), len(contents),
+                             validator=validator)
+
+    def _load_atom_details(self, contents):
+        ad_data = self._codec.decode(contents)
+        ad_cls = logbook.atom_detail_class(ad_data['type'])
+        return ad_cls.from_dict(ad_data['atom'])
+
+    @staticmethod
+    def _load_flow_details(contents):
+        return logbook.FlowDetail.from_dict(misc.decode_json(contents))
+
+    @staticmethod
+    def _load_logbook(contents):
+        return logbook.LogBook.from_dict(misc.decode_json(contents),
+                                         unmarshal_time=True)
 
     def _run_with_process_lock(self, lock_name, functor, *args, **kwargs):
         lock_path = os.path.join(self.backend.lock_path, lock_name)
@@ -168,7 +235,7 @@ class Connection(base.Connection):
             atom_detail = e_ad.merge(atom_detail)
         ad_path = os.path.join(self._atom_path, atom_detail.uuid)
         ad_data = base._format_atom(atom_detail)
-        self._write_to(ad_path, jsonutils.dumps(ad_data))
+        self._write_to(ad_path, self._codec.encode(ad_data), atom_detail)
         return atom_detail
 
     def update_atom_details(self, atom_detail):
@@ -181,9 +248,7 @@ class Connection(base.Connection):
 
         def _get():
             ad_path = os.path.join(self._atom_path, uuid)
-            ad_data = misc.decode_json(self._read_from(ad_path))
-            ad_cls = logbook.atom_detail_class(ad_data['type'])
-            return ad_cls.from_dict(ad_data['atom'])
+            return self._read_from(ad_path, self._load_atom_details)
 
         if lock:
             return self._run_with_process_lock('atom', _get)
@@ -195,8 +260,7 @@ class Connection(base.Connection):
         def _get():
             fd_path = os.path.join(self._flow_path, uuid)
             meta_path = os.path.join(fd_path, 'metadata')
-            meta = misc.decode_json(self._read_from(meta_path))
-            fd = logbook.FlowDetail.from_dict(meta)
+            fd = self._read_from(meta_path, self._load_flow_details)
             ad_to_load = []
             ad_path = os.path.join(fd_path, 'atoms')
             try:
@@ -243,7 +307,7 @@ class Connection(base.Connection):
         flow_path = os.path.join(self._flow_path, flow_detail.uuid)
         misc.ensure_tree(flow_path)
         self._write_to(os.path.join(flow_path, 'metadata'),
-                       jsonutils.dumps(flow_detail.to_dict()))
+                       jsonutils.dumps(flow_detail.to_dict()), flow_detail)
         if len(flow_detail):
             atom_path = os.path.join(flow_path, 'atoms')
             misc.ensure_tree(atom_path)
@@ -285,7 +349,8 @@ class Connection(base.Connection):
         book_path = os.path.join(self._book_path, book.uuid)
         misc.ensure_tree(book_path)
         self._write_to(os.path.join(book_path, 'metadata'),
-                       jsonutils.dumps(book.to_dict(marshal_time=True)))
+                       jsonutils.dumps(book.to_dict(marshal_time=True)),
+                       book)
         if len(book):
             flow_path = os.path.join(book_path, 'flows')
             misc.ensure_tree(flow_path)
@@ -377,17 +442,105 @@ class Connection(base.Connection):
         # Acquire all locks by going through this little hierarchy.
         self._run_with_process_lock("book", _destroy_book)
 
+    @staticmethod
+    def _remove_tree(path):
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise exc.StorageFailure("Unable to remove %s" % path, e)
+
+    @staticmethod
+    def _list_links(path):
+        try:
+            return [f for f in os.listdir(path)
+                    if os.path.islink(os.path.join(path, f))]
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return []
+
+    def _find_prunable(self, book_uuid, states, updated_before):
+        """Finds what to remove to prune a logbook (none if it can't be)."""
+        fd_uuids = self._list_links(os.path.join(self._book_path, book_uuid,
+                                                 'flows'))
+        if not fd_uuids:
+            return None
+        flows = []
+        for fd_uuid in fd_uuids:
+            fd_path = os.path.join(self._flow_path, fd_uuid)
+            meta_path = os.path.join(fd_path, 'metadata')
+            try:
+                updated_at = datetime.datetime.utcfromtimestamp(
+                    os.path.getmtime(meta_path))
+                if updated_at >= updated_before:
+                    return None
+                fd = self._read_from(meta_path, self._load_flow_details)
+            except EnvironmentError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+                return None
+            if fd.state not in states:
+                return None
+            flows.append((fd_uuid,
+                          self._list_links(os.path.join(fd_path, 'atoms'))))
+        return flows
+
+    def _prune_books(self, book_uuids, states, updated_before):
+        pruned = 0
+        for book_uuid in book_uuids:
+            flows = self._find_prunable(book_uuid, states, updated_before)
+            if flows is None:
+                continue
+            for (fd_uuid, ad_uuids) in flows:
+                for ad_uuid in ad_uuids:
+                    self._remove_tree(os.path.join(self._atom_path, ad_uuid))
+                self._remove_tree(os.path.join(self._flow_path, fd_uuid))
+            self._remove_tree(os.path.join(self._book_path, book_uuid))
+            pruned += 1
+        return pruned
+
+    def prune(self, older_than, states=base.FINISHED_STATES,
+              batch_size=base.PRUNE_BATCH_SIZE):
+        updated_before = base._prune_cutoff(older_than)
+        base._check_batch_size(batch_size)
+        states = frozenset(states)
+        try:
+            book_uuids = [d for d in os.listdir(self._book_path)
+                          if os.path.isdir(os.path.join(self._book_path, d))]
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise exc.StorageFailure("Unable to fetch logbooks", e)
+            book_uuids = []
+
+        def _step_atom(batch):
+            return self._run_with_process_lock("atom", self._prune_books,
+                                               batch, states, updated_before)
+
+        def _step_flow(batch):
+            return self._run_with_process_lock("flow", _step_atom, batch)
+
+        # Acquire all locks (once per batch, instead of once per logbook) by
+        # going through the same little hierarchy that destroying uses.
+        pruned = 0
+        for i in range(0, len(book_uuids), batch_size):
+            pruned += self._run_with_process_lock(
+                "book", _step_flow, book_uuids[i:i + batch_size])
+        return pruned
+
     def _get_logbook(self, book_uuid):
         book_path = os.path.join(self._book_path, book_uuid)
         meta_path = os.path.join(book_path, 'metadata')
         try:
-            meta = misc.decode_json(self._read_from(meta_path))
+            lb = self._read_from(meta_path, self._load_logbook)
         except EnvironmentError as e:
             if e.errno == errno.ENOENT:
                 raise exc.NotFound("No logbook found with id: %s" % book_uuid)
             else:
                 raise
-        lb = logbook.LogBook.from_dict(meta, unmarshal_time=True)
         fd_path = os.path.join(book_path, 'flows')
         fd_uuids = []
         try:
@@ -403,3 +556,79 @@ class Connection(base.Connection):
     def get_logbook(self, book_uuid):
         return self._run_with_process_lock("book",
                                            self._get_logbook, book_uuid)
+
+    def _get_flow_details_if(self, uuid, states, updated_before):
+        # Only load the full flow detail (and its atom details) when the
+        # flow details metadata matches what is being looked for.
+        meta_path = os.path.join(self._flow_path, uuid, 'metadata')
+        try:
+            if updated_before is not None:
+                updated_at = datetime.datetime.utcfromtimestamp(
+                    os.path.getmtime(meta_path))
+                if updated_at >= updated_before:
+                    return None
+            if states is not None:
+                fd = self._read_from(meta_path, self._load_flow_details)
+                if fd.state not in states:
+                    return None
+            return self._get_flow_details(uuid, lock=False)
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return None
+
+    def _iter_flow_details(self, states, updated_before):
+        fd_uuids = []
+        try:
+            fd_uuids = [d for d in os.listdir(self._flow_path)
+                        if os.path.isdir(os.path.join(self._flow_path, d))]
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        for fd_uuid in fd_uuids:
+            fd = self._run_with_process_lock("flow",
+                                             self._get_flow_details_if,
+                                             fd_uuid, states, updated_before)
+            if fd is not None:
+                yield fd
+
+    def iter_flow_details(self, states=None, updated_before=None):
+        if states is not None:
+            states = frozenset(states)
+        try:
+            flow_details = list(self._iter_flow_details(states,
+                                                        updated_before))
+        except EnvironmentError as e:
+            raise exc.StorageFailure("Unable to fetch flow details", e)
+        else:
+            for fd in flow_details:
+                yield fd
+
+    def _get_atom_details_of(self, flow_uuid, states):
+        fd_path = os.path.join(self._flow_path, flow_uuid)
+        if not os.path.isdir(fd_path):
+            raise exc.NotFound("No flow details found with id: %s"
+                               % flow_uuid)
+        ad_path = os.path.join(fd_path, 'atoms')
+        ad_uuids = []
+        try:
+            ad_uuids = [f for f in os.listdir(ad_path)
+                        if os.path.islink(os.path.join(ad_path, f))]
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        atom_details = []
+        for ad_uuid in ad_uuids:
+            ad = self._get_atom_details(ad_uuid)
+            if states is None or ad.state in states:
+                atom_details.append(ad)
+        return atom_details
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        if states is not None:
+            states = frozenset(states)
+        atom_details = self._run_with_process_lock("flow",
+                                                   self._get_atom_details_of,
+                                                   flow_uuid, states)
+        for ad in atom_details:
+            yield ad
@@ -0,0 +1,657 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import datetime
+import errno
+import os
+import struct
+import threading
+import time
+import zlib
+
+from oslo_utils import strutils
+import six
+
+from taskflow import exceptions as exc
+from taskflow import logging
+from taskflow.persistence import base
+from taskflow.persistence import codec
+from taskflow.persistence import logbook
+from taskflow.utils import lock_utils
+from taskflow.utils import misc
+
+LOG = logging.getLogger(__name__)
+
+# Each record in a segment is prefixed by a header made up of the length of
+# the encoded record and the crc32 checksum of the encoded record.
+_HEADER = struct.Struct('!II')
+
+# Segments are compacted once they contain at least this many records (and
+# more than twice as many records as there are live objects in them).
+DEFAULT_COMPACTION_THRESHOLD = 1024
+
+# How many locks (and lock files) the logbooks are spread over; since the
+# lock of a logbook is picked by its uuid all processes that share a path
+# must use the same number of them.
+_LOCK_STRIPES = 64
+
+# Prefer an atomic replace when available (it does not fail on windows when
+# the target already exists, like rename does).
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _checksum(blob):
+    return zlib.crc32(blob) & 0xffffffff
+
+
+class _Segment(object):
+    """In-memory index of the (applied) records of one logbook segment."""
+
+    def __init__(self, book_uuid, identity=None):
+        self.book_uuid = book_uuid
+        # The inode number alone is not enough to tell if a segment file has
+        # been replaced (the number may be reused once the old file is gone)
+        # so it is combined with the header of the first record (which, due
+        # to its timestamp, differs each time a segment is written).
+        self.identity = identity
+        self.offset = 0
+        # The offset at which a torn (partially written) record was last
+        # found (so that it is only warned about once).
+        self.torn_offset = None
+        self.record_count = 0
+        self.book = None
+        self.flows = {}
+        self.flow_updated_at = {}
+        self.atoms = {}
+        # The uuids of the atoms (in the atoms above) each flow owns.
+        self.flow_atoms = {}
+
+    @property
+    def live_count(self):
+        return 1 + len(self.flows) + len(self.atoms)
+
+    def apply(self, record):
+        kind = record['kind']
+        data = record['data']
+        if kind == 'book':
+            self.book = data
+        elif kind == 'flow':
+            self.flows[data['uuid']] = data
+            self.flow_updated_at[data['uuid']] = record['ts']
+        elif kind == 'atom':
+            ad_uuid = data['atom']['uuid']
+            fd_uuid = record['flow']
+            try:
+                old_fd_uuid, _old_data = self.atoms[ad_uuid]
+            except KeyError:
+                pass
+            else:
+                if old_fd_uuid != fd_uuid:
+                    self.flow_atoms[old_fd_uuid].discard(ad_uuid)
+            self.atoms[ad_uuid] = (fd_uuid, data)
+            self.flow_atoms.setdefault(fd_uuid, set()).add(ad_uuid)
+        else:
+            raise ValueError("Unknown record kind '%s'" % kind)
+        self.record_count += 1
+
+    def snapshot(self):
+        """Returns the minimal list of records that recreate this segment."""
+        records = [_make_record('book', self.book)]
+        for (fd_uuid, fd_data) in six.iteritems(self.flows):
+            records.append(_make_record('flow', fd_data,
+                                        ts=self.flow_updated_at[fd_uuid]))
+        for (fd_uuid, ad_data) in six.itervalues(self.atoms):
+            records.append(_make_record('atom', ad_data, flow=fd_uuid))
+        return records
+
+    def build_atom(self, ad_uuid):
+        _fd_uuid, ad_data = self.atoms[ad_uuid]
+        ad_cls = logbook.atom_detail_class(ad_data['type'])
+        return ad_cls.from_dict(ad_data['atom'])
+
+    def build_flow(self, fd_uuid):
+        fd = logbook.FlowDetail.from_dict(self.flows[fd_uuid])
+        for ad_uuid in self.flow_atoms.get(fd_uuid, ()):
+            fd.add(self.build_atom(ad_uuid))
+        return fd
+
+    def build_book(self):
+        lb = logbook.LogBook.from_dict(self.book, unmarshal_time=True)
+        for fd_uuid in six.iterkeys(self.flows):
+            lb.add(self.build_flow(fd_uuid))
+        return lb
+
+
+def _identify(stat, first_header):
+    return (stat.st_ino, first_header)
+
+
+def _make_record(kind, data, flow=None, ts=None):
+    if ts is None:
+        ts = time.time()
+    record = {
+        'kind': kind,
+        'ts': ts,
+        'data': data,
+    }
+    if flow is not None:
+        record['flow'] = flow
+    return record
+
+
+class LogBackend(base.Backend):
+    """A log-structured (append-only) directory and file based backend.
+
+    This backend writes each logbook (and the flow details and atom details
+    it contains) to its own segment file in a provided base path on the local
+    filesystem. Saving or updating an object appends a record describing the
+    new version of *only* that object to the segment of the logbook that owns
+    it (nothing is ever rewritten in-place), and reading uses an in-memory
+    index of each segment that is (re)built from its records when the
+    segment is first accessed (and is incrementally kept up to date with
+    records appended by other processes after that).
+
+    Once a segment contains mostly superseded records it is compacted (its
+    live records are written to a new segment which then atomically replaces
+    the old one).
+
+    Instead of a process-wide set of file locks (which the
+    :py:class:`~taskflow.persistence.backends.impl_dir.DirBackend` uses) the
+    logbooks are spread (by their uuid) over a fixed set of file based locks,
+    so that engines working with different logbooks (mostly) do not contend
+    with each other, without needing a lock (or lock file) for each logbook
+    that ever existed. Like that backend,
+    this backend does *not* provide true transactional semantics (but a
+    partially written record, for example due to a crash, is detected and
+    discarded).
+
+    Records are encoded using the codec that the ``serializer``,
+    ``compression`` and ``compression_threshold`` configuration keys select
+    (see :py:func:`~taskflow.persistence.codec.fetch`); the
+    ``compaction_threshold`` key alters how many records a segment must
+    contain before it is considered for compaction and the ``sync`` key
+    (defaults to false) makes each write be flushed to disk (via
+    ``fsync``) before it is considered complete.
+
+    Example configuration::
+
+        conf = {
+            "path": "/tmp/taskflow",
+        }
+    """
+    def __init__(self, conf):
+        super(LogBackend, self).__init__(conf)
+        self._path = os.path.abspath(conf['path'])
+        self._lock_path = os.path.join(self._path, 'locks')
+        self._book_path = os.path.join(self._path, 'books')
+        self._codec = codec.fetch(self._conf)
+        self._compaction_threshold = misc.as_int(
+            self._conf.get('compaction_threshold',
+                           DEFAULT_COMPACTION_THRESHOLD))
+        self._sync = strutils.bool_from_string(self._conf.get('sync', False))
+        # Shared by all connections (access to these is guarded by the
+        # index lock, access to a single segment is guarded by the lock for
+        # the logbook that segment belongs to).
+        self._segments = {}
+        self._flow_books = {}
+        self._atom_books = {}
+        self._book_locks = [threading.Lock()
+                            for _i in range(0, _LOCK_STRIPES)]
+        self._index_lock = threading.Lock()
+
+    @property
+    def lock_path(self):
+        return self._lock_path
+
+    @property
+    def base_path(self):
+        return self._path
+
+    @property
+    def book_path(self):
+        return self._book_path
+
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def compaction_threshold(self):
+        return self._compaction_threshold
+
+    @property
+    def sync(self):
+        return self._sync
+
+    def get_connection(self):
+        return Connection(self)
+
+    def close(self):
+        pass
+
+
+class Connection(base.Connection):
+    def __init__(self, backend):
+        self._backend = backend
+        self._codec = backend.codec
+        self._segments = backend._segments
+        self._flow_books = backend._flow_books
+        self._atom_books = backend._atom_books
+        self._book_locks = backend._book_locks
+        self._index_lock = backend._index_lock
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def close(self):
+        pass
+
+    def validate(self):
+        # Verify key paths exist.
+        paths = [
+            self._backend.base_path,
+            self._backend.lock_path,
+            self._backend.book_path,
+        ]
+        for p in paths:
+            if not os.path.isdir(p):
+                raise RuntimeError("Missing required directory: %s" % (p))
+
+    def upgrade(self):
+        for path in (self._backend.base_path, self._backend.lock_path,
+                     self._backend.book_path):
+            try:
+                misc.ensure_tree(path)
+            except EnvironmentError as e:
+                raise exc.StorageFailure("Unable to create logbooks required"
+                                         " path %s" % path, e)
+
+    def _segment_path(self, book_uuid):
+        return os.path.join(self._backend.book_path, book_uuid)
+
+    def _list_books(self):
+        try:
+            return [f for f in os.listdir(self._backend.book_path)
+                    if not f.startswith(".")]
+        except EnvironmentError as e:
+            if e.errno == errno.ENOENT:
+                return []
+            raise exc.StorageFailure("Unable to list logbooks", e)
+
+    @contextlib.contextmanager
+    def _book_lock(self, book_uuid):
+        # The stripe must be the same in every process (so the builtin
+        # hash, which may be randomized per process, can not be used).
+        stripe = _checksum(misc.binary_encode(book_uuid)) % _LOCK_STRIPES
+        lock = self._book_locks[stripe]
+        # The interprocess lock is not safe to use from multiple threads at
+        # once (closing its file descriptor in one thread drops the lock the
+        # other thread may hold) so threads in this process must first
+        # coordinate among themselves.
+        lock_path = os.path.join(self._backend.lock_path, str(stripe))
+        with lock:
+            with lock_utils.InterProcessLock(lock_path):
+                yield
+
+    def _run_with_book_lock(self, book_uuid, functor, *args, **kwargs):
+        with self._book_lock(book_uuid):
+            try:
+                return functor(*args, **kwargs)
+            except exc.TaskFlowException:
+                raise
+            except Exception as e:
+                LOG.exception("Failed running locking segment based session")
+                # Trap all other errors as storage errors.
+                raise exc.StorageFailure("Storage backend internal error", e)
+
+    def _forget(self, segment):
+        with self._index_lock:
+            for fd_uuid in six.iterkeys(segment.flows):
+                self._flow_books.pop(fd_uuid, None)
+            for ad_uuid in six.iterkeys(segment.atoms):
+                self._atom_books.pop(ad_uuid, None)
+            if self._segments.get(segment.book_uuid) is segment:
+                self._segments.pop(segment.book_uuid)
+
+    def _remember(self, segment):
+        with self._index_lock:
+            self._segments[segment.book_uuid] = segment
+            for fd_uuid in six.iterkeys(segment.flows):
+                self._flow_books[fd_uuid] = segment.book_uuid
+            for ad_uuid in six.iterkeys(segment.atoms):
+                self._atom_books[ad_uuid] = segment.book_uuid
+
+    def _read_records(self, segment, fp):
+        """Reads & applies all complete records after the segments offset.
+
+        Returns how many trailing bytes did not form a complete record.
+        """
+        fp.seek(segment.offset)
+        blob = fp.read()
+        pos = 0
+        while pos + _HEADER.size <= len(blob):
+            length, checksum = _HEADER.unpack_from(blob, pos)
+            start = pos + _HEADER.size
+            end = start + length
+            if end > len(blob):
+                break
+            encoded = blob[start:end]
+            if _checksum(encoded) != checksum:
+                break
+            segment.apply(self._codec.decode(encoded))
+            pos = end
+        segment.offset += pos
+        return len(blob) - pos
+
+    def _drop_torn_tail(self, segment, trailing):
+        """Truncates a torn record off a segment (must hold the book lock)."""
+        # Appends are done while holding the book lock, so trailing bytes
+        # seen while holding it are left over by a writer that died while
+        # appending (and not by one that is still appending).
+        if segment.torn_offset != segment.offset:
+            LOG.warn("Dropping %s trailing bytes of segment '%s' that do not"
+                     " form a complete record", trailing, segment.book_uuid)
+            segment.torn_offset = segment.offset
+        else:
+            LOG.debug("Dropping %s trailing bytes of segment '%s' that do"
+                      " not form a complete record", trailing,
+                      segment.book_uuid)
+        try:
+            with open(self._segment_path(segment.book_uuid), 'r+b') as fp:
+                fp.truncate(segment.offset)
+                self._flush(fp)
+        except EnvironmentError:
+            LOG.debug("Failed truncating segment '%s' to %s bytes",
+                      segment.book_uuid, segment.offset, exc_info=True)
+
+    def _sync(self, book_uuid):
+        """Brings the segment index up to date (must hold the book lock)."""
+        with self._index_lock:
+            segment = self._segments.get(book_uuid)
+        path = self._segment_path(book_uuid)
+        try:
+            fp = open(path, 'rb')
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            if segment is not None:
+                self._forget(segment)
+            return None
+        with fp:
+            stat = os.fstat(fp.fileno())
+            identity = _identify(stat, fp.read(_HEADER.size))
+            if (segment is None or segment.identity != identity or
+                    stat.st_size < segment.offset):
+                # Either never loaded or it was replaced (by compaction or
+                # by being destroyed and recreated) so start over...
+                if segment is not None:
+                    self._forget(segment)
+                segment = _Segment(book_uuid, identity=identity)
+            trailing = 0
+            if stat.st_size > segment.offset:
+                trailing = self._read_records(segment, fp)
+        if trailing:
+            self._drop_torn_tail(segment, trailing)
+        if segment.book is None:
+            # Created but its first record never made it, treat it as if it
+            # does not exist (the next save will overwrite it).
+            return None
+        self._remember(segment)
+        return segment
+
+    def _encode(self, records):
+        frames = []
+        for record in records:
+            encoded = self._codec.encode(record)
+            frames.append(_HEADER.pack(len(encoded), _checksum(encoded)))
+            frames.append(encoded)
+        return b''.join(frames)
+
+    def _flush(self, fp):
+        fp.flush()
+        if self._backend.sync:
+            os.fsync(fp.fileno())
+
+    def _append(self, book_uuid, segment, records):
+        """Appends records to a segment (must hold the book lock)."""
+        path = self._segment_path(book_uuid)
+        data = self._encode(records)
+        with open(path, 'ab') as fp:
+            stat = os.fstat(fp.fileno())
+            if segment is None:
+                segment = _Segment(book_uuid,
+                                   identity=_identify(stat,
+                                                      data[0:_HEADER.size]))
+            if stat.st_size != segment.offset:
+                # Drop any partially written record (or a segment that
+                # never got its first record) so that the records appended
+                # here are not appended after garbage.
+                fp.truncate(segment.offset)
+            fp.write(data)
+            self._flush(fp)
+        for record in records:
+            segment.apply(record)
+        segment.offset += len(data)
+        if (segment.record_count >= self._backend.compaction_threshold and
+                segment.record_count > 2 * segment.live_count):
+            segment = self._compact(segment)
+        self._remember(segment)
+        return segment
+
+    def _compact(self, segment):
+        """Replaces a segment with one only containing its live records."""
+        path = self._segment_path(segment.book_uuid)
+        tmp_path = os.path.join(self._backend.book_path,
+                                ".%s.compact" % segment.book_uuid)
+        records = segment.snapshot()
+        data = self._encode(records)
+        with open(tmp_path, 'wb') as fp:
+            fp.write(data)
+            self._flush(fp)
+            stat = os.fstat(fp.fileno())
+        _replace(tmp_path, path)
+        LOG.debug("Compacted segment '%s' from %s records to %s records",
+                  segment.book_uuid, segment.record_count, len(records))
+        compacted = _Segment(segment.book_uuid,
+                             identity=_identify(stat, data[0:_HEADER.size]))
+        for record in records:
+            compacted.apply(record)
+        compacted.offset = len(data)
+        self._forget(segment)
+        return compacted
+
+    def _find_book(self, index, uuid):
+        with self._index_lock:
+            book_uuid = index.get(uuid)
+        if book_uuid is None:
+            # Not (yet) known, it may have been saved by another process so
+            # load (or catch up on) all segments and look again.
+            for book_uuid in self._list_books():
+                self._run_with_book_lock(book_uuid, self._sync, book_uuid)
+            with self._index_lock:
+                book_uuid = index.get(uuid)
+        return book_uuid
+
+    def _merge_atom(self, segment, fd_uuid, atom_detail):
+        if segment is not None and atom_detail.uuid in segment.atoms:
+            atom_detail = segment.build_atom(atom_detail.uuid).merge(
+                atom_detail)
+        return _make_record('atom', base._format_atom(atom_detail),
+                            flow=fd_uuid)
+
+    def _merge_flow(self, segment, flow_detail):
+        if segment is not None and flow_detail.uuid in segment.flows:
+            e_fd = logbook.FlowDetail.from_dict(
+                segment.flows[flow_detail.uuid])
+            e_fd = e_fd.merge(flow_detail)
+        else:
+            e_fd = flow_detail
+        records = [_make_record('flow', e_fd.to_dict())]
+        for atom_detail in flow_detail:
+            records.append(self._merge_atom(segment, flow_detail.uuid,
+                                            atom_detail))
+        return records
+
+    def _save_logbook(self, book):
+        segment = self._sync(book.uuid)
+        if segment is not None:
+            e_lb = logbook.LogBook.from_dict(segment.book,
+                                             unmarshal_time=True)
+            e_lb = e_lb.merge(book)
+        else:
+            e_lb = book
+        records = [_make_record('book', e_lb.to_dict(marshal_time=True))]
+        for flow_detail in book:
+            records.extend(self._merge_flow(segment, flow_detail))
+        segment = self._append(book.uuid, segment, records)
+        return segment.build_book()
+
+    def save_logbook(self, book):
+        return self._run_with_book_lock(book.uuid, self._save_logbook, book)
+
+    def _update_flow_details(self, book_uuid, flow_detail):
+        segment = self._sync(book_uuid)
+        if segment is None or flow_detail.uuid not in segment.flows:
+            raise exc.NotFound("No flow details found with id: %s"
+                               % flow_detail.uuid)
+        segment = self._append(book_uuid, segment,
+                               self._merge_flow(segment, flow_detail))
+        return segment.build_flow(flow_detail.uuid)
+
+    def update_flow_details(self, flow_detail):
+        book_uuid = self._find_book(self._flow_books, flow_detail.uuid)
+        if book_uuid is None:
+            raise exc.NotFound("No flow details found with id: %s"
+                               % flow_detail.uuid)
+        return self._run_with_book_lock(book_uuid, self._update_flow_details,
+                                        book_uuid, flow_detail)
+
+    def _update_atom_details(self, book_uuid, atom_detail):
+        segment = self._sync(book_uuid)
+        if segment is None or atom_detail.uuid not in segment.atoms:
+            raise exc.NotFound("No atom details found with id: %s"
+                               % atom_detail.uuid)
+        fd_uuid, _ad_data = segment.atoms[atom_detail.uuid]
+        segment = self._append(book_uuid, segment,
+                               [self._merge_atom(segment, fd_uuid,
+                                                 atom_detail)])
+        return segment.build_atom(atom_detail.uuid)
+
+    def update_atom_details(self, atom_detail):
+        book_uuid = self._find_book(self._atom_books, atom_detail.uuid)
+        if book_uuid is None:
+            raise exc.NotFound("No atom details found with id: %s"
+                               % atom_detail.uuid)
+        return self._run_with_book_lock(book_uuid, self._update_atom_details,
+                                        book_uuid, atom_detail)
+
+    def _get_logbook(self, book_uuid):
+        segment = self._sync(book_uuid)
+        if segment is None:
+            raise exc.NotFound("No logbook found with id: %s" % book_uuid)
+        return segment.build_book()
+
+    def get_logbook(self, book_uuid):
+        return self._run_with_book_lock(book_uuid, self._get_logbook,
+                                        book_uuid)
+
+    def get_logbooks(self):
+        books = []
+        for book_uuid in self._list_books():
+            try:
+                books.append(self.get_logbook(book_uuid))
+            except exc.NotFound:
+                pass
+        for lb in books:
+            yield lb
+
+    def _destroy_logbook(self, book_uuid):
+        segment = self._sync(book_uuid)
+        if segment is None:
+            raise exc.NotFound("No logbook found with id: %s" % book_uuid)
+        try:
+            os.unlink(self._segment_path(book_uuid))
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise exc.StorageFailure("Unable to remove logbook"
+                                         " segment %s" % book_uuid, e)
+        self._forget(segment)
+
+    def destroy_logbook(self, book_uuid):
+        self._run_with_book_lock(book_uuid, self._destroy_logbook, book_uuid)
+
+    def clear_all(self):
+        for book_uuid in self._list_books():
+            try:
+                self.destroy_logbook(book_uuid)
+            except exc.NotFound:
+                pass
+
+    def _find_flow_details(self, book_uuid, states, updated_before):
+        segment = self._sync(book_uuid)
+        if segment is None:
+            return []
+        flow_details = []
+        for (fd_uuid, fd_data) in six.iteritems(segment.flows):
+            if states is not None and fd_data.get('state') not in states:
+                continue
+            if updated_before is not None:
+                updated_at = datetime.datetime.utcfromtimestamp(
+                    segment.flow_updated_at[fd_uuid])
+                if updated_at >= updated_before:
+                    continue
+            flow_details.append(segment.build_flow(fd_uuid))
+        return flow_details
+
+    def iter_flow_details(self, states=None, updated_before=None):
+        if states is not None:
+            states = frozenset(states)
+        flow_details = []
+        for book_uuid in self._list_books():
+            flow_details.extend(
+                self._run_with_book_lock(book_uuid, self._find_flow_details,
+                                         book_uuid, states, updated_before))
+        for fd in flow_details:
+            yield fd
+
+    def _find_atom_details(self, book_uuid, flow_uuid, states):
+        segment = self._sync(book_uuid)
+        if segment is None or flow_uuid not in segment.flows:
+            raise exc.NotFound("No flow details found with id: %s"
+                               % flow_uuid)
+        atom_details = []
+        for ad_uuid in segment.flow_atoms.get(flow_uuid, ()):
+            _fd_uuid, ad_data = segment.atoms[ad_uuid]
+            if states is not None:
+                if ad_data['atom'].get('state') not in states:
+                    continue
+            atom_details.append(segment.build_atom(ad_uuid))
+        return atom_details
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        if states is not None:
+            states = frozenset(states)
+        book_uuid = self._find_book(self._flow_books, flow_uuid)
+        if book_uuid is None:
+            raise exc.NotFound("No flow details found with id: %s"
+                               % flow_uuid)
+        atom_details = self._run_with_book_lock(book_uuid,
+                                                self._find_atom_details,
+                                                book_uuid, flow_uuid, states)
+        for ad in atom_details:
+            yield ad
@@ -15,18 +15,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import functools
+import threading
 
+from oslo_utils import timeutils
 import six
 
 from taskflow import exceptions as exc
 from taskflow import logging
+from taskflow.persistence import async_connection
 from taskflow.persistence import base
 from taskflow.persistence import logbook
 from taskflow.utils import lock_utils
+from taskflow.utils import misc
 
 LOG = logging.getLogger(__name__)
 
+# Default number of locks that updates of objects are spread over.
+DEFAULT_LOCK_STRIPES = 32
+
 
 class _Memory(object):
     """Where the data is really stored."""
@@ -42,11 +50,38 @@ class _Memory(object):
         self.atom_details.clear()
 
 
+class _StripedLocks(object):
+    """A fixed size set of locks that keys are (consistently) spread over."""
+
+    def __init__(self, size):
+        if size <= 0:
+            raise ValueError("Lock stripe count must be greater than zero"
+                             " and not '%s'" % size)
+        self._locks = tuple(threading.Lock() for _i in range(0, size))
+
+    def fetch(self, key):
+        """Returns the lock the given key is spread to."""
+        return self._locks[hash(key) % len(self._locks)]
+
+    def fetch_all(self):
+        """Returns a lock that acquires (in a consistent order) all locks."""
+        return lock_utils.MultiLock(self._locks)
+
+
 class _MemoryHelper(object):
-    """Helper functionality for the memory backends & connections."""
+    """Helper functionality for the memory backends & connections.
+
+    The saved objects (and the sets of components they have) are never
+    altered in-place, instead merging replaces them with altered copies
+    (that share all fields that were not altered by the merge). This means
+    that objects can be reconstructed (read) without locking, and only merges
+    into the same object need to be serialized (which is done with a lock
+    picked from a set of striped locks using the objects uuid).
+    """
 
-    def __init__(self, memory):
+    def __init__(self, memory, locks):
         self._memory = memory
+        self._locks = locks
 
     @staticmethod
     def _fetch_clone_args(incoming):
@@ -61,7 +96,7 @@ class _MemoryHelper(object):
     def construct(self, uuid, container):
         """Reconstructs a object from the given uuid and storage container."""
         source = container[uuid]
-        clone_kwargs = self._fetch_clone_args(source)
+        clone_kwargs = self._fetch_clone_args(source['object'])
         clone = source['object'].copy(**clone_kwargs)
         rebuilder = source.get('rebuilder')
         if rebuilder:
@@ -69,40 +104,49 @@ class _MemoryHelper(object):
                 clone.add(component)
         return clone
 
+    def _fetch_containers(self, incoming):
+        if isinstance(incoming, logbook.LogBook):
+            return (self._memory.log_books, self._memory.flow_details)
+        elif isinstance(incoming, logbook.FlowDetail):
+            return (self._memory.flow_details, self._memory.atom_details)
+        elif isinstance(incoming, logbook.AtomDetail):
+            return (self._memory.atom_details, None)
+        else:
+            raise TypeError("Unknown how to merge '%s' (%s)"
+                            % (incoming, type(incoming)))
+
     def merge(self, incoming, saved_info=None):
         """Merges the incoming object into the local memories copy."""
-        if saved_info is None:
-            if isinstance(incoming, logbook.LogBook):
-                saved_info = self._memory.log_books.setdefault(
-                    incoming.uuid, {})
-            elif isinstance(incoming, logbook.FlowDetail):
-                saved_info = self._memory.flow_details.setdefault(
-                    incoming.uuid, {})
-            elif isinstance(incoming, logbook.AtomDetail):
-                saved_info = self._memory.atom_details.setdefault(
-                    incoming.uuid, {})
+        container, component_container = self._fetch_containers(incoming)
+        with self._locks.fetch(incoming.uuid):
+            if saved_info is None:
+                saved_info = container.get(incoming.uuid)
+            if saved_info is None:
+                clone_kwargs = self._fetch_clone_args(incoming)
+                saved_info = {
+                    'object': incoming.copy(**clone_kwargs),
+                    'updated_at': timeutils.utcnow(),
+                }
+                if component_container is not None:
+                    saved_info['components'] = frozenset()
+                    saved_info['rebuilder'] = functools.partial(
+                        self.construct, container=component_container)
+                # Only make it visible once it has been fully formed...
+                container[incoming.uuid] = saved_info
             else:
-                raise TypeError("Unknown how to merge '%s' (%s)"
-                                % (incoming, type(incoming)))
-        try:
-            saved_info['object'].merge(incoming)
-        except KeyError:
-            clone_kwargs = self._fetch_clone_args(incoming)
-            saved_info['object'] = incoming.copy(**clone_kwargs)
-        if isinstance(incoming, logbook.LogBook):
-            flow_details = saved_info.setdefault('components', set())
-            if 'rebuilder' not in saved_info:
-                saved_info['rebuilder'] = functools.partial(
-                    self.construct, container=self._memory.flow_details)
-            for flow_detail in incoming:
-                flow_details.add(self.merge(flow_detail))
-        elif isinstance(incoming, logbook.FlowDetail):
-            atom_details = saved_info.setdefault('components', set())
-            if 'rebuilder' not in saved_info:
-                saved_info['rebuilder'] = functools.partial(
-                    self.construct, container=self._memory.atom_details)
-            for atom_detail in incoming:
-                atom_details.add(self.merge(atom_detail))
+                # The shallow copy shares all fields with the saved object
+                # (the logbook models provide a cheap ``__copy__`` for this).
+                saved_info['object'] = copy.copy(
+                    saved_info['object']).merge(incoming)
+                saved_info['updated_at'] = timeutils.utcnow()
+        if component_container is not None:
+            # Merge the components before adding them so that they exist
+            # before they can be found (by reconstructing this object).
+            components = [self.merge(component) for component in incoming]
+            if components:
+                with self._locks.fetch(incoming.uuid):
+                    saved_info['components'] = saved_info[
+                        'components'].union(components)
         return incoming.uuid
 
 
@@ -111,35 +155,56 @@ class MemoryBackend(base.Backend):
 
     This backend writes logbooks, flow details, and atom details to in-memory
     dictionaries and retrieves from those dictionaries as needed.
+
+    Reading does not lock, and saving & updating only serializes with other
+    saves & updates of the *same* objects (using locks picked from a set of
+    ``lock_stripes`` locks, defaults to 32); only destroying logbooks (or
+    clearing everything) stops all saving and updating (and it waits for the
+    saving of logbooks and updating of flow details that are in progress to
+    finish, so that none of their components are left behind).
     """
     def __init__(self, conf=None):
         super(MemoryBackend, self).__init__(conf)
         self._memory = _Memory()
-        self._helper = _MemoryHelper(self._memory)
-        self._lock = lock_utils.ReaderWriterLock()
+        self._locks = _StripedLocks(misc.as_int(
+            self._conf.get('lock_stripes', DEFAULT_LOCK_STRIPES)))
+        self._helper = _MemoryHelper(self._memory, self._locks)
+        # Saves & updates that merge components (which are only referenced
+        # once the merge finishes) are readers, destroying (or clearing) is
+        # the writer, so that the components of an object being destroyed
+        # are not left behind (unreferenced) by a merge that was going on.
+        self._destroy_lock = lock_utils.ReaderWriterLock()
 
     def _construct_from(self, container):
-        return dict((uuid, self._helper.construct(uuid, container))
-                    for uuid in six.iterkeys(container))
+        constructed = {}
+        for uuid in list(six.iterkeys(container)):
+            try:
+                constructed[uuid] = self._helper.construct(uuid, container)
+            except KeyError:
+                pass
+        return constructed
 
     @property
     def log_books(self):
-        with self._lock.read_lock():
-            return self._construct_from(self._memory.log_books)
+        return self._construct_from(self._memory.log_books)
 
     @property
     def flow_details(self):
-        with self._lock.read_lock():
-            return self._construct_from(self._memory.flow_details)
+        return self._construct_from(self._memory.flow_details)
 
     @property
     def atom_details(self):
-        with self._lock.read_lock():
-            return self._construct_from(self._memory.atom_details)
+        return self._construct_from(self._memory.atom_details)
 
     def get_connection(self):
         return Connection(self)
 
+    def get_async_connection(self, loop=None, executor=None):
+        # Nothing done by memory connections blocks (for long), so there is
+        # no need to offload the calls onto other threads.
+        return async_connection.InlineAsyncConnection(self.get_connection(),
+                                                      loop=loop)
+
     def close(self):
         pass
 
@@ -151,7 +216,8 @@ class Connection(base.Connection):
         self._backend = backend
         self._helper = backend._helper
         self._memory = backend._memory
-        self._lock = backend._lock
+        self._locks = backend._locks
+        self._destroy_lock = backend._destroy_lock
 
     def upgrade(self):
         pass
@@ -167,11 +233,16 @@ class Connection(base.Connection):
         pass
 
     def clear_all(self):
-        with self._lock.write_lock():
-            self._memory.clear_all()
+        with self._destroy_lock.write_lock():
+            with self._locks.fetch_all():
+                self._memory.clear_all()
 
     def destroy_logbook(self, book_uuid):
-        with self._lock.write_lock():
+        with self._destroy_lock.write_lock():
+            self._destroy_logbook(book_uuid)
+
+    def _destroy_logbook(self, book_uuid):
+        with self._locks.fetch_all():
             try:
                 # Do the same cascading delete that the sql layer does.
                 book_info = self._memory.log_books.pop(book_uuid)
@@ -179,26 +250,23 @@ class Connection(base.Connection):
                 raise exc.NotFound("No logbook found with uuid '%s'"
                                    % book_uuid)
             else:
-                while book_info['components']:
-                    flow_uuid = book_info['components'].pop()
+                for flow_uuid in book_info['components']:
                     flow_info = self._memory.flow_details.pop(flow_uuid)
-                    while flow_info['components']:
-                        atom_uuid = flow_info['components'].pop()
+                    for atom_uuid in flow_info['components']:
                         self._memory.atom_details.pop(atom_uuid)
 
     def update_atom_details(self, atom_detail):
-        with self._lock.write_lock():
-            try:
-                atom_info = self._memory.atom_details[atom_detail.uuid]
-                return self._helper.construct(
-                    self._helper.merge(atom_detail, saved_info=atom_info),
-                    self._memory.atom_details)
-            except KeyError:
-                raise exc.NotFound("No atom details found with uuid '%s'"
-                                   % atom_detail.uuid)
+        try:
+            atom_info = self._memory.atom_details[atom_detail.uuid]
+            return self._helper.construct(
+                self._helper.merge(atom_detail, saved_info=atom_info),
+                self._memory.atom_details)
+        except KeyError:
+            raise exc.NotFound("No atom details found with uuid '%s'"
+                               % atom_detail.uuid)
 
     def update_flow_details(self, flow_detail):
-        with self._lock.write_lock():
+        with self._destroy_lock.read_lock():
             try:
                 flow_info = self._memory.flow_details[flow_detail.uuid]
                 return self._helper.construct(
@@ -209,28 +277,74 @@ class Connection(base.Connection):
                                    % flow_detail.uuid)
 
     def save_logbook(self, book):
-        with self._lock.write_lock():
+        with self._destroy_lock.read_lock():
             return self._helper.construct(self._helper.merge(book),
                                           self._memory.log_books)
 
     def get_logbook(self, book_uuid):
-        with self._lock.read_lock():
+        try:
+            return self._helper.construct(book_uuid,
+                                          self._memory.log_books)
+        except KeyError:
+            raise exc.NotFound("No logbook found with uuid '%s'"
+                               % book_uuid)
+
+    def get_logbooks(self):
+        for book_uuid in list(six.iterkeys(self._memory.log_books)):
             try:
-                return self._helper.construct(book_uuid,
+                book = self._helper.construct(book_uuid,
                                               self._memory.log_books)
             except KeyError:
-                raise exc.NotFound("No logbook found with uuid '%s'"
-                                   % book_uuid)
+                pass
+            else:
+                yield book
 
-    def get_logbooks(self):
-        # Don't hold locks while iterating...
-        with self._lock.read_lock():
-            book_uuids = set(six.iterkeys(self._memory.log_books))
-        for book_uuid in book_uuids:
+    def iter_flow_details(self, states=None, updated_before=None):
+        if states is not None:
+            states = frozenset(states)
+
+        def _matches(flow_info):
+            if states is not None and flow_info['object'].state not in states:
+                return False
+            if (updated_before is not None and
+                    flow_info['updated_at'] >= updated_before):
+                return False
+            return True
+
+        # Iterate over a copy (since saving can happen concurrently)...
+        flow_uuids = [flow_uuid for (flow_uuid, flow_info)
+                      in list(six.iteritems(self._memory.flow_details))
+                      if _matches(flow_info)]
+        for flow_uuid in flow_uuids:
             try:
-                with self._lock.read_lock():
-                    book = self._helper.construct(book_uuid,
-                                                  self._memory.log_books)
-                yield book
+                flow_detail = self._helper.construct(
+                    flow_uuid, self._memory.flow_details)
             except KeyError:
                 pass
+            else:
+                yield flow_detail
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        if states is not None:
+            states = frozenset(states)
+        try:
+            flow_info = self._memory.flow_details[flow_uuid]
+        except KeyError:
+            raise exc.NotFound("No flow details found with uuid '%s'"
+                               % flow_uuid)
+        atom_uuids = []
+        for atom_uuid in flow_info['components']:
+            try:
+                atom_info = self._memory.atom_details[atom_uuid]
+            except KeyError:
+                continue
+            if states is None or atom_info['object'].state in states:
+                atom_uuids.append(atom_uuid)
+        for atom_uuid in atom_uuids:
+            try:
+                atom_detail = self._helper.construct(
+                    atom_uuid, self._memory.atom_details)
+            except KeyError:
+                pass
+            else:
+                yield atom_detail
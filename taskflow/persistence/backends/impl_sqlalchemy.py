@@ -19,9 +19,11 @@
 
 from __future__ import absolute_import
 
+import collections
 import contextlib
 import copy
 import functools
+import threading
 import time
 
 from oslo_utils import strutils
@@ -98,6 +100,12 @@ POSTGRES_GONE_WAY_AWAY_ERRORS = (
 # These connection urls mean sqlite is being used as an in-memory DB.
 SQLITE_IN_MEMORY = ('sqlite://', 'sqlite:///', 'sqlite:///:memory:')
 
+# Defaults used by the ``sqlite_fast`` mode (see the backend docstring).
+SQLITE_FAST_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_FAST_CACHED_STATEMENTS = 256
+SQLITE_FAST_BUSY_TIMEOUT = 30
+SQLITE_FAST_GROUP_COMMIT_SIZE = 64
+
 # Transacation isolation levels that will be automatically applied, we prefer
 # strong read committed isolation levels to avoid merging and using dirty
 # data...
@@ -162,6 +170,45 @@ def _set_sql_mode(sql_mode, dbapi_con, connection_rec):
     cursor.execute("SET SESSION sql_mode = %s", [sql_mode])
 
 
+def _is_sqlite_file(sql_connection):
+    if not sql_connection:
+        return False
+    e_url = sa.engine.url.make_url(sql_connection)
+    return ('sqlite' in e_url.drivername and
+            sql_connection.lower().strip() not in SQLITE_IN_MEMORY)
+
+
+def _set_sqlite_fast_pragmas(mmap_size, dbapi_con, connection_rec):
+    """Tunes a new sqlite connection for (single node) write throughput.
+
+    Write-ahead logging lets readers proceed while a writer commits, and
+    with it ``synchronous=NORMAL`` only syncs the log at checkpoints (a
+    committed transaction may be lost on power failure, but the database
+    is never corrupted).
+    """
+    # Let sqlalchemy (and not pysqlite) decide when transactions begin, see
+    # the ``_begin_immediate`` listener below.
+    dbapi_con.isolation_level = None
+    cursor = dbapi_con.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=%d" % mmap_size)
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _begin_immediate(conn):
+    """Takes the sqlite write lock at the start of each transaction.
+
+    Our transactions always read and then write, so starting them as
+    deferred transactions just means they may fail (with ``SQLITE_BUSY``)
+    when upgrading to a write lock instead of waiting for it.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+
+
 def _ping_listener(dbapi_conn, connection_rec, connection_proxy):
     """Ensures that MySQL connections checked out of the pool are alive.
 
@@ -180,6 +227,94 @@ def _ping_listener(dbapi_conn, connection_rec, connection_proxy):
             raise
 
 
+class _PendingWrite(object):
+    """A write (and its outcome) waiting to be group committed."""
+
+    __slots__ = ('functor', 'args', 'kwargs', 'result', 'failure',
+                 'lead', 'event')
+
+    def __init__(self, functor, args, kwargs):
+        self.functor = functor
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.failure = None
+        self.lead = False
+        self.event = threading.Event()
+
+
+class _GroupCommitter(object):
+    """Commits the writes of concurrent callers in shared transactions.
+
+    A caller that arrives while no commit is in progress becomes the leader
+    and commits (in one transaction) every write that is pending at that
+    point; callers that arrive while it does that wait. Once done it hands
+    leadership over to the oldest waiting caller (if any), which then does
+    the same with the writes that piled up in the meantime. If a shared
+    transaction fails its writes are retried one transaction each, so that
+    one bad write does not fail the unrelated writes batched with it.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max(1, max_size)
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._leading = False
+
+    def run(self, conn, functor, args, kwargs):
+        write = _PendingWrite(functor, args, kwargs)
+        with self._lock:
+            self._pending.append(write)
+            if self._leading:
+                lead = False
+            else:
+                lead = self._leading = True
+        if not lead:
+            write.event.wait()
+            lead = write.lead
+        if lead:
+            with self._lock:
+                batch = []
+                while self._pending and len(batch) < self._max_size:
+                    batch.append(self._pending.popleft())
+            try:
+                self._commit(conn, batch)
+            finally:
+                with self._lock:
+                    if self._pending:
+                        successor = self._pending[0]
+                        successor.lead = True
+                        successor.event.set()
+                    else:
+                        self._leading = False
+        if write.failure is not None:
+            write.failure.reraise()
+        return write.result
+
+    @staticmethod
+    def _commit(conn, batch):
+        try:
+            try:
+                results = conn._run_batch_in_session(
+                    [(w.functor, w.args, w.kwargs) for w in batch])
+            except Exception:
+                if len(batch) == 1:
+                    batch[0].failure = failure.Failure()
+                else:
+                    for w in batch:
+                        try:
+                            w.result = conn._run_batch_in_session(
+                                [(w.functor, w.args, w.kwargs)])[0]
+                        except Exception:
+                            w.failure = failure.Failure()
+            else:
+                for (w, result) in zip(batch, results):
+                    w.result = result
+        finally:
+            for w in batch:
+                w.event.set()
+
+
 class SQLAlchemyBackend(base.Backend):
     """A sqlalchemy backend.
 
@@ -188,6 +323,22 @@ class SQLAlchemyBackend(base.Backend):
         conf = {
             "connection": "sqlite:////tmp/test.db",
         }
+
+    For single node deployments that use a sqlite file the ``sqlite_fast``
+    option (which defaults to false) tunes sqlite for write throughput (it
+    can not be used with other databases, in-memory sqlite or a provided
+    engine):
+
+    * Connections use write-ahead logging, ``synchronous=NORMAL``,
+      memory-mapped I/O (``sqlite_mmap_size`` bytes, defaulting to
+      ``SQLITE_FAST_MMAP_SIZE``) and start write transactions as
+      immediate transactions.
+    * Connections are pooled (and not reopened per session) so that the
+      prepared statements each one caches (``sqlite_cached_statements`` of
+      them, defaulting to ``SQLITE_FAST_CACHED_STATEMENTS``) get reused.
+    * Writes made concurrently (by many engines in the same process) are
+      group committed, up to ``sqlite_group_commit_size`` of them
+      (defaulting to ``SQLITE_FAST_GROUP_COMMIT_SIZE``) per transaction.
     """
     def __init__(self, conf, engine=None):
         super(SQLAlchemyBackend, self).__init__(conf)
@@ -199,6 +350,18 @@ class SQLAlchemyBackend(base.Backend):
             self._owns_engine = True
         self._session_maker = None
         self._validated = False
+        if _as_bool(self._conf.get('sqlite_fast', False)):
+            if engine is not None or not _is_sqlite_file(
+                    self._conf.get('connection')):
+                raise ValueError("The 'sqlite_fast' option can only be used"
+                                 " with a sqlite file connection (and not"
+                                 " with a provided engine)")
+            group_commit_size = misc.as_int(
+                self._conf.get('sqlite_group_commit_size',
+                               SQLITE_FAST_GROUP_COMMIT_SIZE))
+            self._committer = _GroupCommitter(group_commit_size)
+        else:
+            self._committer = None
 
     def _create_engine(self):
         # NOTE(harlowja): copy the internal one so that we don't modify it via
@@ -214,13 +377,24 @@ class SQLAlchemyBackend(base.Backend):
             engine_args['pool_recycle'] = idle_timeout
         sql_connection = conf.pop('connection')
         e_url = sa.engine.url.make_url(sql_connection)
+        sqlite_fast = False
         if 'sqlite' in e_url.drivername:
             engine_args["poolclass"] = sa_pool.NullPool
 
             # Adjustments for in-memory sqlite usage.
-            if sql_connection.lower().strip() in SQLITE_IN_MEMORY:
+            if not _is_sqlite_file(sql_connection):
                 engine_args["poolclass"] = sa_pool.StaticPool
                 engine_args["connect_args"] = {'check_same_thread': False}
+            elif _as_bool(conf.pop('sqlite_fast', False)):
+                sqlite_fast = True
+                engine_args["poolclass"] = sa_pool.QueuePool
+                engine_args["connect_args"] = {
+                    'check_same_thread': False,
+                    'timeout': SQLITE_FAST_BUSY_TIMEOUT,
+                    'cached_statements': misc.as_int(
+                        conf.pop('sqlite_cached_statements',
+                                 SQLITE_FAST_CACHED_STATEMENTS)),
+                }
         else:
             for (k, lookup_key) in [('pool_size', 'max_pool_size'),
                                     ('max_overflow', 'max_overflow'),
@@ -253,6 +427,13 @@ class SQLAlchemyBackend(base.Backend):
                                  eventlet_utils.EVENTLET_AVAILABLE)
         if _as_bool(checkin_yield):
             sa.event.listen(engine, 'checkin', _thread_yield)
+        if sqlite_fast:
+            mmap_size = misc.as_int(conf.pop('sqlite_mmap_size',
+                                             SQLITE_FAST_MMAP_SIZE))
+            sa.event.listen(engine, 'connect',
+                            functools.partial(_set_sqlite_fast_pragmas,
+                                              mmap_size))
+            sa.event.listen(engine, 'begin', _begin_immediate)
         if 'mysql' in e_url.drivername:
             if _as_bool(conf.pop('checkout_ping', True)):
                 sa.event.listen(engine, 'checkout', _ping_listener)
@@ -277,7 +458,8 @@ class SQLAlchemyBackend(base.Backend):
         return self._session_maker
 
     def get_connection(self):
-        conn = Connection(self, self._get_session_maker())
+        conn = Connection(self, self._get_session_maker(),
+                          committer=self._committer)
         if not self._validated:
             try:
                 max_retries = misc.as_int(self._conf.get('max_retries', None))
@@ -304,10 +486,11 @@ class SQLAlchemyBackend(base.Backend):
 
 
 class Connection(base.Connection):
-    def __init__(self, backend, session_maker):
+    def __init__(self, backend, session_maker, committer=None):
         self._backend = backend
         self._session_maker = session_maker
         self._engine = backend.engine
+        self._committer = committer
 
     @property
     def backend(self):
@@ -364,17 +547,29 @@ class Connection(base.Connection):
         that the session is opened & closed and makes sure that sqlalchemy
         exceptions aren't emitted from the callback or sessions actions (as
         that would expose the underlying sqlalchemy exception model).
+
+        When writes are group committed the callback may share its session
+        (and transaction) with the callbacks of other concurrent callers.
         """
+        if self._committer is not None:
+            return self._committer.run(self, functor, args, kwargs)
+        return self._run_batch_in_session([(functor, args, kwargs)])[0]
+
+    def _run_batch_in_session(self, batch):
+        """Runs many ``(callback, args, kwargs)`` in one session (in order)."""
         try:
             session = self._make_session()
             with session.begin():
-                return functor(session, *args, **kwargs)
+                return [functor(session, *args, **kwargs)
+                        for (functor, args, kwargs) in batch]
         except sa_exc.SQLAlchemyError as e:
-            LOG.exception("Failed running '%s' within a database session",
-                          functor.__name__)
+            names = ", ".join("'%s'" % functor.__name__
+                              for (functor, _args, _kwargs) in batch)
+            LOG.exception("Failed running %s within a database session",
+                          names)
             raise exc.StorageFailure("Storage backend internal error, failed"
-                                     " running '%s' within a database"
-                                     " session" % functor.__name__, e)
+                                     " running %s within a database"
+                                     " session" % names, e)
 
     def _make_session(self):
         try:
@@ -485,6 +680,104 @@ class Connection(base.Connection):
         for lb in books:
             yield lb
 
+    def iter_flow_details(self, states=None, updated_before=None):
+        if states is not None:
+            states = list(states)
+            if not states:
+                return
+        session = self._make_session()
+        try:
+            query = session.query(models.FlowDetail)
+            if states is not None:
+                query = query.filter(models.FlowDetail.state.in_(states))
+            if updated_before is not None:
+                # Rows that have never been updated only have a creation time.
+                updated_at = sa.func.coalesce(models.FlowDetail.updated_at,
+                                              models.FlowDetail.created_at)
+                query = query.filter(updated_at < updated_before)
+            # Fetch the atom details of all matched flow details in one
+            # follow-up query instead of one query per flow detail.
+            query = query.options(
+                sa_orm.subqueryload(models.FlowDetail.atomdetails))
+            flow_details = [_convert_fd_to_external(fd_m)
+                            for fd_m in query.all()]
+        except sa_exc.DBAPIError as e:
+            LOG.exception('Failed getting flow details')
+            raise exc.StorageFailure("Failed getting flow details", e)
+        for fd in flow_details:
+            yield fd
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        if states is not None:
+            states = list(states)
+        session = self._make_session()
+        try:
+            _flow_details_get_model(flow_uuid, session=session)
+            if states is not None and not states:
+                atom_details = []
+            else:
+                query = session.query(models.AtomDetail).filter_by(
+                    parent_uuid=flow_uuid)
+                if states is not None:
+                    query = query.filter(models.AtomDetail.state.in_(states))
+                atom_details = [_convert_ad_to_external(ad_m)
+                                for ad_m in query.all()]
+        except sa_exc.DBAPIError as e:
+            LOG.exception('Failed getting atom details')
+            raise exc.StorageFailure("Failed getting atom details of flow"
+                                     " details %s" % flow_uuid, e)
+        for ad in atom_details:
+            yield ad
+
+    def _prune(self, session, updated_before, states, batch_size):
+        lb_t = models.LogBook.__table__
+        fd_t = models.FlowDetail.__table__
+        ad_t = models.AtomDetail.__table__
+        # Rows that have never been updated only have a creation time.
+        fd_updated_at = sa.func.coalesce(fd_t.c.updated_at,
+                                         fd_t.c.created_at)
+        has_flows = sa.exists().where(fd_t.c.parent_uuid == lb_t.c.uuid)
+        has_unfinished_flows = sa.exists().where(sa.and_(
+            fd_t.c.parent_uuid == lb_t.c.uuid,
+            sa.or_(fd_t.c.state.is_(None),
+                   sa.not_(fd_t.c.state.in_(states)),
+                   fd_updated_at >= updated_before)))
+        query = sa.select([lb_t.c.uuid]).where(
+            sa.and_(has_flows, sa.not_(has_unfinished_flows)))
+        lb_uuids = [row[0] for row in
+                    session.execute(query.limit(batch_size))]
+        if lb_uuids:
+            # Not all databases (sqlite for example) enforce the cascading
+            # deletes of the schema, so delete the children explicitly (but
+            # still set-based, not row by row).
+            fd_uuids = sa.select([fd_t.c.uuid]).where(
+                fd_t.c.parent_uuid.in_(lb_uuids))
+            session.execute(ad_t.delete().where(
+                ad_t.c.parent_uuid.in_(fd_uuids)))
+            session.execute(fd_t.delete().where(
+                fd_t.c.parent_uuid.in_(lb_uuids)))
+            session.execute(lb_t.delete().where(lb_t.c.uuid.in_(lb_uuids)))
+        return len(lb_uuids)
+
+    def prune(self, older_than, states=base.FINISHED_STATES,
+              batch_size=base.PRUNE_BATCH_SIZE):
+        updated_before = base._prune_cutoff(older_than)
+        base._check_batch_size(batch_size)
+        states = list(states)
+        pruned = 0
+        if not states:
+            return pruned
+        # Each batch is deleted in its own transaction so that the locks it
+        # takes are only held for a short amount of time.
+        while True:
+            count = self._run_in_session(self._prune,
+                                         updated_before=updated_before,
+                                         states=states,
+                                         batch_size=batch_size)
+            pruned += count
+            if count < batch_size:
+                return pruned
+
     def close(self):
         pass
 
@@ -15,14 +15,20 @@
 #    under the License.
 
 import contextlib
+import datetime
+import threading
 
 from kazoo import exceptions as k_exc
 from kazoo.protocol import paths
+from kazoo.protocol import states as k_states
 from oslo_serialization import jsonutils
+from oslo_utils import strutils
+import six
 
 from taskflow import exceptions as exc
 from taskflow import logging
 from taskflow.persistence import base
+from taskflow.persistence import codec
 from taskflow.persistence import logbook
 from taskflow.utils import kazoo_utils as k_utils
 from taskflow.utils import misc
@@ -32,6 +38,104 @@ LOG = logging.getLogger(__name__)
 # Transaction support was added in 3.4.0
 MIN_ZK_VERSION = (3, 4, 0)
 
+# How many times a transaction is attempted (when it keeps failing because
+# cached nodes it writes were changed by others) before giving up.
+MAX_TRANSACTION_ATTEMPTS = 10
+
+
+class _Ticket(object):
+    """Tracks if what a single watch was set on is still valid."""
+
+    __slots__ = ('valid',)
+
+    def __init__(self):
+        self.valid = True
+
+
+class _NodeCache(object):
+    """Client-side cache of watched zookeeper node data (and stats).
+
+    Each cached node has a data watch set on it (from the read or the
+    existence check that cached it); when that watch triggers (the node was
+    changed or deleted by someone) the cached node is dropped, so that the
+    next read will fetch it from zookeeper again.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Returns the cached ``(data, zstat)`` tuple of a node (or none)."""
+        try:
+            data, zstat, _ticket = self._nodes[path]
+        except KeyError:
+            return None
+        else:
+            return (data, zstat)
+
+    def watcher(self, path):
+        """Returns a new ticket and the data watch that invalidates it."""
+        ticket = _Ticket()
+
+        def _invalidate(event=None):
+            with self._lock:
+                ticket.valid = False
+                node = self._nodes.get(path)
+                if node is not None and node[2] is ticket:
+                    del self._nodes[path]
+
+        return (ticket, _invalidate)
+
+    def put(self, path, data, zstat, ticket):
+        """Caches a node (unless its watch has already triggered)."""
+        with self._lock:
+            if ticket.valid:
+                self._nodes[path] = (data, zstat, ticket)
+
+    def discard(self, path):
+        with self._lock:
+            node = self._nodes.pop(path, None)
+            if node is not None:
+                node[2].valid = False
+
+    def clear(self):
+        with self._lock:
+            for node in six.itervalues(self._nodes):
+                node[2].valid = False
+            self._nodes.clear()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, path):
+        return path in self._nodes
+
+
+class _CachedResult(object):
+    """Result of a read that was answered from the node cache."""
+
+    def __init__(self, node):
+        self._node = node
+
+    def get(self):
+        return self._node
+
+
+class _CachingResult(object):
+    """Result of a node read that caches the node once it is received."""
+
+    def __init__(self, cache, path, ticket, result):
+        self._cache = cache
+        self._path = path
+        self._ticket = ticket
+        self._result = result
+
+    def get(self):
+        data, zstat = self._result.get()
+        self._cache.put(self._path, data, zstat, self._ticket)
+        return (data, zstat)
+
 
 class ZkBackend(base.Backend):
     """A zookeeper backend.
@@ -43,6 +147,18 @@ class ZkBackend(base.Backend):
     inside those directories that represent the contents of those objects for
     later reading and writing.
 
+    Atom details are written using the codec that the ``serializer``,
+    ``compression`` and ``compression_threshold`` configuration keys select
+    (see :py:func:`~taskflow.persistence.codec.fetch`), which can help keep
+    atom details with large results under the zookeeper node size limit.
+
+    When the ``cache`` configuration key is true, flow and atom detail nodes
+    that are read (or written) are kept in a local cache (shared by all
+    connections of the backend) that is invalidated by zookeeper data watches
+    so that reading them again does not hit the zookeeper ensemble. Writes
+    of cached nodes are made conditional on the cached node version (and are
+    retried with freshly read nodes if another writer got there first).
+
     Example configuration::
 
         conf = {
@@ -65,11 +181,32 @@ class ZkBackend(base.Backend):
             self._client = k_utils.make_client(conf)
             self._owned = True
         self._validated = False
+        self._codec = codec.fetch(self._conf)
+        if strutils.bool_from_string(self._conf.get('cache', False)):
+            self._cache = _NodeCache()
+            self._client.add_listener(self._on_state_change)
+        else:
+            self._cache = None
+
+    def _on_state_change(self, state):
+        # Watches may be lost (or not delivered) while disconnected, so
+        # whatever was cached may no longer be valid.
+        if state != k_states.KazooState.CONNECTED:
+            self._cache.clear()
 
     @property
     def path(self):
         return self._path
 
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def cache(self):
+        """Local cache of flow and atom detail nodes (or none if disabled)."""
+        return self._cache
+
     def get_connection(self):
         conn = ZkConnection(self, self._client)
         if not self._validated:
@@ -79,6 +216,9 @@ class ZkBackend(base.Backend):
 
     def close(self):
         self._validated = False
+        if self._cache is not None:
+            self._client.remove_listener(self._on_state_change)
+            self._cache.clear()
         if not self._owned:
             return
         try:
@@ -91,6 +231,8 @@ class ZkConnection(base.Connection):
     def __init__(self, backend, client):
         self._backend = backend
         self._client = client
+        self._codec = self._backend.codec
+        self._cache = self._backend.cache
         self._book_path = paths.join(self._backend.path, "books")
         self._flow_path = paths.join(self._backend.path, "flow_details")
         self._atom_path = paths.join(self._backend.path, "atom_details")
@@ -153,21 +295,140 @@ class ZkConnection(base.Connection):
         except (k_exc.KazooException, k_exc.ZookeeperError) as e:
             raise exc.StorageFailure("Storage backend internal error", e)
 
+    def _pipeline(self, requests):
+        """Sends many requests at once and then waits for all of them.
+
+        Each request is a ``(async client method, path)`` tuple; the
+        responses are returned in the same order as the requests (a response
+        is ``None`` when the node requested does not exist). This avoids
+        paying for a round-trip to zookeeper per request (the requests
+        are sent one after another, without waiting for prior responses).
+        """
+        pending = [method(path) for (method, path) in requests]
+        responses = []
+        for request in pending:
+            try:
+                responses.append(request.get())
+            except k_exc.NoNodeError:
+                responses.append(None)
+        return responses
+
+    def _get_async(self, path):
+        """Reads a flow or atom detail node (from the cache if possible)."""
+        if self._cache is None:
+            return self._client.get_async(path)
+        node = self._cache.get(path)
+        if node is not None:
+            return _CachedResult(node)
+        ticket, watch = self._cache.watcher(path)
+        return _CachingResult(self._cache, path, ticket,
+                              self._client.get_async(path, watch=watch))
+
+    def _set_data(self, txn, writes, path, data, node=None):
+        """Adds a (versioned if cached) node write to a transaction."""
+        if self._cache is not None and node is not None:
+            txn.set_data(path, data, version=node[1].version)
+        else:
+            txn.set_data(path, data)
+        writes.append((len(txn.operations) - 1, path, data))
+
+    def _run_transaction(self, func):
+        """Runs a function that fills in a transaction and commits it.
+
+        The function is called with a new transaction and a list it should
+        record the writes of flow and atom detail nodes in (see
+        :py:meth:`._set_data`); it is called again (after dropping the nodes
+        it was going to write from the cache) if its transaction failed
+        because one of those nodes was changed (by another writer) after it
+        was cached (at most ``MAX_TRANSACTION_ATTEMPTS`` times in total).
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            txn = self._client.transaction()
+            writes = []
+            result = func(txn, writes)
+            try:
+                stats = k_utils.checked_commit(txn)
+            except k_utils.KazooTransactionException as e:
+                if self._cache is None or not any(
+                        isinstance(r, k_exc.BadVersionError)
+                        for (_op, r) in e.failures):
+                    raise
+                if attempts >= MAX_TRANSACTION_ATTEMPTS:
+                    raise exc.StorageFailure(
+                        "Storage backend transaction failed %s times due to"
+                        " concurrent modifications" % attempts, e)
+                for (_index, path, _data) in writes:
+                    self._cache.discard(path)
+            else:
+                if self._cache is not None:
+                    for (index, path, data) in writes:
+                        self._cache_written(path, data, stats[index])
+                return result
+
+    def _cache_written(self, path, data, zstat):
+        # Nothing else could have changed the node between our read of it
+        # and our write (the write was versioned) so any watch set before
+        # our write can be ignored (it triggered due to our own write); set a
+        # new watch (and drop the node if it changed again since our write).
+        ticket, watch = self._cache.watcher(path)
+        self._cache.put(path, data, zstat, ticket)
+
+        def _check(result):
+            try:
+                e_zstat = result.get()
+            except Exception:
+                e_zstat = None
+            if e_zstat is None or e_zstat.version != zstat.version:
+                watch()
+
+        self._client.exists_async(path, watch=watch).rawlink(_check)
+
+    def _fetch_nodes(self, fds, lb_path=None):
+        """Fetches (pipelined) what is needed to merge in flow details.
+
+        The nodes are returned as an iterator that should be consumed in the
+        same order as the ``_merge_*`` methods consume them.
+        """
+        requests = []
+        if lb_path is not None:
+            requests.append((self._client.get_async, lb_path))
+        for fd in fds:
+            fd_path = paths.join(self.flow_path, fd.uuid)
+            if lb_path is not None:
+                requests.append((self._client.exists_async,
+                                 paths.join(lb_path, fd.uuid)))
+            requests.append((self._get_async, fd_path))
+            for ad in fd:
+                requests.append((self._client.exists_async,
+                                 paths.join(fd_path, ad.uuid)))
+                requests.append((self._get_async,
+                                 paths.join(self.atom_path, ad.uuid)))
+        return iter(self._pipeline(requests))
+
+    def _load_atom_details(self, ad_data):
+        ad_data = self._codec.decode(ad_data)
+        ad_cls = logbook.atom_detail_class(ad_data['type'])
+        return ad_cls.from_dict(ad_data['atom'])
+
     def update_atom_details(self, ad):
         """Update a atom detail transactionally."""
+
+        def _update(txn, writes):
+            ad_node = self._pipeline([
+                (self._get_async, paths.join(self.atom_path, ad.uuid)),
+            ])[0]
+            return self._merge_atom_details(ad, ad_node, txn, writes)
+
         with self._exc_wrapper():
-            txn = self._client.transaction()
-            ad = self._update_atom_details(ad, txn)
-            k_utils.checked_commit(txn)
-            return ad
+            return self._run_transaction(_update)
 
-    def _update_atom_details(self, ad, txn, create_missing=False):
-        # Determine whether the desired data exists or not.
+    def _merge_atom_details(self, ad, ad_node, txn, writes,
+                            create_missing=False):
         ad_path = paths.join(self.atom_path, ad.uuid)
         e_ad = None
-        try:
-            ad_data, _zstat = self._client.get(ad_path)
-        except k_exc.NoNodeError:
+        if ad_node is None:
             # Not-existent: create or raise exception.
             if not create_missing:
                 raise exc.NotFound("No atom details found with"
@@ -177,9 +438,7 @@ class ZkConnection(base.Connection):
         else:
             # Existent: read it out.
             try:
-                ad_data = misc.decode_json(ad_data)
-                ad_cls = logbook.atom_detail_class(ad_data['type'])
-                e_ad = ad_cls.from_dict(ad_data['atom'])
+                e_ad = self._load_atom_details(ad_node[0])
             except KeyError:
                 pass
 
@@ -189,8 +448,8 @@ class ZkConnection(base.Connection):
         else:
             e_ad = ad
         ad_data = base._format_atom(e_ad)
-        txn.set_data(ad_path,
-                     misc.binary_encode(jsonutils.dumps(ad_data)))
+        self._set_data(txn, writes, ad_path, self._codec.encode(ad_data),
+                       node=ad_node)
         return e_ad
 
     def get_atom_details(self, ad_uuid):
@@ -199,33 +458,37 @@ class ZkConnection(base.Connection):
         *Read-only*, so no need of zk transaction.
         """
         with self._exc_wrapper():
-            return self._get_atom_details(ad_uuid)
-
-    def _get_atom_details(self, ad_uuid):
-        ad_path = paths.join(self.atom_path, ad_uuid)
-        try:
-            ad_data, _zstat = self._client.get(ad_path)
-        except k_exc.NoNodeError:
-            raise exc.NotFound("No atom details found with id: %s" % ad_uuid)
-        else:
-            ad_data = misc.decode_json(ad_data)
-            ad_cls = logbook.atom_detail_class(ad_data['type'])
-            return ad_cls.from_dict(ad_data['atom'])
+            return self._get_atom_details([ad_uuid])[0]
+
+    def _get_atom_details(self, ad_uuids):
+        ad_nodes = self._pipeline([
+            (self._get_async, paths.join(self.atom_path, ad_uuid))
+            for ad_uuid in ad_uuids
+        ])
+        ads = []
+        for (ad_uuid, ad_node) in zip(ad_uuids, ad_nodes):
+            if ad_node is None:
+                raise exc.NotFound("No atom details found with id: %s"
+                                   % ad_uuid)
+            ads.append(self._load_atom_details(ad_node[0]))
+        return ads
 
     def update_flow_details(self, fd):
         """Update a flow detail transactionally."""
+
+        def _update(txn, writes):
+            nodes = self._fetch_nodes([fd])
+            return self._merge_flow_details(fd, nodes, txn, writes)
+
         with self._exc_wrapper():
-            txn = self._client.transaction()
-            fd = self._update_flow_details(fd, txn)
-            k_utils.checked_commit(txn)
-            return fd
+            return self._run_transaction(_update)
 
-    def _update_flow_details(self, fd, txn, create_missing=False):
+    def _merge_flow_details(self, fd, nodes, txn, writes,
+                            create_missing=False):
         # Determine whether the desired data exists or not
         fd_path = paths.join(self.flow_path, fd.uuid)
-        try:
-            fd_data, _zstat = self._client.get(fd_path)
-        except k_exc.NoNodeError:
+        fd_node = next(nodes)
+        if fd_node is None:
             # Not-existent: create or raise exception
             if create_missing:
                 txn.create(fd_path)
@@ -235,20 +498,23 @@ class ZkConnection(base.Connection):
                                    % fd.uuid)
         else:
             # Existent: read it out
-            e_fd = logbook.FlowDetail.from_dict(misc.decode_json(fd_data))
+            e_fd = logbook.FlowDetail.from_dict(misc.decode_json(fd_node[0]))
 
         # Update and write it back
         e_fd = e_fd.merge(fd)
         fd_data = e_fd.to_dict()
-        txn.set_data(fd_path, misc.binary_encode(jsonutils.dumps(fd_data)))
+        self._set_data(txn, writes, fd_path,
+                       misc.binary_encode(jsonutils.dumps(fd_data)),
+                       node=fd_node)
         for ad in fd:
             ad_path = paths.join(fd_path, ad.uuid)
             # NOTE(harlowja): create an entry in the flow detail path
             # for the provided atom detail so that a reference exists
             # from the flow detail to its atom details.
-            if not self._client.exists(ad_path):
+            if next(nodes) is None:
                 txn.create(ad_path)
-            e_fd.add(self._update_atom_details(ad, txn, create_missing=True))
+            e_fd.add(self._merge_atom_details(ad, next(nodes), txn, writes,
+                                              create_missing=True))
         return e_fd
 
     def get_flow_details(self, fd_uuid):
@@ -257,19 +523,48 @@ class ZkConnection(base.Connection):
         *Read-only*, so no need of zk transaction.
         """
         with self._exc_wrapper():
-            return self._get_flow_details(fd_uuid)
-
-    def _get_flow_details(self, fd_uuid):
-        fd_path = paths.join(self.flow_path, fd_uuid)
-        try:
-            fd_data, _zstat = self._client.get(fd_path)
-        except k_exc.NoNodeError:
-            raise exc.NotFound("No flow details found with id: %s" % fd_uuid)
-
-        fd = logbook.FlowDetail.from_dict(misc.decode_json(fd_data))
-        for ad_uuid in self._client.get_children(fd_path):
-            fd.add(self._get_atom_details(ad_uuid))
-        return fd
+            return self._get_flow_details([fd_uuid])[0]
+
+    def _get_flow_details(self, fd_uuids, states=None, updated_before=None,
+                          ignore_missing=False):
+        # This first fetches all the flow details (and the uuids of their
+        # atom details) at once, and then all the atom details at once (so
+        # regardless of how many there are only two round-trips are
+        # needed).
+        requests = []
+        for fd_uuid in fd_uuids:
+            fd_path = paths.join(self.flow_path, fd_uuid)
+            requests.append((self._get_async, fd_path))
+            requests.append((self._client.get_children_async, fd_path))
+        responses = self._pipeline(requests)
+        fds = []
+        fd_ad_uuids = []
+        for (i, fd_uuid) in enumerate(fd_uuids):
+            fd_node, ad_uuids = responses[i * 2:i * 2 + 2]
+            if fd_node is None or ad_uuids is None:
+                if ignore_missing:
+                    continue
+                raise exc.NotFound("No flow details found with id: %s"
+                                   % fd_uuid)
+            fd_data, zstat = fd_node
+            if updated_before is not None:
+                # The znode modification time is in milliseconds.
+                updated_at = datetime.datetime.utcfromtimestamp(
+                    zstat.mtime / 1000.0)
+                if updated_at >= updated_before:
+                    continue
+            fd = logbook.FlowDetail.from_dict(misc.decode_json(fd_data))
+            if states is not None and fd.state not in states:
+                continue
+            fds.append(fd)
+            fd_ad_uuids.append(ad_uuids)
+        ads = iter(self._get_atom_details([
+            ad_uuid for ad_uuids in fd_ad_uuids for ad_uuid in ad_uuids
+        ]))
+        for (fd, ad_uuids) in zip(fds, fd_ad_uuids):
+            for _ad_uuid in ad_uuids:
+                fd.add(next(ads))
+        return fds
 
     def save_logbook(self, lb):
         """Save (update) a log_book transactionally."""
@@ -292,11 +587,10 @@ class ZkConnection(base.Connection):
                     txn.create(paths.join(fd_path, ad.uuid))
                     ad_path = paths.join(self.atom_path, ad.uuid)
                     ad_data = base._format_atom(ad)
-                    txn.create(ad_path,
-                               misc.binary_encode(jsonutils.dumps(ad_data)))
+                    txn.create(ad_path, self._codec.encode(ad_data))
             return lb
 
-        def _update_logbook(lb_path, lb_data, txn):
+        def _update_logbook(lb_path, lb_data, nodes, txn, writes):
             e_lb = logbook.LogBook.from_dict(misc.decode_json(lb_data),
                                              unmarshal_time=True)
             e_lb = e_lb.merge(lb)
@@ -304,42 +598,46 @@ class ZkConnection(base.Connection):
             txn.set_data(lb_path, misc.binary_encode(jsonutils.dumps(lb_data)))
             for fd in lb:
                 fd_path = paths.join(lb_path, fd.uuid)
-                if not self._client.exists(fd_path):
+                if next(nodes) is None:
                     # NOTE(harlowja): create an entry in the logbook path
                     # for the provided flow detail so that a reference exists
                     # from the logbook to its flow details.
                     txn.create(fd_path)
-                e_fd = self._update_flow_details(fd, txn, create_missing=True)
+                e_fd = self._merge_flow_details(fd, nodes, txn, writes,
+                                                create_missing=True)
                 e_lb.add(e_fd)
             return e_lb
 
-        with self._exc_wrapper():
-            txn = self._client.transaction()
-            # Determine whether the desired data exists or not.
+        def _save_logbook(txn, writes):
+            # Determine whether the desired data exists or not (and fetch
+            # everything needed to update it at the same time).
             lb_path = paths.join(self.book_path, lb.uuid)
-            try:
-                lb_data, _zstat = self._client.get(lb_path)
-            except k_exc.NoNodeError:
+            nodes = self._fetch_nodes(lb, lb_path=lb_path)
+            lb_node = next(nodes)
+            if lb_node is None:
                 # Create a new logbook since it doesn't exist.
-                e_lb = _create_logbook(lb_path, txn)
+                return _create_logbook(lb_path, txn)
             else:
                 # Otherwise update the existing logbook instead.
-                e_lb = _update_logbook(lb_path, lb_data, txn)
-            k_utils.checked_commit(txn)
-            return e_lb
+                return _update_logbook(lb_path, lb_node[0], nodes, txn,
+                                       writes)
+
+        with self._exc_wrapper():
+            return self._run_transaction(_save_logbook)
 
     def _get_logbook(self, lb_uuid):
         lb_path = paths.join(self.book_path, lb_uuid)
-        try:
-            lb_data, _zstat = self._client.get(lb_path)
-        except k_exc.NoNodeError:
+        lb_node, fd_uuids = self._pipeline([
+            (self._client.get_async, lb_path),
+            (self._client.get_children_async, lb_path),
+        ])
+        if lb_node is None or fd_uuids is None:
             raise exc.NotFound("No logbook found with id: %s" % lb_uuid)
-        else:
-            lb = logbook.LogBook.from_dict(misc.decode_json(lb_data),
-                                           unmarshal_time=True)
-            for fd_uuid in self._client.get_children(lb_path):
-                lb.add(self._get_flow_details(fd_uuid))
-            return lb
+        lb = logbook.LogBook.from_dict(misc.decode_json(lb_node[0]),
+                                       unmarshal_time=True)
+        for fd in self._get_flow_details(fd_uuids):
+            lb.add(fd)
+        return lb
 
     def get_logbook(self, lb_uuid):
         """Read a logbook.
@@ -358,6 +656,40 @@ class ZkConnection(base.Connection):
             for lb_uuid in self._client.get_children(self.book_path):
                 yield self._get_logbook(lb_uuid)
 
+    def iter_flow_details(self, states=None, updated_before=None):
+        """Read all flow details that match.
+
+        *Read-only*, so no need of zk transaction.
+        """
+        if states is not None:
+            states = frozenset(states)
+        with self._exc_wrapper():
+            fd_uuids = self._client.get_children(self.flow_path)
+            fds = self._get_flow_details(fd_uuids, states=states,
+                                         updated_before=updated_before,
+                                         ignore_missing=True)
+        for fd in fds:
+            yield fd
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        """Read all atom details (that match) of a flow detail.
+
+        *Read-only*, so no need of zk transaction.
+        """
+        if states is not None:
+            states = frozenset(states)
+        with self._exc_wrapper():
+            fd_path = paths.join(self.flow_path, flow_uuid)
+            try:
+                ad_uuids = self._client.get_children(fd_path)
+            except k_exc.NoNodeError:
+                raise exc.NotFound("No flow details found with id: %s"
+                                   % flow_uuid)
+            ads = self._get_atom_details(ad_uuids)
+        for ad in ads:
+            if states is None or ad.state in states:
+                yield ad
+
     def destroy_logbook(self, lb_uuid):
         """Destroy (delete) a log_book transactionally."""
 
@@ -367,6 +699,7 @@ class ZkConnection(base.Connection):
                 raise exc.NotFound("No atom details found with id: %s"
                                    % ad_uuid)
             txn.delete(ad_path)
+            deleted.append(ad_path)
 
         def _destroy_flow_details(fd_uuid, txn):
             fd_path = paths.join(self.flow_path, fd_uuid)
@@ -377,6 +710,7 @@ class ZkConnection(base.Connection):
                 _destroy_atom_details(ad_uuid, txn)
                 txn.delete(paths.join(fd_path, ad_uuid))
             txn.delete(fd_path)
+            deleted.append(fd_path)
 
         def _destroy_logbook(lb_uuid, txn):
             lb_path = paths.join(self.book_path, lb_uuid)
@@ -389,8 +723,104 @@ class ZkConnection(base.Connection):
 
         with self._exc_wrapper():
             txn = self._client.transaction()
+            deleted = []
             _destroy_logbook(lb_uuid, txn)
             k_utils.checked_commit(txn)
+            if self._cache is not None:
+                for path in deleted:
+                    self._cache.discard(path)
+
+    def _find_prunable(self, lb_uuids, states, updated_before):
+        """Finds what to delete to prune logbooks (skipping unprunable ones).
+
+        Returns a list of ``(logbook uuid, flows)`` where ``flows`` is a list
+        of ``(flow detail uuid, flow detail zstat, atom detail uuids)``.
+        """
+        fd_uuids_of = self._pipeline([
+            (self._client.get_children_async, paths.join(self.book_path, u))
+            for u in lb_uuids
+        ])
+        requests = []
+        for fd_uuids in fd_uuids_of:
+            for fd_uuid in fd_uuids or ():
+                fd_path = paths.join(self.flow_path, fd_uuid)
+                requests.append((self._client.get_async, fd_path))
+                requests.append((self._client.get_children_async, fd_path))
+        responses = iter(self._pipeline(requests))
+        prunable = []
+        for (lb_uuid, fd_uuids) in zip(lb_uuids, fd_uuids_of):
+            if not fd_uuids:
+                continue
+            flows = []
+            for fd_uuid in fd_uuids:
+                fd_node = next(responses)
+                ad_uuids = next(responses)
+                if fd_node is None or ad_uuids is None:
+                    continue
+                fd_data, zstat = fd_node
+                updated_at = datetime.datetime.utcfromtimestamp(
+                    zstat.mtime / 1000.0)
+                if updated_at >= updated_before:
+                    continue
+                fd = logbook.FlowDetail.from_dict(misc.decode_json(fd_data))
+                if fd.state not in states:
+                    continue
+                flows.append((fd_uuid, zstat, ad_uuids))
+            if len(flows) == len(fd_uuids):
+                prunable.append((lb_uuid, flows))
+        return prunable
+
+    def _prune_books(self, prunable):
+        """Deletes the given (prunable) logbooks in one transaction."""
+        txn = self._client.transaction()
+        deleted = []
+        for (lb_uuid, flows) in prunable:
+            lb_path = paths.join(self.book_path, lb_uuid)
+            for (fd_uuid, zstat, ad_uuids) in flows:
+                fd_path = paths.join(self.flow_path, fd_uuid)
+                for ad_uuid in ad_uuids:
+                    ad_path = paths.join(self.atom_path, ad_uuid)
+                    txn.delete(ad_path)
+                    txn.delete(paths.join(fd_path, ad_uuid))
+                    deleted.append(ad_path)
+                # Versioned, so that a flow detail that was updated since it
+                # was found to be prunable is not deleted.
+                txn.delete(fd_path, version=zstat.version)
+                txn.delete(paths.join(lb_path, fd_uuid))
+                deleted.append(fd_path)
+            txn.delete(lb_path)
+        k_utils.checked_commit(txn)
+        if self._cache is not None:
+            for path in deleted:
+                self._cache.discard(path)
+        return len(prunable)
+
+    def prune(self, older_than, states=base.FINISHED_STATES,
+              batch_size=base.PRUNE_BATCH_SIZE):
+        updated_before = base._prune_cutoff(older_than)
+        base._check_batch_size(batch_size)
+        states = frozenset(states)
+        pruned = 0
+        with self._exc_wrapper():
+            lb_uuids = self._client.get_children(self.book_path)
+            for i in range(0, len(lb_uuids), batch_size):
+                prunable = self._find_prunable(lb_uuids[i:i + batch_size],
+                                               states, updated_before)
+                if not prunable:
+                    continue
+                try:
+                    pruned += self._prune_books(prunable)
+                except k_utils.KazooTransactionException:
+                    # Something in the batch changed since it was found to
+                    # be prunable; retry each logbook on its own (skipping
+                    # the ones that changed).
+                    for book in prunable:
+                        try:
+                            pruned += self._prune_books([book])
+                        except k_utils.KazooTransactionException:
+                            LOG.debug("Skipped pruning logbook %s (it was"
+                                      " concurrently changed)", book[0])
+        return pruned
 
     def clear_all(self, delete_dirs=True):
         """Delete all data transactionally."""
@@ -423,3 +853,5 @@ class ZkConnection(base.Connection):
                 txn.delete(self.flow_path)
 
             k_utils.checked_commit(txn)
+            if self._cache is not None:
+                self._cache.clear()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add state and parent uuid indexes to flow and atom details
+
+Revision ID: 3162c0f3f8e4
+Revises: 589dccdf2b6e
+Create Date: 2015-02-23 10:11:26.135792
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3162c0f3f8e4'
+down_revision = '589dccdf2b6e'
+
+from alembic import op
+
+# These match the names sqlalchemy generates for columns that are marked
+# with 'index=True' in the models module, so that databases created from the
+# models directly (sqlite) and databases upgraded through these migrations
+# end up with the same index names.
+_INDEXES = [
+    ('ix_flowdetails_state', 'flowdetails', ['state']),
+    ('ix_flowdetails_parent_uuid', 'flowdetails', ['parent_uuid']),
+    ('ix_atomdetails_state', 'atomdetails', ['state']),
+    ('ix_atomdetails_parent_uuid', 'atomdetails', ['parent_uuid']),
+]
+
+
+def upgrade():
+    for (index_name, table_name, columns) in _INDEXES:
+        op.create_index(index_name, table_name, columns)
+
+
+def downgrade():
+    for (index_name, table_name, _columns) in reversed(_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -71,10 +71,10 @@ class FlowDetail(BASE, ModelBase):
     __tablename__ = 'flowdetails'
 
     # Member variables
-    state = Column(String)
+    state = Column(String, index=True)
 
     # Relationships
-    parent_uuid = Column(String, ForeignKey('logbooks.uuid'))
+    parent_uuid = Column(String, ForeignKey('logbooks.uuid'), index=True)
     atomdetails = relationship("AtomDetail",
                                single_parent=True,
                                backref=backref("flowdetails",
@@ -87,11 +87,11 @@ class AtomDetail(BASE, ModelBase):
 
     # Member variables
     atom_type = Column(Enum(*logbook.ATOM_TYPES, name='atom_types'))
-    state = Column(String)
+    state = Column(String, index=True)
     intention = Column(Enum(*states.INTENTIONS, name='intentions'))
     results = Column(Json)
     failure = Column(Json)
     version = Column(Json)
 
     # Relationships
-    parent_uuid = Column(String, ForeignKey('flowdetails.uuid'))
+    parent_uuid = Column(String, ForeignKey('flowdetails.uuid'), index=True)
@@ -15,10 +15,22 @@
 #    under the License.
 
 import abc
+import datetime
 
+from oslo_utils import timeutils
 import six
 
+from taskflow import exceptions as exc
+from taskflow.persistence import async_connection
 from taskflow.persistence import logbook
+from taskflow import states as st
+
+# Flow detail states that (by default) mean a flow has finished (so that
+# its logbook can be pruned once it has not been updated for long enough).
+FINISHED_STATES = (st.SUCCESS, st.REVERTED)
+
+# How many logbooks are (by default) pruned at once.
+PRUNE_BATCH_SIZE = 100
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -38,6 +50,19 @@ class Backend(object):
         """Return a Connection instance based on the configuration settings."""
         pass
 
+    def get_async_connection(self, loop=None, executor=None):
+        """Return an asyncio friendly connection to this backend.
+
+        The returned connection is a
+        :py:class:`~taskflow.persistence.async_connection.AsyncConnection`
+        whose methods return asyncio futures. By default this runs the
+        calls of a normal (blocking) connection in the given executor (or
+        the loops default executor); backends whose connections never block
+        can override this to avoid using threads.
+        """
+        return async_connection.ThreadedAsyncConnection(
+            self.get_connection(), loop=loop, executor=executor)
+
     @abc.abstractmethod
     def close(self):
         """Closes any resources this backend has open."""
@@ -118,6 +143,119 @@ class Connection(object):
         """Return an iterable of logbook objects."""
         pass
 
+    def iter_flow_details(self, states=None, updated_before=None):
+        """Iterates over flow details (optionally only ones that match).
+
+        :param states: only flow details in one of these states will be
+                       returned (when not provided flow details in any
+                       state will be returned)
+        :param updated_before: only flow details whose persisted record was
+                               last updated before this (naive, utc)
+                               datetime will be returned
+
+        This allows for finding (for example) flows that need to be resumed
+        without loading (and then filtering) all logbooks, so backends should
+        strive to use whatever native lookup/filtering capabilities they
+        have to make this scale with the number of *matching* flow details.
+
+        NOTE(harlowja): the flow details returned will contain their atom
+        details (just like the flow details found in a fetched logbook).
+
+        Backends should override this; this implementation loads all
+        logbooks (and since flow details do not record when they were last
+        updated it uses when the logbook that owns them was, skipping those
+        whose logbook does not record that either).
+        """
+        if states is not None:
+            states = frozenset(states)
+        for book in self.get_logbooks():
+            if updated_before is not None:
+                book_updated_at = book.updated_at or book.created_at
+                if book_updated_at is None:
+                    continue
+                if book_updated_at >= updated_before:
+                    continue
+            for flow_detail in book:
+                if states is None or flow_detail.state in states:
+                    yield flow_detail
+
+    def iter_atom_details(self, flow_uuid, states=None):
+        """Iterates over the atom details of a flow (optionally filtered).
+
+        :param flow_uuid: the uuid of the flow detail the atom details are
+                          owned by (if no flow detail with this uuid exists
+                          then a not found exception will be raised)
+        :param states: only atom details in one of these states will be
+                       returned (when not provided atom details in any
+                       state will be returned)
+
+        Backends should override this; this implementation loads all
+        logbooks to find the flow detail.
+        """
+        if states is not None:
+            states = frozenset(states)
+        for book in self.get_logbooks():
+            flow_detail = book.find(flow_uuid)
+            if flow_detail is None:
+                continue
+            for atom_detail in flow_detail:
+                if states is None or atom_detail.state in states:
+                    yield atom_detail
+            return
+        raise exc.NotFound("No flow details found with uuid '%s'"
+                           % flow_uuid)
+
+    def prune(self, older_than, states=FINISHED_STATES,
+              batch_size=PRUNE_BATCH_SIZE):
+        """Destroys (in bulk) the logbooks of flows that finished long ago.
+
+        A logbook is destroyed when it has flow details and all of them are
+        in one of the given states and were last updated before the given
+        time. This is meant to be called periodically (for example by a
+        conductor, see :py:meth:`taskflow.conductors.base.Conductor.prune`)
+        so that the stored data does not grow forever.
+
+        :param older_than: a (naive, utc) datetime or a timedelta (relative
+                           to the current time) that the flow details of a
+                           logbook must have been last updated before
+        :param states: the states that the flow details of a logbook must
+                       all be in
+        :param batch_size: how many logbooks to destroy at once (backends
+                           that can destroy many logbooks in one operation
+                           will use batches of this size)
+        :returns: the number of logbooks destroyed
+
+        Backends should override this to make use of whatever bulk removal
+        capabilities they have; this implementation loads all logbooks and
+        destroys the matching ones one at a time.
+        """
+        updated_before = _prune_cutoff(older_than)
+        _check_batch_size(batch_size)
+        prunable = set(fd.uuid for fd in self.iter_flow_details(
+            states=states, updated_before=updated_before))
+        pruned = 0
+        for book in list(self.get_logbooks()):
+            if len(book) and all(fd.uuid in prunable for fd in book):
+                try:
+                    self.destroy_logbook(book.uuid)
+                except exc.NotFound:
+                    pass
+                else:
+                    pruned += 1
+        return pruned
+
+
+def _prune_cutoff(older_than):
+    if isinstance(older_than, datetime.timedelta):
+        return timeutils.utcnow() - older_than
+    return older_than
+
+
+def _check_batch_size(batch_size):
+    if batch_size <= 0:
+        raise ValueError("Batch size must be greater than zero instead"
+                         " of %s" % batch_size)
+
 
 def _format_atom(atom_detail):
     return {
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Encoding & decoding of records saved by persistence backends."""
+
+import zlib
+
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+import six
+
+from taskflow.utils import misc
+
+msgpack = importutils.try_import('msgpack')
+lz4_frame = importutils.try_import('lz4.frame')
+
+# Records written with a non-default format are prefixed with this marker,
+# followed by one byte identifying the serializer and one byte identifying
+# the compression (if any) that was used. Since a JSON document can not
+# start with this byte, records that lack it are decoded as plain JSON (which
+# is how all records were written before this marker existed).
+MARKER = b'\x00'
+
+# Payloads smaller than this (in bytes) are not worth compressing.
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+_NO_COMPRESSION = b'-'
+
+# Older msgpack versions (before 0.5.2) decode strings via an encoding
+# instead of via the raw flag (which they do not know about).
+if msgpack is not None and getattr(msgpack, 'version', (0,)) < (0, 5, 2):
+    _MSGPACK_UNPACK_OPTIONS = {'encoding': 'utf-8'}
+else:
+    _MSGPACK_UNPACK_OPTIONS = {'raw': False}
+
+
+def _json_dumps(data):
+    return misc.binary_encode(jsonutils.dumps(data))
+
+
+def _json_loads(blob):
+    return misc.decode_json(blob)
+
+
+def _msgpack_default(value):
+    return jsonutils.to_primitive(value, convert_instances=True)
+
+
+def _msgpack_dumps(data):
+    return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+
+def _msgpack_loads(blob):
+    try:
+        data = msgpack.unpackb(blob, **_MSGPACK_UNPACK_OPTIONS)
+    except Exception as e:
+        raise ValueError("Expected msgpack decodable data: %s" % e)
+    if not isinstance(data, dict):
+        raise ValueError("Expected '%s' root type not '%s'"
+                         % (dict, type(data)))
+    return data
+
+
+def _lz4_compress(blob, level):
+    return lz4_frame.compress(blob, compression_level=level)
+
+
+def _lz4_decompress(blob):
+    return lz4_frame.decompress(blob)
+
+
+def _zlib_compress(blob, level):
+    return zlib.compress(blob, level)
+
+
+def _zlib_decompress(blob):
+    return zlib.decompress(blob)
+
+
+# Name -> (marker byte, dumps function, loads function, module needed).
+_SERIALIZERS = {
+    'json': (b'j', _json_dumps, _json_loads, None),
+    'msgpack': (b'm', _msgpack_dumps, _msgpack_loads, 'msgpack'),
+}
+
+# Name -> (marker byte, compress function, decompress function, module
+# needed, default compression level).
+_COMPRESSORS = {
+    'zlib': (b'z', _zlib_compress, _zlib_decompress, None, 6),
+    'lz4': (b'l', _lz4_compress, _lz4_decompress, 'lz4', 0),
+}
+
+_MODULES = {
+    'msgpack': msgpack,
+    'lz4': lz4_frame,
+}
+
+
+def _ensure_available(kind, name, needed):
+    if needed is not None and _MODULES.get(needed) is None:
+        raise RuntimeError("The %s %s requires the '%s' module which is"
+                           " not currently available" % (name, kind, needed))
+
+
+def _by_marker(registry, marker):
+    for (name, details) in six.iteritems(registry):
+        if details[0] == marker:
+            return (name, details)
+    raise ValueError("Unknown record format marker %r" % marker)
+
+
+class Codec(object):
+    """Encodes & decodes persisted records to & from bytes.
+
+    :param serializer: name of the serializer used to encode new records
+                       (one of ``json`` or ``msgpack``)
+    :param compression: name of the compression used to compress new
+                        records that are larger than the compression
+                        threshold (``None``, ``zlib`` or ``lz4``)
+    :param compression_threshold: size (in bytes) a serialized record must
+                                  be to be considered for compression
+    :param compression_level: level passed to the compression function (when
+                              not provided a compressor specific default is
+                              used)
+
+    Records are always decodable regardless of the serializer and
+    compression this codec was created with (each record carries a marker
+    that describes how it was written); records written by the default codec
+    (plain ``json`` without compression) contain no marker so that they are
+    identical to what was written before codecs were selectable.
+    """
+
+    def __init__(self, serializer='json', compression=None,
+                 compression_threshold=DEFAULT_COMPRESSION_THRESHOLD,
+                 compression_level=None):
+        try:
+            serializer_details = _SERIALIZERS[serializer]
+        except KeyError:
+            raise ValueError("Unknown serializer '%s' expected one of %s"
+                             % (serializer, sorted(_SERIALIZERS)))
+        _ensure_available('serializer', serializer, serializer_details[-1])
+        if compression is not None:
+            try:
+                compression_details = _COMPRESSORS[compression]
+            except KeyError:
+                raise ValueError("Unknown compression '%s' expected one of"
+                                 " %s" % (compression, sorted(_COMPRESSORS)))
+            _ensure_available('compression', compression,
+                              compression_details[3])
+            if compression_level is None:
+                compression_level = compression_details[4]
+        else:
+            compression_details = None
+        if compression_threshold < 0:
+            raise ValueError("Compression threshold must be greater than or"
+                             " equal to zero and not '%s'"
+                             % compression_threshold)
+        self._serializer = serializer
+        self._serializer_details = serializer_details
+        self._compression = compression
+        self._compression_details = compression_details
+        self._compression_threshold = compression_threshold
+        self._compression_level = compression_level
+
+    @property
+    def serializer(self):
+        """Name of the serializer new records are encoded with."""
+        return self._serializer
+
+    @property
+    def compression(self):
+        """Name of the compression new records are compressed with."""
+        return self._compression
+
+    def encode(self, data):
+        """Encodes the given (dictionary) data into a record (bytes)."""
+        serializer_marker, dumps = self._serializer_details[0:2]
+        blob = dumps(data)
+        compression_marker = _NO_COMPRESSION
+        if (self._compression_details is not None and
+                len(blob) >= self._compression_threshold):
+            compression_marker, compress = self._compression_details[0:2]
+            blob = compress(blob, self._compression_level)
+        if (self._serializer == 'json' and
+                compression_marker == _NO_COMPRESSION):
+            return blob
+        return MARKER + serializer_marker + compression_marker + blob
+
+    def decode(self, blob):
+        """Decodes a record (bytes) back into its (dictionary) data."""
+        blob = misc.binary_encode(blob)
+        if not blob.startswith(MARKER):
+            return _json_loads(blob)
+        header = blob[0:3]
+        if len(header) != 3:
+            raise ValueError("Expected a 3 byte record header not %r"
+                             % header)
+        serializer, (_m, _dumps, loads, needed) = _by_marker(
+            _SERIALIZERS, header[1:2])
+        _ensure_available('serializer', serializer, needed)
+        blob = blob[3:]
+        if header[2:3] != _NO_COMPRESSION:
+            compression, details = _by_marker(_COMPRESSORS, header[2:3])
+            _ensure_available('compression', compression, details[3])
+            try:
+                blob = details[2](blob)
+            except Exception as e:
+                raise ValueError("Expected %s decompressable data: %s"
+                                 % (compression, e))
+        return loads(blob)
+
+
+def fetch(conf):
+    """Creates a codec from the codec related keys in a backend config.
+
+    The following (optional) keys are looked for: ``serializer``,
+    ``compression``, ``compression_threshold`` and ``compression_level``
+    (see :py:class:`.Codec` for what each means).
+    """
+    kwargs = {}
+    for k in ('serializer', 'compression'):
+        if conf.get(k):
+            kwargs[k] = conf[k]
+    if kwargs.get('compression', '').lower() == 'none':
+        kwargs.pop('compression')
+    for k in ('compression_threshold', 'compression_level'):
+        if conf.get(k) is not None:
+            kwargs[k] = misc.as_int(conf[k])
+    return Codec(**kwargs)
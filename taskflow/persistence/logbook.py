@@ -30,11 +30,15 @@ from taskflow.types import failure as ft
 LOG = logging.getLogger(__name__)
 
 
+def _identity(value):
+    return value
+
+
 def _copy_function(deep_copy):
     if deep_copy:
         return copy.deepcopy
     else:
-        return lambda x: x
+        return _identity
 
 
 def _safe_marshal_time(when):
@@ -79,6 +83,10 @@ class LogBook(object):
     similar type of record used in detailing work that been completed (or work
     that has not been completed).
     """
+
+    __slots__ = ('_uuid', '_name', '_flowdetails_by_id',
+                 'created_at', 'updated_at', 'meta')
+
     def __init__(self, name, uuid=None):
         if uuid:
             self._uuid = uuid
@@ -123,28 +131,36 @@ class LogBook(object):
         NOTE(harlowja): Does not include the contained flow details.
         """
         if not marshal_time:
-            marshal_fn = lambda x: x
+            updated_at = self.updated_at
+            created_at = self.created_at
         else:
-            marshal_fn = _safe_marshal_time
-        data = {
-            'name': self.name,
+            updated_at = _safe_marshal_time(self.updated_at)
+            created_at = _safe_marshal_time(self.created_at)
+        return {
+            'name': self._name,
             'meta': self.meta,
-            'uuid': self.uuid,
-            'updated_at': marshal_fn(self.updated_at),
-            'created_at': marshal_fn(self.created_at),
+            'uuid': self._uuid,
+            'updated_at': updated_at,
+            'created_at': created_at,
         }
-        return data
 
     @classmethod
     def from_dict(cls, data, unmarshal_time=False):
         """Translates the given dictionary into an instance of this class."""
+        # NOTE: this (and the other from_dict methods) bypass ``__init__``
+        # since every attribute is about to be replaced anyway (and the
+        # constructor work, like finding the current time, is not free when
+        # many objects are being loaded).
+        obj = cls.__new__(cls)
+        obj._uuid = data['uuid'] or uuidutils.generate_uuid()
+        obj._name = data['name']
+        obj._flowdetails_by_id = {}
         if not unmarshal_time:
-            unmarshal_fn = lambda x: x
+            obj.updated_at = data['updated_at']
+            obj.created_at = data['created_at']
         else:
-            unmarshal_fn = _safe_unmarshal_time
-        obj = cls(data['name'], uuid=data['uuid'])
-        obj.updated_at = unmarshal_fn(data['updated_at'])
-        obj.created_at = unmarshal_fn(data['created_at'])
+            obj.updated_at = _safe_unmarshal_time(data['updated_at'])
+            obj.created_at = _safe_unmarshal_time(data['created_at'])
         obj.meta = _fix_meta(data)
         return obj
 
@@ -163,14 +179,24 @@ class LogBook(object):
     def __len__(self):
         return len(self._flowdetails_by_id)
 
+    def __copy__(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone._uuid = self._uuid
+        clone._name = self._name
+        clone._flowdetails_by_id = self._flowdetails_by_id
+        clone.created_at = self.created_at
+        clone.updated_at = self.updated_at
+        clone.meta = self.meta
+        return clone
+
     def copy(self, retain_contents=True):
         """Copies/clones this log book."""
-        clone = copy.copy(self)
+        clone = self.__copy__()
         if not retain_contents:
             clone._flowdetails_by_id = {}
         else:
             clone._flowdetails_by_id = self._flowdetails_by_id.copy()
-        if self.meta:
+        if self.meta is not None:
             clone.meta = self.meta.copy()
         return clone
 
@@ -186,6 +212,9 @@ class FlowDetail(object):
     storage in real time. The data in this class will only be guaranteed to be
     persisted when a save/update occurs via some backend connection.
     """
+
+    __slots__ = ('_uuid', '_name', '_atomdetails_by_id', 'state', 'meta')
+
     def __init__(self, name, uuid):
         self._uuid = uuid
         self._name = name
@@ -217,14 +246,23 @@ class FlowDetail(object):
             self.state = fd.state
         return self
 
+    def __copy__(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone._uuid = self._uuid
+        clone._name = self._name
+        clone._atomdetails_by_id = self._atomdetails_by_id
+        clone.state = self.state
+        clone.meta = self.meta
+        return clone
+
     def copy(self, retain_contents=True):
         """Copies/clones this flow detail."""
-        clone = copy.copy(self)
+        clone = self.__copy__()
         if not retain_contents:
             clone._atomdetails_by_id = {}
         else:
             clone._atomdetails_by_id = self._atomdetails_by_id.copy()
-        if self.meta:
+        if self.meta is not None:
             clone.meta = self.meta.copy()
         return clone
 
@@ -234,16 +272,19 @@ class FlowDetail(object):
         NOTE(harlowja): Does not include the contained atom details.
         """
         return {
-            'name': self.name,
+            'name': self._name,
             'meta': self.meta,
             'state': self.state,
-            'uuid': self.uuid,
+            'uuid': self._uuid,
         }
 
     @classmethod
     def from_dict(cls, data):
         """Translates the given data into an instance of this class."""
-        obj = cls(data['name'], data['uuid'])
+        obj = cls.__new__(cls)
+        obj._uuid = data['uuid']
+        obj._name = data['name']
+        obj._atomdetails_by_id = {}
         obj.state = data.get('state')
         obj.meta = _fix_meta(data)
         return obj
@@ -286,6 +327,10 @@ class AtomDetail(object):
     storage in real time. The data in this class will only be guaranteed to be
     persisted when a save/update occurs via some backend connection.
     """
+
+    __slots__ = ('_uuid', '_name', 'state', 'intention', 'results',
+                 'failure', 'meta', 'version')
+
     def __init__(self, name, uuid):
         self._uuid = uuid
         self._name = name
@@ -307,6 +352,18 @@ class AtomDetail(object):
         # information can be associated with.
         self.version = None
 
+    def __copy__(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone._uuid = self._uuid
+        clone._name = self._name
+        clone.state = self.state
+        clone.intention = self.intention
+        clone.results = self.results
+        clone.failure = self.failure
+        clone.meta = self.meta
+        clone.version = self.version
+        return clone
+
     @property
     def last_results(self):
         """Gets the atoms last result.
@@ -369,23 +426,30 @@ class AtomDetail(object):
         return {
             'failure': failure,
             'meta': self.meta,
-            'name': self.name,
+            'name': self._name,
             'results': self.results,
             'state': self.state,
             'version': self.version,
             'intention': self.intention,
-            'uuid': self.uuid,
+            'uuid': self._uuid,
         }
 
-    def _from_dict_shared(self, data):
-        self.state = data.get('state')
-        self.intention = data.get('intention')
-        self.results = data.get('results')
-        self.version = data.get('version')
-        self.meta = _fix_meta(data)
+    @classmethod
+    def _from_dict_shared(cls, data):
+        obj = cls.__new__(cls)
+        obj._uuid = data['uuid']
+        obj._name = data['name']
+        obj.state = data.get('state')
+        obj.intention = data.get('intention')
+        obj.results = data.get('results')
+        obj.version = data.get('version')
+        obj.meta = _fix_meta(data)
         failure = data.get('failure')
         if failure:
-            self.failure = ft.Failure.from_dict(failure)
+            obj.failure = ft.Failure.from_dict(failure)
+        else:
+            obj.failure = None
+        return obj
 
     @property
     def uuid(self):
@@ -403,6 +467,8 @@ class AtomDetail(object):
 class TaskDetail(AtomDetail):
     """This class represents a task detail for flow task object."""
 
+    __slots__ = ()
+
     def __init__(self, name, uuid):
         super(TaskDetail, self).__init__(name, uuid)
 
@@ -424,9 +490,7 @@ class TaskDetail(AtomDetail):
     @classmethod
     def from_dict(cls, data):
         """Translates the given data into an instance of this class."""
-        obj = cls(data['name'], data['uuid'])
-        obj._from_dict_shared(data)
-        return obj
+        return cls._from_dict_shared(data)
 
     def to_dict(self):
         """Translates the internal state of this object to a dictionary."""
@@ -447,9 +511,9 @@ class TaskDetail(AtomDetail):
 
     def copy(self):
         """Copies/clones this task detail."""
-        clone = copy.copy(self)
+        clone = self.__copy__()
         clone.results = copy.copy(self.results)
-        if self.meta:
+        if self.meta is not None:
             clone.meta = self.meta.copy()
         if self.version:
             clone.version = copy.copy(self.version)
@@ -458,6 +522,9 @@ class TaskDetail(AtomDetail):
 
 class RetryDetail(AtomDetail):
     """This class represents a retry detail for retry controller object."""
+
+    __slots__ = ()
+
     def __init__(self, name, uuid):
         super(RetryDetail, self).__init__(name, uuid)
         self.results = []
@@ -470,7 +537,7 @@ class RetryDetail(AtomDetail):
 
     def copy(self):
         """Copies/clones this retry detail."""
-        clone = copy.copy(self)
+        clone = self.__copy__()
         results = []
         # NOTE(imelnikov): we can't just deep copy Failures, as they
         # contain tracebacks, which are not copyable.
@@ -480,7 +547,7 @@ class RetryDetail(AtomDetail):
                 copied_failures[key] = failure
             results.append((data, copied_failures))
         clone.results = results
-        if self.meta:
+        if self.meta is not None:
             clone.meta = self.meta.copy()
         if self.version:
             clone.version = copy.copy(self.version)
@@ -519,13 +586,12 @@ class RetryDetail(AtomDetail):
             new_results = []
             for (data, failures) in results:
                 new_failures = {}
-                for (key, data) in six.iteritems(failures):
-                    new_failures[key] = ft.Failure.from_dict(data)
+                for (key, failure) in six.iteritems(failures):
+                    new_failures[key] = ft.Failure.from_dict(failure)
                 new_results.append((data, new_failures))
             return new_results
 
-        obj = cls(data['name'], data['uuid'])
-        obj._from_dict_shared(data)
+        obj = cls._from_dict_shared(data)
         obj.results = decode_results(obj.results)
         return obj
 
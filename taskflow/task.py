@@ -56,6 +56,13 @@ class BaseTask(atom.Atom):
     # or existing internal events...
     TASK_EVENTS = (EVENT_UPDATE_PROGRESS,)
 
+    #: How many seconds (if not ``None``) this task may spend executing (or
+    #: reverting) before the engine stops waiting on it and treats it as
+    #: having failed with a :py:class:`~taskflow.exceptions.ExecutionTimeout`
+    #: (when ``None`` the engines ``task_timeout`` option, if any, is used
+    #: instead); this can be overridden in subclasses or set on instances.
+    timeout = None
+
     def __init__(self, name, provides=None, inject=None):
         if name is None:
             name = reflection.get_class_name(self)
@@ -234,3 +241,81 @@ class FunctorTask(BaseTask):
             return self._revert(*args, **kwargs)
         else:
             return None
+
+
+class BatchMapTask(BaseTask):
+    """Maps a callable over one chunk (of many) of a sequence of items.
+
+    The sequence (which is required under the ``requires`` name) is split
+    into ``chunks`` contiguous (and nearly equally sized) chunks and this
+    task maps the callable over the ``chunk`` (zero based) one of them; it
+    provides the list of the results (in the order of the items they were
+    produced from). The bounds of the chunk are computed from the length of
+    the sequence when this task runs, so the sequence is never split (and
+    persisted again) ahead of time.
+
+    When ``per_chunk`` is false the callable is called with each item (and
+    returns the result for that item); when true the callable is called
+    once with the list of items in the chunk (and returns an iterable of the
+    results for those items), which avoids the cost of calling it for each
+    item.
+
+    This is typically not used directly but is used by the
+    :py:class:`~taskflow.patterns.map_flow.Flow` pattern.
+    """
+
+    def __init__(self, functor, chunk, chunks, requires, name=None,
+                 provides=None, per_chunk=False, inject=None):
+        if not six.callable(functor):
+            raise ValueError("Function to map must be callable")
+        if chunks <= 0:
+            raise ValueError("Chunks must be greater than zero")
+        if chunk < 0 or chunk >= chunks:
+            raise ValueError("Chunk must be greater than or equal to zero"
+                             " and less than %s" % chunks)
+        if name is None:
+            name = "%s-chunk-%s" % (reflection.get_callable_name(functor),
+                                    chunk)
+        super(BatchMapTask, self).__init__(name, provides=provides,
+                                           inject=inject)
+        self._functor = functor
+        self._chunk = chunk
+        self._chunks = chunks
+        self._per_chunk = per_chunk
+        self._build_arg_mapping(self.execute, rebind={'items': requires},
+                                auto_extract=False)
+
+    def _fetch_chunk(self, items):
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        count = len(items)
+        start = count * self._chunk // self._chunks
+        stop = count * (self._chunk + 1) // self._chunks
+        return items[start:stop]
+
+    def execute(self, items):
+        chunk = self._fetch_chunk(items)
+        if self._per_chunk:
+            return list(self._functor(chunk))
+        return [self._functor(item) for item in chunk]
+
+
+class BatchGatherTask(BaseTask):
+    """Gathers the results of many batch map tasks into a single list.
+
+    The results of the :py:class:`.BatchMapTask` tasks (which are required
+    under the names in ``requires``) are concatenated in that order.
+    """
+
+    def __init__(self, requires, name=None, provides=None, inject=None):
+        super(BatchGatherTask, self).__init__(name, provides=provides,
+                                              inject=inject)
+        self._chunk_names = list(requires)
+        self._build_arg_mapping(self.execute, requires=self._chunk_names,
+                                auto_extract=False)
+
+    def execute(self, **kwargs):
+        gathered = []
+        for name in self._chunk_names:
+            gathered.extend(kwargs[name])
+        return gathered
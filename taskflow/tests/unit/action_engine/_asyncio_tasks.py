@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# NOTE: the ``async def`` syntax these tasks use only exists in python 3.5
+# (or newer) so only import this module when running on those versions.
+
+import asyncio
+
+from taskflow import task
+
+
+class SleepyTask(task.Task):
+    """Waits (without blocking its thread) for the given delay."""
+
+    async def execute(self, delay):
+        self.update_progress(0.5)
+        await asyncio.sleep(delay)
+        return delay
+
+
+class FailingRevertingTask(task.Task):
+    """Fails (after waiting) and then reverts (after waiting again)."""
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        raise RuntimeError("Woot!")
+
+    async def revert(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return 'reverted'
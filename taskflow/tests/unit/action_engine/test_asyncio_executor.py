@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+
+import testtools
+
+from taskflow.engines.action_engine import executor
+from taskflow import test
+from taskflow.tests import utils
+from taskflow.types import failure
+from taskflow.types import timing
+
+
+@testtools.skipIf(sys.version_info < (3, 5), 'async def is not available')
+class AsyncioExecutorTest(test.TestCase):
+    def setUp(self):
+        super(AsyncioExecutorTest, self).setUp()
+        from taskflow.tests.unit.action_engine import _asyncio_tasks
+        self.tasks = _asyncio_tasks
+        self.executor = executor.ParallelAsyncioTaskExecutor(max_workers=1)
+        self.executor.start()
+        self.addCleanup(self.executor.stop)
+
+    def test_many_concurrent(self):
+        # Far more tasks than threads, all waiting at the same time.
+        fs = []
+        watch = timing.StopWatch()
+        watch.start()
+        for i in range(0, 200):
+            fs.append(self.executor.execute_task(
+                self.tasks.SleepyTask('s-%s' % i), 's-%s' % i,
+                {'delay': 0.1}))
+        for fut in fs:
+            self.assertEqual((executor.EXECUTED, 0.1), fut.result())
+        self.assertLess(watch.elapsed(), 10)
+
+    def test_progress(self):
+        seen = []
+        fut = self.executor.execute_task(
+            self.tasks.SleepyTask(), 's', {'delay': 0},
+            progress_callback=lambda event_type, details: seen.append(
+                details['progress']))
+        self.assertEqual((executor.EXECUTED, 0), fut.result())
+        self.assertEqual([0.5], seen)
+
+    def test_failure_and_revert(self):
+        failing_task = self.tasks.FailingRevertingTask()
+        outcome, result = self.executor.execute_task(
+            failing_task, 'f', {}).result()
+        self.assertEqual(executor.EXECUTED, outcome)
+        self.assertIsInstance(result, failure.Failure)
+        self.assertTrue(result.check(RuntimeError))
+        fut = self.executor.revert_task(failing_task, 'f', {}, result, {})
+        self.assertEqual((executor.REVERTED, 'reverted'), fut.result())
+
+    def test_sync_tasks_offloaded(self):
+        fs = [
+            self.executor.execute_task(utils.ProgressingTask(), 'p', {}),
+            self.executor.execute_task(self.tasks.SleepyTask(), 's',
+                                       {'delay': 0}),
+        ]
+        done, not_done = self.executor.wait_for_any(fs)
+        self.assertTrue(done)
+        self.assertEqual([(executor.EXECUTED, 5), (executor.EXECUTED, 0)],
+                         [fut.result() for fut in fs])
+        self.assertTrue(all(hasattr(fut, 'atom') for fut in fs))
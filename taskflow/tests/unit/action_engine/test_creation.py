@@ -23,6 +23,7 @@ from taskflow.persistence import backends
 from taskflow import test
 from taskflow.tests import utils
 from taskflow.types import futures as futures
+from taskflow.utils import asyncio_utils as au
 from taskflow.utils import eventlet_utils as eu
 from taskflow.utils import persistence_utils as pu
 
@@ -49,6 +50,25 @@ class ParallelCreationTest(test.TestCase):
             self.assertIsInstance(eng._task_executor,
                                   executor.ParallelProcessTaskExecutor)
 
+    @testtools.skipIf(not au.ASYNCIO_AVAILABLE, 'asyncio is not available')
+    def test_asyncio_string_creation(self):
+        eng = self._create_engine(executor='asyncio')
+        self.assertIsInstance(eng._task_executor,
+                              executor.ParallelAsyncioTaskExecutor)
+
+    def test_autoscaling_string_creation(self):
+        eng = self._create_engine(executor='autoscaling', max_workers=3,
+                                  min_workers=2, idle_timeout=1)
+        task_executor = eng._task_executor
+        self.assertIsInstance(task_executor,
+                              executor.ParallelAutoScalingThreadTaskExecutor)
+        task_executor.start()
+        try:
+            stats = task_executor._executor.statistics
+            self.assertEqual(2, stats.workers)
+        finally:
+            task_executor.stop()
+
     def test_thread_executor_creation(self):
         with futures.ThreadPoolExecutor(1) as e:
             eng = self._create_engine(executor=e)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import sys
+
+import testtools
+
+from taskflow.engines.action_engine import executor
+from taskflow import exceptions as exc
+from taskflow import task
+from taskflow import test
+from taskflow.test import mock
+from taskflow.tests import utils
+from taskflow.types import failure
+from taskflow.types import futures
+from taskflow.utils import threading_utils
+
+
+def _is_imported(module_name):
+    return module_name in sys.modules
+
+
+class _BufferTask(task.Task):
+    def execute(self, data):
+        if not isinstance(data, memoryview) or not data.readonly:
+            raise TypeError("Expected a read-only memoryview and not %r"
+                            % type(data))
+        return data.tobytes() * 2
+
+
+class ProcessExecutorTest(test.TestCase):
+    def test_channel_dispatch(self):
+        server = executor._ChannelServer()
+        self.addCleanup(server.close)
+        dispatcher = executor._Dispatcher()
+        worker = threading_utils.daemon_thread(dispatcher.run, server)
+        worker.start()
+
+        delivered = threading_utils.Event()
+        seen = []
+
+        def on_progress(event_type, details):
+            seen.append(details['progress'])
+            if len(seen) == 2:
+                delivered.set()
+
+        progress_task = utils.ProgressingTask()
+        progress_task.notifier.register(task.EVENT_UPDATE_PROGRESS,
+                                        on_progress)
+        target = executor._Target(progress_task, 'a')
+        dispatcher.register('a', target)
+        channel = executor._Channel(server.address, server.authkey, 'a')
+        try:
+            sender = executor._EventSender(channel)
+            sender(task.EVENT_UPDATE_PROGRESS, {'progress': 0.0})
+            sender(task.EVENT_UPDATE_PROGRESS, {'progress': 1.0})
+            self.assertTrue(delivered.wait(10))
+            self.assertEqual([0.0, 1.0], seen)
+            self.assertEqual(2, channel.sent_messages[executor._KIND_EVENT])
+        finally:
+            dispatcher.deregister('a')
+            dispatcher.interrupt()
+            server.wake()
+            worker.join()
+            executor._drop_child_connection(
+                executor._CHILD_CONNECTION.get('connection'))
+
+    def test_execute_with_progress(self):
+        task_executor = executor.ParallelProcessTaskExecutor(max_workers=1)
+        task_executor.start()
+        self.addCleanup(task_executor.stop)
+        seen = []
+        fut = task_executor.execute_task(
+            utils.ProgressingTask(), 'a', {},
+            progress_callback=lambda *args, **kwargs: seen.append(1))
+        self.assertEqual((executor.EXECUTED, 5), fut.result())
+        self.assertEqual(2, len(seen))
+
+    def test_templates_reused(self):
+        task_executor = executor.ParallelProcessTaskExecutor(max_workers=1)
+        task_executor.start()
+        self.addCleanup(task_executor.stop)
+        progress_task = utils.ProgressingTask()
+        seen = []
+        for _i in range(0, 3):
+            fut = task_executor.execute_task(
+                progress_task, 'a', {},
+                progress_callback=lambda *args, **kwargs: seen.append(1))
+            self.assertEqual((executor.EXECUTED, 5), fut.result())
+        fut = task_executor.revert_task(progress_task, 'a', {}, 5, {})
+        self.assertEqual((executor.REVERTED, None), fut.result())
+        self.assertEqual(6, len(seen))
+        # The revert had no progress callback (so it needed its own).
+        self.assertEqual(2, len(task_executor._templates))
+
+    def test_templates_evicted(self):
+        task_executor = executor.ParallelProcessTaskExecutor(
+            max_workers=1, template_cache_size=0)
+        task_executor.start()
+        self.addCleanup(task_executor.stop)
+        templates = task_executor._dispatcher._templates
+        progress_task = utils.ProgressingTask()
+        first = task_executor._fetch_template(progress_task)
+        second = task_executor._fetch_template(progress_task)
+        # Nothing fits, so each use gets its own (never reused key) template
+        # that is only kept while it is used.
+        self.assertNotEqual(first.key, second.key)
+        self.assertEqual(0, len(task_executor._templates))
+        self.assertEqual(set([first.key, second.key]), set(templates))
+        task_executor._release_template(first)
+        self.assertEqual([second.key], list(templates))
+        task_executor._release_template(second)
+        self.assertEqual({}, templates)
+
+    def test_evicted_templates_kept_while_used(self):
+        task_executor = executor.ParallelProcessTaskExecutor(max_workers=1)
+        template = task_executor._fetch_template(utils.ProgressingTask())
+        blob = task_executor._dispatcher._templates[template.key]
+        # Only has room for one template (at a time).
+        task_executor = executor.ParallelProcessTaskExecutor(
+            max_workers=1, template_cache_size=len(blob))
+        task_executor.start()
+        self.addCleanup(task_executor.stop)
+        templates = task_executor._dispatcher._templates
+        first = task_executor._fetch_template(utils.ProgressingTask())
+        second = task_executor._fetch_template(utils.ProgressingTask())
+        self.assertEqual(1, len(task_executor._templates))
+        self.assertIn(first.key, templates)
+        task_executor._release_template(first)
+        self.assertNotIn(first.key, templates)
+        task_executor._release_template(second)
+        self.assertIn(second.key, templates)
+
+    def test_shared_memory(self):
+        task_executor = executor.ParallelProcessTaskExecutor(
+            max_workers=1, shared_memory_threshold=1024)
+        task_executor.start()
+        directory = task_executor._shared_directory
+        try:
+            data = b'a' * 4096
+            fut = task_executor.execute_task(_BufferTask(), 'a',
+                                             {'data': data})
+            self.assertEqual((executor.EXECUTED, data * 2), fut.result())
+            # Small buffers are pickled (as they always were).
+            fut = task_executor.execute_task(_BufferTask(), 'a',
+                                             {'data': b'a'})
+            outcome, result = fut.result()
+            self.assertIsInstance(result, failure.Failure)
+            self.assertEqual([], os.listdir(directory))
+        finally:
+            task_executor.stop()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_abandon_retires_pool(self):
+        task_executor = executor.ParallelProcessTaskExecutor(max_workers=1)
+        task_executor.start()
+        self.addCleanup(task_executor.stop)
+        started = threading_utils.Event()
+        fut = task_executor.execute_task(
+            utils.HangingTask(), 'a', {},
+            progress_callback=lambda *args, **kwargs: started.set())
+        # Queued behind the hanging task (in the same pool).
+        queued_fut = task_executor.execute_task(utils.ProgressingTask(),
+                                                'b', {})
+        self.assertTrue(started.wait(10))
+        pool = task_executor._executor
+        task_executor.abandon_task(fut)
+        self.assertFalse(pool.alive)
+        self.assertIsNot(pool, task_executor._executor)
+        # The queued task still runs (in the retired pool) and once it is
+        # done the process running the hanging task is terminated.
+        self.assertEqual((executor.EXECUTED, 5),
+                         queued_fut.result(timeout=10))
+        self.assertRaises(exc.ExecutionTimeout, fut.result, timeout=10)
+        fut = task_executor.execute_task(utils.ProgressingTask(), 'a', {})
+        self.assertEqual((executor.EXECUTED, 5), fut.result(timeout=10))
+
+    def test_abandon_unretirable_pool(self):
+        task_executor = executor.ParallelProcessTaskExecutor(max_workers=1)
+        pool = mock.Mock(retirable=False)
+        fut = futures.Future()
+        fut.atom = utils.ProgressingTask()
+        submitted_fut = futures.Future()
+        submitted_fut.set_running_or_notify_cancel()
+        task_executor._submitted[fut] = (submitted_fut, pool)
+        task_executor.abandon_task(fut)
+        # Left running (in the same pool) instead of retiring the pool.
+        self.assertFalse(pool.retire.called)
+        self.assertIsNone(task_executor._executor)
+
+    def test_shared_pool(self):
+        self.addCleanup(executor.shutdown_shared_pools)
+        pools = []
+        for _i in range(0, 2):
+            task_executor = executor.ParallelProcessTaskExecutor(
+                max_workers=1, share_pool=True)
+            task_executor.start()
+            try:
+                fut = task_executor.execute_task(utils.ProgressingTask(),
+                                                 'a', {})
+                self.assertEqual((executor.EXECUTED, 5), fut.result())
+                pools.append(task_executor._executor)
+            finally:
+                task_executor.stop()
+            self.assertTrue(pools[-1].alive)
+        self.assertIs(pools[0], pools[1])
+        executor.shutdown_shared_pools()
+        self.assertFalse(pools[0].alive)
+
+    @testtools.skipIf(sys.version_info >= (3, 7),
+                      'pool options are supported by this python version')
+    def test_pool_options_unsupported(self):
+        self.assertRaises(ValueError, futures.ProcessPoolExecutor,
+                          max_workers=1, preload=['colorsys'])
+        self.assertRaises(ValueError, futures.ProcessPoolExecutor,
+                          max_workers=1, start_method='spawn')
+        self.assertRaises(ValueError, executor.ParallelProcessTaskExecutor,
+                          preload='colorsys')
+
+    def test_pool_options_checked(self):
+        with mock.patch.object(futures, '_POOL_OPTIONS_MIN_VERSION',
+                               (sys.version_info[0] + 1, 0)):
+            self.assertRaises(ValueError, futures.ProcessPoolExecutor,
+                              max_workers=1, start_method='spawn')
+            self.assertRaises(ValueError,
+                              executor.ParallelProcessTaskExecutor,
+                              preload='colorsys')
+            # Nothing is checked when the options are not used.
+            futures.ProcessPoolExecutor.validate_options()
+
+    def test_preload(self):
+        module_name = 'colorsys'
+        if _is_imported(module_name):
+            self.skipTest("Module '%s' is already imported" % module_name)
+        with futures.ProcessPoolExecutor(max_workers=1,
+                                         preload=[module_name]) as pool:
+            self.assertTrue(pool.submit(_is_imported, module_name).result())
+        self.assertFalse(_is_imported(module_name))
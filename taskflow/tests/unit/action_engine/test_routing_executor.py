@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+from taskflow import engines
+from taskflow.engines.action_engine import engine
+from taskflow.engines.action_engine import executor
+from taskflow.patterns import unordered_flow as uf
+from taskflow import task
+from taskflow import test
+from taskflow.tests import utils
+
+
+class _PidTask(task.Task):
+    def execute(self):
+        return os.getpid()
+
+
+class _ProcessPidTask(_PidTask):
+    executor_route = 'processes'
+
+
+class RoutingExecutorTest(test.TestCase):
+    def _make_executor(self, **kwargs):
+        executors = {
+            'processes': executor.ParallelProcessTaskExecutor(max_workers=1),
+            'threads': executor.ParallelThreadTaskExecutor(max_workers=1),
+        }
+        kwargs.setdefault('default_executor', 'threads')
+        return executor.RoutingTaskExecutor(executors, **kwargs)
+
+    def test_routes(self):
+        policy_task = _PidTask('policy')
+        routing_executor = self._make_executor(
+            routes={utils.ProgressingTask: 'processes'},
+            route_policy=lambda task: ('processes'
+                                       if task is policy_task else None))
+        self.assertEqual('threads', routing_executor.route(_PidTask()))
+        self.assertEqual('processes',
+                         routing_executor.route(_ProcessPidTask()))
+        self.assertEqual('processes', routing_executor.route(policy_task))
+        self.assertEqual('processes',
+                         routing_executor.route(
+                             utils.FailingTaskWithOneArg()))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, executor.RoutingTaskExecutor, {})
+        self.assertRaises(ValueError, self._make_executor,
+                          default_executor=None)
+        self.assertRaises(ValueError, self._make_executor,
+                          default_executor='crap')
+        self.assertRaises(ValueError, self._make_executor,
+                          routes={_PidTask: 'crap'})
+        routing_executor = self._make_executor(
+            route_policy=lambda task: 'crap')
+        self.assertRaises(ValueError, routing_executor.execute_task,
+                          _PidTask(), 'a', {})
+
+    def test_execute_and_wait(self):
+        routing_executor = self._make_executor()
+        routing_executor.start()
+        self.addCleanup(routing_executor.stop)
+        fs = [
+            routing_executor.execute_task(_PidTask(), 'a', {}),
+            routing_executor.execute_task(_ProcessPidTask(), 'b', {}),
+        ]
+        not_done = fs
+        while not_done:
+            _done, not_done = routing_executor.wait_for_any(not_done)
+        self.assertEqual(os.getpid(), fs[0].result()[1])
+        self.assertNotEqual(os.getpid(), fs[1].result()[1])
+
+    def test_engine_routing(self):
+        flow = uf.Flow('mixed')
+        flow.add(_PidTask('a', provides='a'),
+                 _ProcessPidTask('b', provides='b'))
+        results = engines.run(flow, engine='parallel', executor='routing',
+                              executors={'threads': 'threads',
+                                         'processes': 'processes'},
+                              default_executor='threads', max_workers=1)
+        self.assertEqual(os.getpid(), results['a'])
+        self.assertNotEqual(os.getpid(), results['b'])
+
+    def test_engine_task_executor_object(self):
+        routing_executor = self._make_executor()
+        flow = uf.Flow('mixed').add(_PidTask('a'))
+        eng = engines.load(flow, engine='parallel', executor=routing_executor)
+        self.assertIsInstance(eng, engine.ParallelActionEngine)
+        self.assertIs(routing_executor, eng._task_executor)
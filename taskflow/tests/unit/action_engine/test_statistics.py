@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from taskflow import engines
+from taskflow.engines.action_engine import executor
+from taskflow.engines.action_engine import statistics
+from taskflow.patterns import linear_flow as lf
+from taskflow import test
+from taskflow.tests import utils
+from taskflow.types import futures
+
+_PROGRESSING_TASK = 'taskflow.tests.utils.ProgressingTask'
+
+
+class TaskStatisticsTest(test.TestCase):
+    def test_in_flight(self):
+        stats = statistics.TaskStatistics()
+        fut = futures.Future()
+        fut.timings = executor.Timings()
+        stats.track(utils.ProgressingTask(), fut)
+        self.assertEqual(1, stats.in_flight)
+        self.assertEqual(1, stats.to_dict()[_PROGRESSING_TASK]['in_flight'])
+        fut.timings.started = fut.timings.submitted + 1
+        fut.timings.finished = fut.timings.started + 2
+        fut.set_result((executor.EXECUTED, None))
+        self.assertEqual(0, stats.in_flight)
+        data = stats.to_dict()[_PROGRESSING_TASK]
+        self.assertEqual(1, data['executed'])
+        self.assertEqual(1.0, data[statistics.WAITING]['maximum'])
+        self.assertEqual(2.0, data[statistics.EXECUTING]['maximum'])
+
+    def test_no_timings(self):
+        stats = statistics.TaskStatistics()
+        fut = futures.Future()
+        stats.track(utils.ProgressingTask(), fut, outcome=executor.REVERTED)
+        fut.set_result((executor.REVERTED, None))
+        data = stats.to_dict()[_PROGRESSING_TASK]
+        self.assertEqual(1, data['reverted'])
+        self.assertEqual(0, data[statistics.WAITING]['count'])
+        self.assertEqual(1, data[statistics.REVERTING]['count'])
+
+    def test_engine_statistics(self):
+        flow = lf.Flow('flow')
+        flow.add(utils.ProgressingTask('a'),
+                 utils.ProgressingTask('b'),
+                 utils.FailingTask('c'))
+        for engine_type in ('serial', 'parallel'):
+            eng = engines.load(flow, engine=engine_type)
+            self.assertEqual({}, eng.statistics()['tasks'])
+            self.assertRaises(RuntimeError, eng.run)
+            tasks = eng.statistics()['tasks']
+            data = tasks[_PROGRESSING_TASK]
+            self.assertEqual(0, data['in_flight'])
+            self.assertEqual(2, data['executed'])
+            self.assertEqual(2, data['reverted'])
+            self.assertEqual(4, data[statistics.WAITING]['count'])
+            self.assertEqual(2, data[statistics.EXECUTING]['count'])
+            self.assertEqual(2, data[statistics.REVERTING]['count'])
+            self.assertEqual(1, tasks['taskflow.tests.utils.FailingTask'][
+                'executed'])
@@ -16,11 +16,13 @@
 
 import collections
 import contextlib
+import datetime
 
 from zake import fake_client
 
 from taskflow.conductors import single_threaded as stc
 from taskflow import engines
+from taskflow import exceptions as exc
 from taskflow.jobs.backends import impl_zookeeper
 from taskflow.jobs import base
 from taskflow.patterns import linear_flow as lf
@@ -142,3 +144,18 @@ class SingleThreadedConductorTest(test_utils.EngineTestBase, test.TestCase):
             fd = lb.find(fd.uuid)
         self.assertIsNotNone(fd)
         self.assertEqual(st.REVERTED, fd.state)
+
+    def test_prune(self):
+        components = self.make_components()
+        persistence = components.persistence
+        lb, fd = pu.temporary_flow_detail(persistence)
+        fd.state = st.SUCCESS
+        with contextlib.closing(persistence.get_connection()) as conn:
+            conn.update_flow_details(fd)
+        with close_many(components.conductor, components.client):
+            self.assertEqual(0, components.conductor.prune(
+                datetime.timedelta(seconds=3600)))
+            self.assertEqual(1, components.conductor.prune(
+                datetime.timedelta(seconds=-3600)))
+        with contextlib.closing(persistence.get_connection()) as conn:
+            self.assertRaises(exc.NotFound, conn.get_logbook, lb.uuid)
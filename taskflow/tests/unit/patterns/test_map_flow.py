@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2014 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import taskflow.engines
+from taskflow.patterns import linear_flow as lf
+from taskflow.patterns import map_flow as mf
+from taskflow import task
+from taskflow import test
+from taskflow.tests import utils
+from taskflow.utils import persistence_utils as p_utils
+
+
+def _double(item):
+    return item * 2
+
+
+def _double_all(items):
+    return [item * 2 for item in items]
+
+
+class MapFlowTest(test.TestCase):
+
+    def test_map_flow_structure(self):
+        f = mf.Flow('test', _double, 'xs', 'doubled', chunks=3)
+
+        self.assertEqual(4, len(f))
+        atoms = list(f)
+        gatherer = atoms[-1]
+        self.assertIsInstance(gatherer, task.BatchGatherTask)
+        for atom in atoms[0:-1]:
+            self.assertIsInstance(atom, task.BatchMapTask)
+        self.assertEqual([(atom, gatherer) for atom in atoms[0:-1]],
+                         [(src, dst) for (src, dst, _meta) in f.iter_links()])
+        self.assertEqual(set(['xs']), f.requires)
+        self.assertIn('doubled', f.provides)
+        self.assertRaises(TypeError, f.add, utils.NoopTask('noop'))
+
+    def test_map_task_chunks(self):
+        items = list(range(0, 10))
+        results = []
+        for chunk in range(0, 3):
+            mapper = task.BatchMapTask(_double, chunk, 3, 'xs')
+            self.assertEqual(set(['xs']), mapper.requires)
+            results.append(mapper.execute(items))
+        self.assertEqual([3, 3, 4], [len(r) for r in results])
+        self.assertEqual([i * 2 for i in items], sum(results, []))
+        self.assertRaises(ValueError, task.BatchMapTask, _double, 3, 3, 'xs')
+        self.assertRaises(ValueError, mf.Flow, 'map', _double, 'xs',
+                          'doubled', chunks=0)
+
+    def test_run(self):
+        for (functor, per_chunk) in [(_double, False), (_double_all, True)]:
+            for engine in ['serial', 'parallel']:
+                f = lf.Flow('root').add(
+                    mf.Flow('map', functor, 'xs', 'doubled', chunks=4,
+                            per_chunk=per_chunk),
+                    utils.TaskOneArgOneReturn(rebind={'x': 'doubled'},
+                                              provides='result'))
+                e = taskflow.engines.load(f, engine=engine,
+                                          store={'xs': list(range(0, 99))})
+                e.run()
+                self.assertEqual([i * 2 for i in range(0, 99)],
+                                 e.storage.fetch('doubled'))
+
+    def test_chunks_not_persisted(self):
+        f = mf.Flow('map', _double, 'xs', 'doubled', chunks=4)
+        e = taskflow.engines.load(f, store={'xs': list(range(0, 10))})
+        e.run()
+        # Only the results of each chunk (and of gathering them) are saved.
+        for (name, size) in [('map-chunk-0', 2), ('map-chunk-1', 3),
+                             ('map-chunk-2', 2), ('map-chunk-3', 3)]:
+            self.assertEqual(size, len(e.storage.get(name)))
+
+    def test_more_chunks_than_items(self):
+        f = mf.Flow('map', _double, 'xs', 'doubled', chunks=4)
+        e = taskflow.engines.load(f, store={'xs': (1, 2)})
+        e.run()
+        self.assertEqual([2, 4], e.storage.fetch('doubled'))
+
+    def test_resume_only_maps_unfinished_chunks(self):
+        seen = []
+
+        def _record(item):
+            seen.append(item)
+            return item
+
+        f = mf.Flow('map', _record, 'xs', 'mapped', chunks=2)
+        book, flow_detail = p_utils.temporary_flow_detail()
+        e = taskflow.engines.load(f, flow_detail=flow_detail, book=book,
+                                  store={'xs': [1, 2, 3, 4]})
+        e.compile()
+        e.prepare()
+        # Pretend the first chunk finished before (the engine crashed).
+        e.storage.save('map-chunk-0', [1, 2])
+        e.run()
+        self.assertEqual([3, 4], seen)
+        self.assertEqual([1, 2, 3, 4], e.storage.fetch('mapped'))
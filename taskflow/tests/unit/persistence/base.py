@@ -15,7 +15,9 @@
 #    under the License.
 
 import contextlib
+import datetime
 
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from taskflow import exceptions as exc
@@ -357,3 +359,133 @@ class PersistenceTestMixin(object):
         rd2 = fd2.find(rd.uuid)
         self.assertEqual(rd2.intention, states.REVERT)
         self.assertIsInstance(rd2, logbook.RetryDetail)
+
+    def test_flow_details_iter_by_state(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = logbook.LogBook(name=lb_name, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        fd.state = states.RUNNING
+        fd2 = logbook.FlowDetail('test-2', uuid=uuidutils.generate_uuid())
+        fd2.state = states.SUCCESS
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        lb.add(fd)
+        lb.add(fd2)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        with contextlib.closing(self._get_connection()) as conn:
+            found = dict((f.uuid, f) for f in conn.iter_flow_details())
+            self.assertIn(fd.uuid, found)
+            self.assertIn(fd2.uuid, found)
+            found = dict((f.uuid, f) for f in conn.iter_flow_details(
+                states=[states.RUNNING, states.SUSPENDED]))
+            self.assertIn(fd.uuid, found)
+            self.assertNotIn(fd2.uuid, found)
+            self.assertIsNotNone(found[fd.uuid].find(td.uuid))
+            found = list(conn.iter_flow_details(states=[]))
+            self.assertEqual([], found)
+
+        fd.state = states.SUCCESS
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.update_flow_details(fd)
+            found = [f.uuid for f in conn.iter_flow_details(
+                states=[states.RUNNING])]
+            self.assertNotIn(fd.uuid, found)
+
+    def test_flow_details_iter_updated_before(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = logbook.LogBook(name=lb_name, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        fd.state = states.RUNNING
+        lb.add(fd)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        past = timeutils.utcnow() - datetime.timedelta(seconds=3600)
+        future = timeutils.utcnow() + datetime.timedelta(seconds=3600)
+        with contextlib.closing(self._get_connection()) as conn:
+            found = [f.uuid for f in conn.iter_flow_details(
+                updated_before=past)]
+            self.assertNotIn(fd.uuid, found)
+            found = [f.uuid for f in conn.iter_flow_details(
+                states=[states.RUNNING], updated_before=future)]
+            self.assertIn(fd.uuid, found)
+
+    def test_atom_details_iter(self):
+        lb_id = uuidutils.generate_uuid()
+        lb_name = 'lb-%s' % (lb_id)
+        lb = logbook.LogBook(name=lb_name, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        td.state = states.RUNNING
+        td2 = logbook.TaskDetail("detail-2", uuid=uuidutils.generate_uuid())
+        td2.state = states.SUCCESS
+        rd = logbook.RetryDetail("retry-1", uuid=uuidutils.generate_uuid())
+        rd.state = states.RUNNING
+        fd.add(td)
+        fd.add(td2)
+        fd.add(rd)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+
+        with contextlib.closing(self._get_connection()) as conn:
+            found = dict((a.uuid, a) for a in conn.iter_atom_details(fd.uuid))
+            self.assertEqual(set([td.uuid, td2.uuid, rd.uuid]), set(found))
+            found = dict((a.uuid, a) for a in conn.iter_atom_details(
+                fd.uuid, states=[states.RUNNING]))
+            self.assertEqual(set([td.uuid, rd.uuid]), set(found))
+            self.assertIsInstance(found[td.uuid], logbook.TaskDetail)
+            self.assertIsInstance(found[rd.uuid], logbook.RetryDetail)
+
+        td.state = states.SUCCESS
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.update_atom_details(td)
+            found = [a.uuid for a in conn.iter_atom_details(
+                fd.uuid, states=[states.RUNNING])]
+            self.assertEqual([rd.uuid], found)
+
+    def test_atom_details_iter_flow_not_existing(self):
+        with contextlib.closing(self._get_connection()) as conn:
+            self.assertRaises(exc.NotFound, list,
+                              conn.iter_atom_details(
+                                  uuidutils.generate_uuid()))
+
+    def test_prune(self):
+
+        def _make_book(*flow_states):
+            lb = logbook.LogBook('lb', uuid=uuidutils.generate_uuid())
+            for state in flow_states:
+                fd = logbook.FlowDetail('fd', uuid=uuidutils.generate_uuid())
+                fd.state = state
+                td = logbook.TaskDetail('td', uuid=uuidutils.generate_uuid())
+                td.state = state
+                fd.add(td)
+                lb.add(fd)
+            return lb
+
+        finished = [_make_book(states.SUCCESS, states.REVERTED),
+                    _make_book(states.SUCCESS)]
+        unfinished = [_make_book(states.SUCCESS, states.RUNNING),
+                      _make_book()]
+        with contextlib.closing(self._get_connection()) as conn:
+            for lb in finished + unfinished:
+                conn.save_logbook(lb)
+
+        past = datetime.timedelta(seconds=3600)
+        future = timeutils.utcnow() + datetime.timedelta(seconds=3600)
+        with contextlib.closing(self._get_connection()) as conn:
+            self.assertRaises(ValueError, conn.prune, future, batch_size=0)
+            self.assertEqual(0, conn.prune(past))
+            self.assertEqual(2, conn.prune(future, batch_size=1))
+            self.assertEqual(0, conn.prune(future))
+            for lb in finished:
+                self.assertRaises(exc.NotFound, conn.get_logbook, lb.uuid)
+                for fd in lb:
+                    self.assertRaises(exc.NotFound, list,
+                                      conn.iter_atom_details(fd.uuid))
+            for lb in unfinished:
+                self.assertEqual(len(lb), len(conn.get_logbook(lb.uuid)))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import shutil
+import tempfile
+
+from oslo_utils import uuidutils
+import testtools
+
+from taskflow import exceptions as exc
+from taskflow.persistence import async_connection
+from taskflow.persistence.backends import impl_dir
+from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import logbook
+from taskflow import states
+from taskflow import test
+from taskflow.utils import asyncio_utils as au
+
+
+def _make_book():
+    lb = logbook.LogBook('lb', uuid=uuidutils.generate_uuid())
+    fd = logbook.FlowDetail('fd', uuid=uuidutils.generate_uuid())
+    fd.add(logbook.TaskDetail('td', uuid=uuidutils.generate_uuid()))
+    lb.add(fd)
+    return lb
+
+
+class AsyncConnectionTestMixin(object):
+    def _get_async_connection(self):
+        raise NotImplementedError('_get_async_connection() implementation'
+                                  ' required')
+
+    def setUp(self):
+        super(AsyncConnectionTestMixin, self).setUp()
+        self.loop = au.asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def _run(self, future):
+        return self.loop.run_until_complete(future)
+
+    def _drain(self, iterator):
+        items = []
+        while True:
+            try:
+                items.append(self._run(iterator.__anext__()))
+            except async_connection._StopAsyncIteration:
+                return items
+
+    def _close(self, conn):
+        self._run(conn.close())
+
+    def _connect(self):
+        conn = self._get_async_connection()
+        self.addCleanup(self._close, conn)
+        self._run(conn.upgrade())
+        return conn
+
+    def test_save_update_get(self):
+        conn = self._connect()
+        lb = _make_book()
+        self._run(conn.save_logbook(lb))
+        fd = list(lb)[0]
+        td = list(fd)[0]
+        td.state = states.SUCCESS
+        self._run(conn.update_atom_details(td))
+        fd.state = states.SUCCESS
+        self._run(conn.update_flow_details(fd))
+        lb2 = self._run(conn.get_logbook(lb.uuid))
+        fd2 = lb2.find(fd.uuid)
+        self.assertEqual(states.SUCCESS, fd2.state)
+        self.assertEqual(states.SUCCESS, fd2.find(td.uuid).state)
+
+    def test_iteration(self):
+        conn = self._connect()
+        books = [_make_book() for _i in range(0, 3)]
+        for lb in books:
+            self._run(conn.save_logbook(lb))
+        found = self._drain(conn.get_logbooks())
+        self.assertEqual(set(lb.uuid for lb in books),
+                         set(lb.uuid for lb in found))
+        fd = list(books[0])[0]
+        found = self._drain(conn.iter_atom_details(fd.uuid))
+        self.assertEqual([ad.uuid for ad in fd], [ad.uuid for ad in found])
+
+    def test_errors(self):
+        conn = self._connect()
+        self.assertRaises(exc.NotFound, self._run,
+                          conn.get_logbook(uuidutils.generate_uuid()))
+        self.assertRaises(exc.NotFound, self._drain,
+                          conn.iter_atom_details(uuidutils.generate_uuid()))
+
+
+@testtools.skipIf(not au.ASYNCIO_AVAILABLE, 'asyncio is not available')
+class MemoryAsyncConnectionTest(AsyncConnectionTestMixin, test.TestCase):
+    def _get_async_connection(self):
+        return self.backend.get_async_connection(loop=self.loop)
+
+    def setUp(self):
+        super(MemoryAsyncConnectionTest, self).setUp()
+        self.backend = impl_memory.MemoryBackend()
+
+    def test_inline(self):
+        conn = self._get_async_connection()
+        self.assertIsInstance(conn, async_connection.InlineAsyncConnection)
+        self.assertTrue(conn.save_logbook(_make_book()).done())
+
+
+@testtools.skipIf(not au.ASYNCIO_AVAILABLE, 'asyncio is not available')
+class DirAsyncConnectionTest(AsyncConnectionTestMixin, test.TestCase):
+    def _get_async_connection(self):
+        return self.backend.get_async_connection(loop=self.loop)
+
+    def setUp(self):
+        super(DirAsyncConnectionTest, self).setUp()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.backend = impl_dir.DirBackend({'path': path})
+
+    def test_threaded(self):
+        conn = self._get_async_connection()
+        self.assertIsInstance(conn,
+                              async_connection.ThreadedAsyncConnection)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_serialization import jsonutils
+import testtools
+
+from taskflow.persistence import codec
+from taskflow import test
+from taskflow.utils import misc
+
+_MSGPACK_AVAILABLE = codec.msgpack is not None
+
+
+def _make_data(count=512):
+    return {
+        'type': 'TaskDetail',
+        'atom': {
+            'name': 'a',
+            'results': list(range(0, count)),
+        },
+    }
+
+
+class CodecTest(test.TestCase):
+    def test_default_is_plain_json(self):
+        data = _make_data()
+        blob = codec.Codec().encode(data)
+        self.assertIsInstance(blob, bytes)
+        self.assertEqual(data, misc.decode_json(blob))
+
+    def test_legacy_json_decodes(self):
+        data = _make_data()
+        for c in [codec.Codec(), codec.Codec(compression='zlib')]:
+            self.assertEqual(data, c.decode(jsonutils.dumps(data)))
+            self.assertEqual(
+                data, c.decode(misc.binary_encode(jsonutils.dumps(data))))
+
+    def test_zlib_round_trip(self):
+        data = _make_data()
+        c = codec.Codec(compression='zlib', compression_threshold=0)
+        blob = c.encode(data)
+        self.assertTrue(blob.startswith(codec.MARKER))
+        self.assertLess(len(blob), len(codec.Codec().encode(data)))
+        self.assertEqual(data, c.decode(blob))
+        self.assertEqual(data, codec.Codec().decode(blob))
+
+    def test_compression_threshold(self):
+        data = _make_data(count=1)
+        c = codec.Codec(compression='zlib')
+        blob = c.encode(data)
+        self.assertFalse(blob.startswith(codec.MARKER))
+        self.assertEqual(data, c.decode(blob))
+
+    @testtools.skipIf(not _MSGPACK_AVAILABLE, 'msgpack is not available')
+    def test_msgpack_round_trip(self):
+        data = _make_data()
+        data['atom']['results'] = {'blob': b'\x00\xff' * 32, 'f': 1.5}
+        for compression in [None, 'zlib']:
+            c = codec.Codec(serializer='msgpack', compression=compression,
+                            compression_threshold=0)
+            blob = c.encode(data)
+            self.assertTrue(blob.startswith(codec.MARKER))
+            self.assertEqual(data, c.decode(blob))
+            self.assertEqual(data, codec.Codec().decode(blob))
+
+    def test_fetch(self):
+        c = codec.fetch({'compression': 'zlib',
+                         'compression_threshold': '10'})
+        self.assertEqual('json', c.serializer)
+        self.assertEqual('zlib', c.compression)
+        c = codec.fetch({'compression': 'none'})
+        self.assertIsNone(c.compression)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, codec.Codec, serializer='xml')
+        self.assertRaises(ValueError, codec.Codec, compression='rar')
+        self.assertRaises(ValueError, codec.Codec, compression_threshold=-1)
+        self.assertRaises(ValueError, codec.Codec().decode,
+                          codec.MARKER + b'x-{}')
+        self.assertRaises(ValueError, codec.Codec().decode,
+                          codec.MARKER + b'jz-not-zlib')
@@ -19,8 +19,11 @@ import os
 import shutil
 import tempfile
 
+from oslo_utils import uuidutils
+
 from taskflow.persistence import backends
 from taskflow.persistence.backends import impl_dir
+from taskflow.persistence import logbook
 from taskflow import test
 from taskflow.tests.unit.persistence import base
 
@@ -30,8 +33,11 @@ class DirPersistenceTest(test.TestCase, base.PersistenceTestMixin):
         conf = {
             'path': self.path,
         }
+        conf.update(self.codec_conf)
         return impl_dir.DirBackend(conf).get_connection()
 
+    codec_conf = {}
+
     def setUp(self):
         super(DirPersistenceTest, self).setUp()
         self.path = tempfile.mkdtemp()
@@ -59,3 +65,78 @@ class DirPersistenceTest(test.TestCase, base.PersistenceTestMixin):
 
     def test_file_backend_entry_point(self):
         self._check_backend(dict(connection='file:', path=self.path))
+
+    def test_file_cache(self):
+        conf = {
+            'path': self.path,
+        }
+        conf.update(self.codec_conf)
+        backend = impl_dir.DirBackend(conf)
+        conn = backend.get_connection()
+        lb_id = uuidutils.generate_uuid()
+        lb = logbook.LogBook(name='lb-%s' % lb_id, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        lb.add(fd)
+        conn.save_logbook(lb)
+
+        # Everything just written should now be cached.
+        lb2 = conn.get_logbook(lb_id)
+        stats = backend.file_cache.statistics
+        self.assertEqual(0, stats.misses)
+        self.assertEqual(3, stats.count)
+
+        # Changing what was handed out does not alter what is cached.
+        lb2.find(fd.uuid).find(td.uuid).meta['a'] = 'b'
+        lb3 = conn.get_logbook(lb_id)
+        self.assertEqual({}, lb3.find(fd.uuid).find(td.uuid).meta)
+
+        # Changes made through another backend are noticed.
+        other_conn = impl_dir.DirBackend(conf).get_connection()
+        td.results = 'changed'
+        other_conn.update_atom_details(td)
+        lb4 = conn.get_logbook(lb_id)
+        self.assertEqual('changed', lb4.find(fd.uuid).find(td.uuid).results)
+
+    def test_file_cache_bounded(self):
+        conf = {
+            'path': self.path,
+            'cache_size': 0,
+        }
+        backend = impl_dir.DirBackend(conf)
+        conn = backend.get_connection()
+        lb_id = uuidutils.generate_uuid()
+        lb = logbook.LogBook(name='lb-%s' % lb_id, uuid=lb_id)
+        conn.save_logbook(lb)
+        self.assertEqual(lb.name, conn.get_logbook(lb_id).name)
+        self.assertEqual(0, len(backend.file_cache))
+        self.assertEqual(0, backend.file_cache.size)
+
+
+class DirPersistenceCompressedTest(DirPersistenceTest):
+    codec_conf = {
+        'compression': 'zlib',
+        'compression_threshold': 0,
+    }
+
+    def test_reads_uncompressed(self):
+        conn = self._get_connection()
+        conf = {
+            'path': self.path,
+        }
+        plain_conn = impl_dir.DirBackend(conf).get_connection()
+        lb_id = uuidutils.generate_uuid()
+        lb = logbook.LogBook(name='lb-%s' % lb_id, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        td.results = list(range(0, 100))
+        fd.add(td)
+        lb.add(fd)
+        plain_conn.save_logbook(lb)
+        lb2 = conn.get_logbook(lb_id)
+        self.assertEqual(td.results, lb2.find(fd.uuid).find(td.uuid).results)
+        td.results = 'changed'
+        conn.update_atom_details(td)
+        lb2 = plain_conn.get_logbook(lb_id)
+        self.assertEqual('changed', lb2.find(fd.uuid).find(td.uuid).results)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import os
+import shutil
+import tempfile
+
+from oslo_utils import uuidutils
+
+from taskflow.persistence import backends
+from taskflow.persistence.backends import impl_log
+from taskflow.persistence import logbook
+from taskflow import states
+from taskflow import test
+from taskflow.test import mock
+from taskflow.tests.unit.persistence import base
+
+
+class LogPersistenceTest(test.TestCase, base.PersistenceTestMixin):
+    def _get_backend(self, **kwargs):
+        conf = {
+            'path': self.path,
+        }
+        conf.update(kwargs)
+        return impl_log.LogBackend(conf)
+
+    def _get_connection(self):
+        return self._get_backend().get_connection()
+
+    def setUp(self):
+        super(LogPersistenceTest, self).setUp()
+        self.path = tempfile.mkdtemp()
+        conn = self._get_connection()
+        conn.upgrade()
+
+    def tearDown(self):
+        super(LogPersistenceTest, self).tearDown()
+        conn = self._get_connection()
+        conn.clear_all()
+        if self.path and os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        self.path = None
+
+    def _make_book(self):
+        lb_id = uuidutils.generate_uuid()
+        lb = logbook.LogBook(name='lb-%s' % lb_id, uuid=lb_id)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        lb.add(fd)
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        return (lb, fd, td)
+
+    def test_log_backend_entry_point(self):
+        conf = dict(connection='log:', path=self.path)
+        with contextlib.closing(backends.fetch(conf)) as be:
+            self.assertIsInstance(be, impl_log.LogBackend)
+
+    def test_updates_appended(self):
+        lb, fd, td = self._make_book()
+        conn = self._get_connection()
+        conn.save_logbook(lb)
+        segment_path = os.path.join(self.path, 'books', lb.uuid)
+        size = os.path.getsize(segment_path)
+        for i in range(0, 10):
+            td.results = i
+            conn.update_atom_details(td)
+            new_size = os.path.getsize(segment_path)
+            self.assertLess(size, new_size)
+            size = new_size
+
+        # A different backend (with no prior index) should see the same.
+        conn2 = self._get_connection()
+        lb2 = conn2.get_logbook(lb.uuid)
+        self.assertEqual(9, lb2.find(fd.uuid).find(td.uuid).results)
+
+    def test_index_follows_other_writers(self):
+        lb, fd, td = self._make_book()
+        conn = self._get_connection()
+        conn2 = self._get_connection()
+        conn.save_logbook(lb)
+        self.assertEqual(lb.name, conn2.get_logbook(lb.uuid).name)
+        td.state = states.SUCCESS
+        conn.update_atom_details(td)
+        ads = list(conn2.iter_atom_details(fd.uuid, states=[states.SUCCESS]))
+        self.assertEqual([td.uuid], [ad.uuid for ad in ads])
+        td.results = 'other'
+        conn2.update_atom_details(td)
+        lb2 = conn.get_logbook(lb.uuid)
+        self.assertEqual('other', lb2.find(fd.uuid).find(td.uuid).results)
+
+    def test_compaction(self):
+        lb, fd, td = self._make_book()
+        conn = self._get_backend(compaction_threshold=10).get_connection()
+        conn.save_logbook(lb)
+        segment_path = os.path.join(self.path, 'books', lb.uuid)
+        for i in range(0, 50):
+            td.results = i
+            conn.update_atom_details(td)
+        # One book, one flow and one atom (and less then the 10 needed to
+        # trigger another compaction) records should remain.
+        self.assertLess(os.path.getsize(segment_path), 10 * 512)
+        lb2 = self._get_connection().get_logbook(lb.uuid)
+        self.assertEqual(49, lb2.find(fd.uuid).find(td.uuid).results)
+
+    def test_partial_record_ignored(self):
+        lb, fd, td = self._make_book()
+        conn = self._get_connection()
+        conn.save_logbook(lb)
+        segment_path = os.path.join(self.path, 'books', lb.uuid)
+        size = os.path.getsize(segment_path)
+        with open(segment_path, 'ab') as fp:
+            fp.write(b'\x00\x00\x10\x00garbage')
+        conn2 = self._get_connection()
+        with mock.patch.object(impl_log.LOG, 'warn') as warn:
+            for _i in range(0, 2):
+                lb2 = conn2.get_logbook(lb.uuid)
+                self.assertIsNotNone(lb2.find(fd.uuid).find(td.uuid))
+        # The torn record is dropped (so later reads do not see it).
+        self.assertEqual(1, warn.call_count)
+        self.assertEqual(size, os.path.getsize(segment_path))
+        td.results = 'after'
+        conn2.update_atom_details(td)
+        lb2 = self._get_connection().get_logbook(lb.uuid)
+        self.assertEqual('after', lb2.find(fd.uuid).find(td.uuid).results)
+
+    def test_locks_bounded(self):
+        conn = self._get_connection()
+        for _i in range(0, impl_log._LOCK_STRIPES * 2):
+            lb, _fd, _td = self._make_book()
+            conn.save_logbook(lb)
+            conn.destroy_logbook(lb.uuid)
+        lock_path = os.path.join(self.path, 'locks')
+        self.assertLess(len(os.listdir(lock_path)),
+                        impl_log._LOCK_STRIPES + 1)
+
+    def test_flow_atoms_indexed(self):
+        lb, fd, td = self._make_book()
+        fd2 = logbook.FlowDetail('test-2', uuid=uuidutils.generate_uuid())
+        td2 = logbook.TaskDetail("detail-2", uuid=uuidutils.generate_uuid())
+        fd2.add(td2)
+        lb.add(fd2)
+        conn = self._get_backend(compaction_threshold=10).get_connection()
+        conn.save_logbook(lb)
+        for i in range(0, 20):
+            td.results = i
+            conn.update_atom_details(td)
+        # Compaction must keep each flow owning (only) its own atoms.
+        segment = conn._segments[lb.uuid]
+        self.assertEqual({fd.uuid: set([td.uuid]),
+                          fd2.uuid: set([td2.uuid])}, segment.flow_atoms)
+        lb2 = self._get_connection().get_logbook(lb.uuid)
+        self.assertEqual([td.uuid], [ad.uuid for ad in lb2.find(fd.uuid)])
+        self.assertEqual([td2.uuid], [ad.uuid for ad in lb2.find(fd2.uuid)])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+from oslo_utils import uuidutils
+
+from taskflow.persistence import logbook
+from taskflow import states
+from taskflow import test
+from taskflow.types import failure
+
+
+def _make_failure():
+    try:
+        raise RuntimeError("Woot!")
+    except RuntimeError:
+        return failure.Failure()
+
+
+class LogBookModelTest(test.TestCase):
+    def test_slotted(self):
+        objs = [
+            logbook.LogBook('lb'),
+            logbook.FlowDetail('fd', uuidutils.generate_uuid()),
+            logbook.TaskDetail('td', uuidutils.generate_uuid()),
+            logbook.RetryDetail('rd', uuidutils.generate_uuid()),
+        ]
+        for obj in objs:
+            self.assertFalse(hasattr(obj, '__dict__'))
+            self.assertRaises(AttributeError, setattr, obj, 'blah', 1)
+
+    def test_logbook_round_trip(self):
+        lb = logbook.LogBook('lb')
+        lb.meta = {'a': 1}
+        lb.add(logbook.FlowDetail('fd', uuidutils.generate_uuid()))
+        for marshal_time in (True, False):
+            lb2 = logbook.LogBook.from_dict(
+                lb.to_dict(marshal_time=marshal_time),
+                unmarshal_time=marshal_time)
+            self.assertEqual(lb.to_dict(), lb2.to_dict())
+            self.assertEqual(0, len(lb2))
+
+    def test_flow_detail_round_trip(self):
+        fd = logbook.FlowDetail('fd', uuidutils.generate_uuid())
+        fd.state = states.RUNNING
+        fd.add(logbook.TaskDetail('td', uuidutils.generate_uuid()))
+        fd2 = logbook.FlowDetail.from_dict(fd.to_dict())
+        self.assertEqual(fd.to_dict(), fd2.to_dict())
+        self.assertEqual(0, len(fd2))
+
+    def test_atom_details_round_trip(self):
+        td = logbook.TaskDetail('td', uuidutils.generate_uuid())
+        td.put(states.FAILURE, _make_failure())
+        td.version = (1, 0)
+        td2 = logbook.TaskDetail.from_dict(td.to_dict())
+        self.assertEqual(td.to_dict(), td2.to_dict())
+        self.assertTrue(td2.failure.matches(td.failure))
+
+        rd = logbook.RetryDetail('rd', uuidutils.generate_uuid())
+        rd.put(states.SUCCESS, 1)
+        rd.results[-1][1]['td'] = _make_failure()
+        rd2 = logbook.RetryDetail.from_dict(rd.to_dict())
+        self.assertEqual(rd.to_dict(), rd2.to_dict())
+        self.assertIsNone(rd2.failure)
+
+    def test_copies(self):
+        fd = logbook.FlowDetail('fd', uuidutils.generate_uuid())
+        td = logbook.TaskDetail('td', uuidutils.generate_uuid())
+        td.put(states.SUCCESS, [1, 2])
+        fd.add(td)
+
+        shallow = copy.copy(td)
+        self.assertIs(td.results, shallow.results)
+        self.assertIs(td.meta, shallow.meta)
+
+        td2 = td.copy()
+        self.assertEqual(td.to_dict(), td2.to_dict())
+        self.assertIsNot(td.results, td2.results)
+        self.assertIsNot(td.meta, td2.meta)
+
+        fd2 = fd.copy()
+        self.assertIs(td, fd2.find(td.uuid))
+        self.assertIsNot(fd.meta, fd2.meta)
+        self.assertEqual(0, len(fd.copy(retain_contents=False)))
+        self.assertEqual(1, len(fd))
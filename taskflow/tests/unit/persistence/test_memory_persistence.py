@@ -15,10 +15,16 @@
 #    under the License.
 
 import contextlib
+import threading
+
+from oslo_utils import uuidutils
 
 from taskflow.persistence import backends
 from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import base as persistence_base
+from taskflow.persistence import logbook
 from taskflow import test
+from taskflow.test import mock
 from taskflow.tests.unit.persistence import base
 
 
@@ -45,3 +51,96 @@ class MemoryPersistenceTest(test.TestCase, base.PersistenceTestMixin):
         conf = {'connection': 'memory'}  # note no colon
         with contextlib.closing(backends.fetch(conf)) as be:
             self.assertIsInstance(be, impl_memory.MemoryBackend)
+
+    def test_saved_not_altered_in_place(self):
+        lb = logbook.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        td = logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid())
+        fd.add(td)
+        lb.add(fd)
+        conn = self._get_connection()
+        conn.save_logbook(lb)
+        saved = self._backend._memory.atom_details[td.uuid]['object']
+        td.results = 'a'
+        td.meta['b'] = 'c'
+        conn.update_atom_details(td)
+        self.assertIsNone(saved.results)
+        self.assertEqual({}, saved.meta)
+        td2 = conn.get_logbook(lb.uuid).find(fd.uuid).find(td.uuid)
+        self.assertEqual('a', td2.results)
+        self.assertEqual({'b': 'c'}, td2.meta)
+
+    def test_concurrent_updates(self):
+        books = []
+        for _i in range(0, 4):
+            lb = logbook.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+            fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+            for i in range(0, 10):
+                fd.add(logbook.TaskDetail("detail-%s" % i,
+                                          uuid=uuidutils.generate_uuid()))
+            lb.add(fd)
+            self._get_connection().save_logbook(lb)
+            books.append((lb, fd))
+
+        def _update(fd):
+            conn = self._get_connection()
+            for i in range(0, 50):
+                for td in fd:
+                    td.results = i
+                    conn.update_atom_details(td)
+
+        threads = [threading.Thread(target=_update, args=(fd,))
+                   for (_lb, fd) in books]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        conn = self._get_connection()
+        for (lb, fd) in books:
+            fd2 = conn.get_logbook(lb.uuid).find(fd.uuid)
+            self.assertEqual(10, len(fd2))
+            for td in fd2:
+                self.assertEqual(49, td.results)
+
+    def test_concurrent_save_destroy(self):
+        lb = logbook.LogBook(name='lb', uuid=uuidutils.generate_uuid())
+        conn = self._get_connection()
+        conn.save_logbook(lb)
+        fd = logbook.FlowDetail('test', uuid=uuidutils.generate_uuid())
+        fd.add(logbook.TaskDetail("detail-1", uuid=uuidutils.generate_uuid()))
+        lb.add(fd)
+
+        helper = self._backend._helper
+        merge = helper.merge
+        destroyers = []
+
+        def _merge(incoming, saved_info=None):
+            if isinstance(incoming, logbook.FlowDetail) and not destroyers:
+                # Destroy the logbook while its flow is being merged.
+                destroyer = threading.Thread(target=conn.destroy_logbook,
+                                             args=(lb.uuid,))
+                destroyers.append(destroyer)
+                destroyer.start()
+                destroyer.join(0.1)
+            return merge(incoming, saved_info=saved_info)
+
+        with mock.patch.object(helper, 'merge', _merge):
+            conn.save_logbook(lb)
+        destroyers[0].join()
+        # Nothing saved (while being destroyed) should have been left behind.
+        memory = self._backend._memory
+        self.assertEqual({}, memory.log_books)
+        self.assertEqual({}, memory.flow_details)
+        self.assertEqual({}, memory.atom_details)
+
+
+class _DefaultIterConnection(impl_memory.Connection):
+    # Like connections of backends that do not provide their own (more
+    # efficient) iteration of flow and atom details.
+    iter_flow_details = persistence_base.Connection.iter_flow_details
+    iter_atom_details = persistence_base.Connection.iter_atom_details
+
+
+class DefaultIterPersistenceTest(MemoryPersistenceTest):
+    def _get_connection(self):
+        return _DefaultIterConnection(self._backend)
@@ -19,7 +19,9 @@ import contextlib
 import os
 import random
 import tempfile
+import threading
 
+from oslo_utils import uuidutils
 import six
 import testtools
 
@@ -51,7 +53,9 @@ except Exception:
 # Testing will try to run against these two mysql library variants.
 MYSQL_VARIANTS = ('mysqldb', 'pymysql')
 
+from taskflow import exceptions as exc
 from taskflow.persistence import backends
+from taskflow.persistence import logbook
 from taskflow import test
 from taskflow.tests.unit.persistence import base
 
@@ -138,6 +142,102 @@ class SqlitePersistenceTest(test.TestCase, base.PersistenceTestMixin):
             self.db_location = None
 
 
+@testtools.skipIf(not SQLALCHEMY_AVAILABLE, 'sqlalchemy is not available')
+class SqliteFastPersistenceTest(SqlitePersistenceTest):
+    """Runs the sqlite tests (and a few more) with ``sqlite_fast`` on."""
+
+    def _get_connection(self):
+        if self.backend is None:
+            conf = {
+                'connection': self.db_uri,
+                'sqlite_fast': True,
+            }
+            self.backend = impl_sqlalchemy.SQLAlchemyBackend(conf)
+        return self.backend.get_connection()
+
+    def setUp(self):
+        self.backend = None
+        super(SqliteFastPersistenceTest, self).setUp()
+
+    def tearDown(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+        super(SqliteFastPersistenceTest, self).tearDown()
+
+    def _make_flow_detail(self, conn, atom_count):
+        lb = logbook.LogBook('lb', uuid=uuidutils.generate_uuid())
+        fd = logbook.FlowDetail('fd', uuid=uuidutils.generate_uuid())
+        for i in range(0, atom_count):
+            fd.add(logbook.TaskDetail('td-%s' % i,
+                                      uuid=uuidutils.generate_uuid()))
+        lb.add(fd)
+        conn.save_logbook(lb)
+        return fd
+
+    def test_rejected_when_not_a_sqlite_file(self):
+        for connection in ('sqlite://', 'sqlite:///:memory:',
+                           'mysql://localhost/test'):
+            self.assertRaises(ValueError, impl_sqlalchemy.SQLAlchemyBackend,
+                              {'connection': connection,
+                               'sqlite_fast': True})
+        engine = sa.create_engine(self.db_uri)
+        self.addCleanup(engine.dispose)
+        self.assertRaises(ValueError, impl_sqlalchemy.SQLAlchemyBackend,
+                          {'connection': self.db_uri, 'sqlite_fast': True},
+                          engine=engine)
+
+    def test_pragmas(self):
+        with contextlib.closing(self._get_connection()) as conn:
+            engine = conn.backend.engine
+            with contextlib.closing(engine.connect()) as e_conn:
+                self.assertEqual(
+                    'wal', e_conn.execute("PRAGMA journal_mode").scalar())
+                # NORMAL is 1 (FULL, the default, is 2).
+                self.assertEqual(
+                    1, e_conn.execute("PRAGMA synchronous").scalar())
+
+    def test_concurrent_writes(self):
+        with contextlib.closing(self._get_connection()) as conn:
+            fd = self._make_flow_detail(conn, 20)
+
+        def _update(ad):
+            with contextlib.closing(self._get_connection()) as conn:
+                for i in range(0, 5):
+                    ad.results = i
+                    conn.update_atom_details(ad)
+
+        threads = [threading.Thread(target=_update, args=(ad,))
+                   for ad in fd]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with contextlib.closing(self._get_connection()) as conn:
+            for ad in conn.iter_atom_details(fd.uuid):
+                self.assertEqual(4, ad.results)
+
+    def test_group_commit_failure_isolated(self):
+        with contextlib.closing(self._get_connection()) as conn:
+            fd = self._make_flow_detail(conn, 1)
+            ad = list(fd)[0]
+            ad.results = 'ok'
+            missing = logbook.TaskDetail('missing',
+                                         uuid=uuidutils.generate_uuid())
+            committer = impl_sqlalchemy._GroupCommitter(10)
+            batch = [
+                impl_sqlalchemy._PendingWrite(conn._update_atom_details,
+                                              (), {'ad': ad}),
+                impl_sqlalchemy._PendingWrite(conn._update_atom_details,
+                                              (), {'ad': missing}),
+            ]
+            committer._commit(conn, batch)
+            self.assertIsNone(batch[0].failure)
+            self.assertTrue(batch[1].failure.check(exc.NotFound))
+            ads = list(conn.iter_atom_details(fd.uuid))
+            self.assertEqual(['ok'], [ad.results for ad in ads])
+
+
 @six.add_metaclass(abc.ABCMeta)
 class BackendPersistenceTestMixin(base.PersistenceTestMixin):
     """Specifies a backend type and does required setup and teardown."""
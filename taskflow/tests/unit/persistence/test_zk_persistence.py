@@ -15,8 +15,10 @@
 #    under the License.
 
 import contextlib
+import time
 
 from kazoo import exceptions as kazoo_exceptions
+from kazoo.protocol import paths
 from oslo_utils import uuidutils
 import testtools
 from zake import fake_client
@@ -24,7 +26,10 @@ from zake import fake_client
 from taskflow import exceptions as exc
 from taskflow.persistence import backends
 from taskflow.persistence.backends import impl_zookeeper
+from taskflow.persistence import logbook
+from taskflow import states
 from taskflow import test
+from taskflow.test import mock
 from taskflow.tests.unit.persistence import base
 from taskflow.tests import utils as test_utils
 from taskflow.utils import kazoo_utils
@@ -80,6 +85,8 @@ class ZkPersistenceTest(test.TestCase, base.PersistenceTestMixin):
 
 @testtools.skipIf(_ZOOKEEPER_AVAILABLE, 'zookeeper is available')
 class ZakePersistenceTest(test.TestCase, base.PersistenceTestMixin):
+    cache = False
+
     def _get_connection(self):
         return self._backend.get_connection()
 
@@ -87,6 +94,7 @@ class ZakePersistenceTest(test.TestCase, base.PersistenceTestMixin):
         super(ZakePersistenceTest, self).setUp()
         conf = {
             "path": "/taskflow",
+            "cache": self.cache,
         }
         self.client = fake_client.FakeClient()
         self.client.start()
@@ -98,3 +106,132 @@ class ZakePersistenceTest(test.TestCase, base.PersistenceTestMixin):
         conf = {'connection': 'zookeeper:'}
         with contextlib.closing(backends.fetch(conf)) as be:
             self.assertIsInstance(be, impl_zookeeper.ZkBackend)
+
+    def test_reads_are_pipelined(self):
+        lb = logbook.LogBook('lb', uuid=uuidutils.generate_uuid())
+        fd = logbook.FlowDetail('fd', uuid=uuidutils.generate_uuid())
+        for i in range(0, 10):
+            fd.add(logbook.TaskDetail('td-%s' % i,
+                                      uuid=uuidutils.generate_uuid()))
+        lb.add(fd)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+            get_async = mock.Mock(wraps=self.client.get_async)
+            with mock.patch.object(self.client, 'get_async', get_async):
+                lb2 = conn.get_logbook(lb.uuid)
+                # The logbook, its flow detail and each atom detail.
+                self.assertEqual(12, get_async.call_count)
+                fd.state = states.SUCCESS
+                conn.update_flow_details(fd)
+                conn.save_logbook(lb)
+            fd2 = lb2.find(fd.uuid)
+            self.assertEqual(10, len(fd2))
+            for ad in fd:
+                self.assertEqual(ad.name, fd2.find(ad.uuid).name)
+            fd3 = conn.get_flow_details(fd.uuid)
+            self.assertEqual(states.SUCCESS, fd3.state)
+            self.assertEqual(10, len(fd3))
+
+
+@testtools.skipIf(_ZOOKEEPER_AVAILABLE, 'zookeeper is available')
+class ZakeCachedPersistenceTest(ZakePersistenceTest):
+    cache = True
+
+    def _make_flow_detail(self, atom_count=3):
+        lb = logbook.LogBook('lb', uuid=uuidutils.generate_uuid())
+        fd = logbook.FlowDetail('fd', uuid=uuidutils.generate_uuid())
+        for i in range(0, atom_count):
+            fd.add(logbook.TaskDetail('td-%s' % i,
+                                      uuid=uuidutils.generate_uuid()))
+        lb.add(fd)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.save_logbook(lb)
+        return fd
+
+    def _wait_uncached(self, path):
+        for _i in range(0, 500):
+            if path not in self._backend.cache:
+                return
+            time.sleep(0.01)
+        self.fail("Node %s was never dropped from the cache" % path)
+
+    def test_cached_reads(self):
+        fd = self._make_flow_detail()
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_flow_details(fd.uuid)
+            get_async = mock.Mock(wraps=self.client.get_async)
+            with mock.patch.object(self.client, 'get_async', get_async):
+                fd2 = conn.get_flow_details(fd.uuid)
+                ad = fd2.find(list(fd)[0].uuid)
+                ad.state = states.SUCCESS
+                conn.update_atom_details(ad)
+                self.assertEqual(states.SUCCESS,
+                                 conn.get_atom_details(ad.uuid).state)
+            self.assertEqual(0, get_async.call_count)
+            self.assertEqual(3, len(fd2))
+
+    def test_remote_update_invalidates(self):
+        fd = self._make_flow_detail()
+        ad = list(fd)[0]
+        ad_path = paths.join(self._backend.path, 'atom_details', ad.uuid)
+        other = impl_zookeeper.ZkBackend({"path": "/taskflow"},
+                                         client=self.client)
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_atom_details(ad.uuid)
+            self.assertIn(ad_path, self._backend.cache)
+            with contextlib.closing(other.get_connection()) as o_conn:
+                ad.state = states.FAILURE
+                o_conn.update_atom_details(ad)
+            self._wait_uncached(ad_path)
+            self.assertEqual(states.FAILURE,
+                             conn.get_atom_details(ad.uuid).state)
+
+    def test_stale_update_retried(self):
+        fd = self._make_flow_detail()
+        ad = list(fd)[0]
+        ad_path = paths.join(self._backend.path, 'atom_details', ad.uuid)
+        other = impl_zookeeper.ZkBackend({"path": "/taskflow"},
+                                         client=self.client)
+        cache = self._backend.cache
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_atom_details(ad.uuid)
+            stale_data, stale_zstat = cache.get(ad_path)
+            with contextlib.closing(other.get_connection()) as o_conn:
+                o_ad = ad.copy()
+                o_ad.meta = {'remote': True}
+                o_conn.update_atom_details(o_ad)
+            self._wait_uncached(ad_path)
+            # Act as if the watch had not triggered yet.
+            cache.put(ad_path, stale_data, stale_zstat,
+                      cache.watcher(ad_path)[0])
+            ad.state = states.SUCCESS
+            transaction = mock.Mock(wraps=self.client.transaction)
+            with mock.patch.object(self.client, 'transaction', transaction):
+                conn.update_atom_details(ad)
+            # The versioned write of the stale node failed, so it was
+            # read again and the update retried.
+            self.assertEqual(2, transaction.call_count)
+            self.assertEqual(states.SUCCESS,
+                             conn.get_atom_details(ad.uuid).state)
+
+    def test_conflicting_updates_not_retried_forever(self):
+        fd = self._make_flow_detail()
+        ad = list(fd)[0]
+
+        def _conflicting_commit(txn):
+            failures = [(op, kazoo_exceptions.BadVersionError())
+                        for op in txn.operations]
+            raise kazoo_utils.KazooTransactionException("Conflicted", failures)
+
+        with contextlib.closing(self._get_connection()) as conn:
+            conn.get_atom_details(ad.uuid)
+            ad.state = states.SUCCESS
+            transaction = mock.Mock(wraps=self.client.transaction)
+            with mock.patch.object(self.client, 'transaction', transaction):
+                with mock.patch.object(impl_zookeeper.k_utils,
+                                       'checked_commit',
+                                       _conflicting_commit):
+                    self.assertRaises(exc.StorageFailure,
+                                      conn.update_atom_details, ad)
+            self.assertEqual(impl_zookeeper.MAX_TRANSACTION_ATTEMPTS,
+                             transaction.call_count)
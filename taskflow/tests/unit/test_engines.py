@@ -34,6 +34,7 @@ from taskflow.tests import utils
 from taskflow.types import failure
 from taskflow.types import futures
 from taskflow.types import graph as gr
+from taskflow.types import timing
 from taskflow.utils import eventlet_utils as eu
 from taskflow.utils import persistence_utils as p_utils
 from taskflow.utils import threading_utils as tu
@@ -572,6 +573,41 @@ class EngineGraphFlowTest(utils.EngineTestBase):
         self.assertIsInstance(graph, gr.DiGraph)
 
 
+class EngineTimeoutTest(utils.EngineTestBase):
+
+    def test_task_timeout_reverts(self):
+        hanging = utils.HangingTask(name='hanging')
+        hanging.timeout = 0.1
+        flow = lf.Flow('lf-timeout').add(
+            utils.ProgressingTask(name='task1'),
+            hanging
+        )
+        engine = self._make_engine(flow)
+        with utils.CaptureListener(engine, capture_flow=False) as capturer:
+            self.assertFailuresRegexp(exc.ExecutionTimeout, '^Task .hanging.',
+                                      engine.run)
+        self.assertIn('hanging.t REVERTED', capturer.values)
+        self.assertIn('task1.t REVERTED', capturer.values)
+
+    def test_task_timeout_frees_worker(self):
+        flow = uf.Flow('uf-timeout')
+        for i in range(0, 2):
+            hanging = utils.HangingTask(name='hanging-%s' % i)
+            hanging.timeout = 0.1
+            flow.add(hanging)
+        flow.add(utils.ProgressingTask(name='task1'))
+        engine = self._make_engine(flow)
+        watch = timing.StopWatch().start()
+        with utils.CaptureListener(engine, capture_flow=False) as capturer:
+            self.assertFailuresRegexp(exc.ExecutionTimeout, '^Task .hanging',
+                                      engine.run)
+        # The hanging tasks sleep for far longer than this; so the other task
+        # could only have ran (and the engine finished) if the workers that
+        # were running the hanging tasks were freed.
+        self.assertLess(watch.elapsed(), 4)
+        self.assertIn('task1.t SUCCESS(5)', capturer.values)
+
+
 class EngineCheckingTaskTest(utils.EngineTestBase):
     # FIXME: this test uses a inner class that workers/process engines can't
     # get to, so we need to do something better to make this test useful for
@@ -625,6 +661,7 @@ class ParallelEngineWithThreadsTest(EngineTaskTest,
                                     EngineLinearAndUnorderedExceptionsTest,
                                     EngineGraphFlowTest,
                                     EngineCheckingTaskTest,
+                                    EngineTimeoutTest,
                                     test.TestCase):
     _EXECUTOR_WORKERS = 2
 
@@ -651,6 +688,14 @@ class ParallelEngineWithThreadsTest(EngineTaskTest,
         finally:
             executor.shutdown(wait=True)
 
+    def test_engine_task_timeout(self):
+        flow = utils.HangingTask(name='hanging')
+        engine = taskflow.engines.load(flow, backend=self.backend,
+                                       engine='parallel', executor='threads',
+                                       task_timeout=0.1)
+        self.assertFailuresRegexp(exc.ExecutionTimeout, '^Task .hanging.',
+                                  engine.run)
+
 
 @testtools.skipIf(not eu.EVENTLET_AVAILABLE, 'eventlet is not available')
 class ParallelEngineWithEventletTest(EngineTaskTest,
@@ -675,6 +720,7 @@ class ParallelEngineWithProcessTest(EngineTaskTest,
                                     EngineParallelFlowTest,
                                     EngineLinearAndUnorderedExceptionsTest,
                                     EngineGraphFlowTest,
+                                    EngineTimeoutTest,
                                     test.TestCase):
     _EXECUTOR_WORKERS = 2
 
@@ -16,12 +16,14 @@
 
 import collections
 import functools
+import sys
 import threading
 import time
 
 import testtools
 
 from taskflow import test
+from taskflow.test import mock
 from taskflow.types import futures
 from taskflow.utils import eventlet_utils as eu
 
@@ -164,6 +166,28 @@ class _FuturesTestMixin(_SimpleFuturesTestMixin):
         self.assertEqual(create_am, e.statistics.executed)
 
 
+class _AbandonTestMixin(object):
+    def test_abandon(self):
+        started = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stuck():
+            started.set()
+            release.wait()
+
+        with self._make_executor(1) as e:
+            stuck_fut = e.submit(stuck)
+            self.assertTrue(started.wait(10))
+            queued_fut = e.submit(_return_one)
+            e.abandon(stuck_fut)
+            # The queued work runs in place of the abandoned (stuck) work.
+            self.assertEqual(1, queued_fut.result(timeout=10))
+            self.assertFalse(stuck_fut.done())
+            release.set()
+        self.assertTrue(stuck_fut.done())
+
+
 class ThreadPoolExecutorTest(test.TestCase, _FuturesTestMixin):
     def _make_executor(self, max_workers):
         return futures.ThreadPoolExecutor(max_workers=max_workers)
@@ -175,10 +199,70 @@ class ThreadPoolExecutorTest(test.TestCase, _FuturesTestMixin):
         return threading.Lock()
 
 
+class AutoScalingThreadPoolExecutorTest(test.TestCase, _FuturesTestMixin,
+                                        _AbandonTestMixin):
+    def _make_executor(self, max_workers, **kwargs):
+        return futures.AutoScalingThreadPoolExecutor(max_workers=max_workers,
+                                                     min_workers=0, **kwargs)
+
+    def _delay(self, secs):
+        time.sleep(secs)
+
+    def _make_lock(self):
+        return threading.Lock()
+
+    def test_invalid_options(self):
+        self.assertRaises(ValueError, self._make_executor, 1, idle_timeout=0)
+        self.assertRaises(ValueError, self._make_executor, 1, wait_ratio=-1)
+        self.assertRaises(ValueError, futures.AutoScalingThreadPoolExecutor,
+                          max_workers=1, min_workers=2)
+
+    def test_grows_and_shrinks(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with self._make_executor(4, idle_timeout=0.05) as e:
+            self.assertEqual(0, e.workers)
+            fs = [e.submit(release.wait) for _i in range(0, 8)]
+            self.assertEqual(4, e.workers)
+            release.set()
+            for f in fs:
+                f.result()
+            for _i in range(0, 100):
+                if not e.workers:
+                    break
+                self._delay(0.05)
+            stats = e.statistics
+            self.assertEqual(0, stats.workers)
+            self.assertEqual(4, stats.peak_workers)
+            self.assertEqual(4, stats.grown)
+            self.assertEqual(4, stats.shrunk)
+            self.assertEqual(8, stats.executed)
+            # Work can still be ran after all threads were stopped.
+            self.assertEqual(1, e.submit(_return_one).result())
+
+    def test_stays_small_for_short_work(self):
+        with self._make_executor(8, wait_ratio=1000) as e:
+            for _i in range(0, 3):
+                e.submit(_noop).result()
+            for _i in range(0, 50):
+                e.submit(_noop)
+            self.assertLess(e.statistics.peak_workers, 8)
+
+
 class ProcessPoolExecutorTest(test.TestCase, _SimpleFuturesTestMixin):
     def _make_executor(self, max_workers):
         return futures.ProcessPoolExecutor(max_workers=max_workers)
 
+    def test_retire_unsupported(self):
+        with self._make_executor(1) as e:
+            fut = e.submit(_return_one)
+            with mock.patch.object(futures, '_RETIRE_MIN_VERSION',
+                                   (sys.version_info[0] + 1, 0)):
+                self.assertFalse(e.retirable)
+                self.assertRaises(NotImplementedError, e.retire, fut)
+            self.assertTrue(e.alive)
+            self.assertEqual(1, fut.result())
+
 
 class SynchronousExecutorTest(test.TestCase, _FuturesTestMixin):
     def _make_executor(self, max_workers):
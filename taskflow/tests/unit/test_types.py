@@ -21,8 +21,10 @@ import six
 
 from taskflow import exceptions as excp
 from taskflow import test
+from taskflow.types import cache
 from taskflow.types import fsm
 from taskflow.types import graph
+from taskflow.types import histogram
 from taskflow.types import latch
 from taskflow.types import periodic
 from taskflow.types import table
@@ -265,6 +267,118 @@ class StopWatchTest(test.TestCase):
         self.assertEqual(0, watch.elapsed(maximum=-1))
 
 
+class LRUCacheTest(test.TestCase):
+    def test_hits_misses(self):
+        c = cache.LRUCache(100)
+        self.assertIsNone(c.get('a'))
+        c.put('a', 1, 10)
+        self.assertEqual(1, c.get('a'))
+        self.assertEqual(2, c.get('b', default=2))
+        stats = c.statistics
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(2, stats.misses)
+        self.assertEqual(1, stats.count)
+        self.assertEqual(10, stats.size)
+
+    def test_evicts_least_recently_used(self):
+        c = cache.LRUCache(30)
+        c.put('a', 1, 10)
+        c.put('b', 2, 10)
+        c.put('c', 3, 10)
+        self.assertEqual(1, c.get('a'))
+        c.put('d', 4, 10)
+        self.assertNotIn('b', c)
+        for k in ['a', 'c', 'd']:
+            self.assertIn(k, c)
+        self.assertEqual(30, c.size)
+        self.assertEqual(1, c.statistics.evictions)
+
+    def test_too_big(self):
+        c = cache.LRUCache(10)
+        c.put('a', 1, 5)
+        c.put('b', 2, 11)
+        self.assertNotIn('b', c)
+        self.assertIn('a', c)
+        self.assertEqual(0, c.statistics.evictions)
+
+    def test_validator(self):
+        c = cache.LRUCache(10)
+        c.put('a', 1, 5, validator=(1, 2))
+        self.assertEqual(1, c.get('a', validator=(1, 2)))
+        self.assertIsNone(c.get('a', validator=(1, 3)))
+        self.assertNotIn('a', c)
+        self.assertEqual(0, c.size)
+        self.assertEqual(1, c.statistics.misses)
+
+    def test_on_evict(self):
+        evicted = []
+        c = cache.LRUCache(10, on_evict=lambda k, v: evicted.append((k, v)))
+        c.put('a', 1, 5)
+        c.put('b', 2, 5)
+        self.assertEqual(1, c.pop('a'))
+        c.put('c', 3, 5)
+        c.put('d', 4, 5)
+        self.assertEqual([('b', 2)], evicted)
+
+    def test_pop_clear(self):
+        c = cache.LRUCache(10)
+        c.put('a', 1, 5)
+        c.put('b', 2, 5)
+        self.assertEqual(1, c.pop('a'))
+        self.assertIsNone(c.pop('a'))
+        self.assertEqual(5, c.size)
+        c.clear()
+        self.assertEqual(0, len(c))
+        self.assertEqual(0, c.size)
+
+
+class HistogramTest(test.TestCase):
+    def test_empty(self):
+        h = histogram.Histogram()
+        self.assertEqual(0, h.count)
+        self.assertIsNone(h.mean)
+        self.assertIsNone(h.percentile(50))
+        self.assertIsNone(h.to_dict()['p99'])
+
+    def test_percentiles(self):
+        h = histogram.Histogram(resolution=0.001)
+        for i in range(1, 1001):
+            h.record(i * 0.001)
+        self.assertEqual(1000, h.count)
+        self.assertEqual(0.001, h.minimum)
+        self.assertEqual(1.0, h.maximum)
+        self.assertAlmostEqual(0.5005, h.mean)
+        for percentile in (50, 90, 99, 99.9):
+            expected = percentile / 100.0
+            value = h.percentile(percentile)
+            self.assertLess(abs(value - expected) / expected, 0.05)
+        self.assertEqual(1.0, h.percentile(100))
+
+    def test_fixed_memory(self):
+        h = histogram.Histogram(highest=10.0)
+        buckets = len(h)
+        for i in range(0, 1000):
+            h.record(i)
+        self.assertEqual(buckets, len(h))
+        self.assertEqual(999, h.maximum)
+        self.assertEqual(999, h.percentile(100))
+
+    def test_clear(self):
+        h = histogram.Histogram()
+        h.record(1.0)
+        h.clear()
+        self.assertEqual(0, h.count)
+        self.assertIsNone(h.maximum)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, histogram.Histogram, resolution=0)
+        self.assertRaises(ValueError, histogram.Histogram, precision=0)
+        self.assertRaises(ValueError, histogram.Histogram,
+                          resolution=1.0, highest=0.1)
+        h = histogram.Histogram()
+        self.assertRaises(ValueError, h.percentile, 101)
+
+
 class TableTest(test.TestCase):
     def test_create_valid_no_rows(self):
         tbl = table.PleasantTable(['Name', 'City', 'State', 'Country'])
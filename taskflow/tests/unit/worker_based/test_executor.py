@@ -95,6 +95,11 @@ class TestWorkerTaskExecutor(test.MockTestCase):
         ]
         self.assertEqual(self.master_mock.mock_calls, master_mock_calls)
 
+    def test_creation_without_validation(self):
+        ex = self.executor(reset_master_mock=False, validate_messages=False)
+        type_handlers = self.proxy_mock.call_args[1]['type_handlers']
+        self.assertEqual({pr.RESPONSE: ex._process_response}, type_handlers)
+
     def test_on_message_response_state_running(self):
         response = pr.Response(pr.RUNNING)
         ex = self.executor()
@@ -148,6 +153,31 @@ class TestWorkerTaskExecutor(test.MockTestCase):
         ]
         self.assertEqual(expected_calls, self.request_inst_mock.mock_calls)
 
+    def test_on_message_response_coalesced_events(self):
+        events = [
+            {'event_type': 'blah', 'details': {}},
+            {'event_type': task_atom.EVENT_UPDATE_PROGRESS,
+             'details': {'progress': 0.5}},
+        ]
+        ex = self.executor()
+        ex._requests_cache[self.task_uuid] = self.request_inst_mock
+        ex._process_response(pr.Response(pr.EVENT, events=events).to_dict(),
+                             self.message_mock)
+        ex._process_response(pr.Response(pr.SUCCESS, result=self.task_result,
+                                         events=events[1:]).to_dict(),
+                             self.message_mock)
+
+        expected_calls = [
+            mock.call.notifier.notify('blah', {}),
+            mock.call.notifier.notify(task_atom.EVENT_UPDATE_PROGRESS,
+                                      {'progress': 0.5}),
+            mock.call.notifier.notify(task_atom.EVENT_UPDATE_PROGRESS,
+                                      {'progress': 0.5}),
+            mock.call.transition_and_log_error(pr.SUCCESS, logger=mock.ANY),
+            mock.call.set_result(result=self.task_result)
+        ]
+        self.assertEqual(expected_calls, self.request_inst_mock.mock_calls)
+
     def test_on_message_response_unknown_state(self):
         response = pr.Response(state='<unknown>')
         ex = self.executor()
@@ -222,6 +252,7 @@ class TestWorkerTaskExecutor(test.MockTestCase):
                               self.task_args, self.timeout),
             mock.call.request.transition_and_log_error(pr.PENDING,
                                                        logger=mock.ANY),
+            mock.call.request.result.add_done_callback(mock.ANY),
             mock.call.proxy.publish(self.request_inst_mock,
                                     self.executor_topic,
                                     reply_to=self.executor_uuid,
@@ -242,6 +273,7 @@ class TestWorkerTaskExecutor(test.MockTestCase):
                               result=self.task_result),
             mock.call.request.transition_and_log_error(pr.PENDING,
                                                        logger=mock.ANY),
+            mock.call.request.result.add_done_callback(mock.ANY),
             mock.call.proxy.publish(self.request_inst_mock,
                                     self.executor_topic,
                                     reply_to=self.executor_uuid,
@@ -270,6 +302,7 @@ class TestWorkerTaskExecutor(test.MockTestCase):
                               self.task_args, self.timeout),
             mock.call.request.transition_and_log_error(pr.PENDING,
                                                        logger=mock.ANY),
+            mock.call.request.result.add_done_callback(mock.ANY),
             mock.call.proxy.publish(self.request_inst_mock,
                                     self.executor_topic,
                                     reply_to=self.executor_uuid,
@@ -42,6 +42,13 @@ class TestProtocolValidation(test.TestCase):
         msg = pr.Notify(topic="bob", tasks=['a', 'b', 'c'])
         pr.Notify.validate(msg.to_dict(), True)
 
+    def test_reply_notify_with_load(self):
+        msg = pr.Notify(topic="bob", tasks=['a'], capacity=4, in_flight=2)
+        pr.Notify.validate(msg.to_dict(), True)
+        msg = pr.Notify(topic="bob", tasks=['a'], capacity=0, in_flight=2)
+        self.assertRaises(excp.InvalidFormat,
+                          pr.Notify.validate, msg.to_dict(), True)
+
     def test_reply_notify_invalid(self):
         msg = {
             'topic': {},
@@ -79,6 +86,18 @@ class TestProtocolValidation(test.TestCase):
         msg = pr.Response(pr.SUCCESS, result=1)
         pr.Response.validate(msg.to_dict())
 
+    def test_response_coalesced(self):
+        events = [{'event_type': 'blah', 'details': {'progress': 0.5}}]
+        msg = pr.Response(pr.EVENT, events=events)
+        pr.Response.validate(msg.to_dict())
+        msg = pr.Response(pr.SUCCESS, result=1, events=events)
+        pr.Response.validate(msg.to_dict())
+
+    def test_response_coalesced_invalid(self):
+        msg = pr.Response(pr.EVENT, events=[{'event_type': 'blah'}])
+        self.assertRaises(excp.InvalidFormat, pr.Response.validate,
+                          msg.to_dict())
+
     def test_response_mixed_invalid(self):
         msg = pr.Response(pr.EVENT,
                           details={'progress': 0.5},
@@ -89,6 +108,14 @@ class TestProtocolValidation(test.TestCase):
         msg = pr.Response('STUFF')
         self.assertRaises(excp.InvalidFormat, pr.Response.validate, msg)
 
+    def test_validators_reused(self):
+        msg = pr.Response(pr.SUCCESS, result=1)
+        pr.Response.validate(msg.to_dict())
+        validator = pr._fetch_validator(pr.Response.SCHEMA)
+        pr.Response.validate(msg.to_dict())
+        self.assertIs(validator, pr._fetch_validator(pr.Response.SCHEMA))
+        self.assertIsNot(validator, pr._fetch_validator(pr.Request.SCHEMA))
+
 
 class TestProtocol(test.TestCase):
 
@@ -24,6 +24,7 @@ from taskflow import test
 from taskflow.test import mock
 from taskflow.tests import utils
 from taskflow.types import failure
+from taskflow.utils import threading_utils
 
 
 class TestServer(test.MockTestCase):
@@ -197,6 +198,74 @@ class TestServer(test.MockTestCase):
         ]
         self.master_mock.assert_has_calls(master_mock_calls)
 
+    def test_on_update_progress_coalesced(self):
+        request = self.make_request(task=utils.ProgressingTask(), arguments={})
+
+        # create server and process request
+        s = self.server(reset_master_mock=True, event_window=60)
+        s._process_request(request, self.message_mock)
+
+        # check calls (the second progress update is sent with the result)
+        master_mock_calls = [
+            mock.call.Response(pr.RUNNING),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid),
+            mock.call.Response(pr.EVENT, details={'progress': 0.0},
+                               event_type=task_atom.EVENT_UPDATE_PROGRESS),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid),
+            mock.call.Response(pr.SUCCESS, result=5, events=[
+                {'event_type': task_atom.EVENT_UPDATE_PROGRESS,
+                 'details': {'progress': 1.0}},
+            ]),
+            mock.call.proxy.publish(self.response_inst_mock, self.reply_to,
+                                    correlation_id=self.task_uuid)
+        ]
+        self.assertEqual(master_mock_calls, self.master_mock.mock_calls)
+
+    def test_event_coalescer(self):
+        sent = []
+        coalescer = server._EventCoalescer(sent.append, 60)
+        coalescer.add('blah', {})
+        for progress in (0.1, 0.2, 0.3):
+            coalescer.add(task_atom.EVENT_UPDATE_PROGRESS,
+                          {'progress': progress})
+        coalescer.add('blah', {'a': 1})
+        coalescer.add(task_atom.EVENT_UPDATE_PROGRESS, {'progress': 0.4})
+        coalescer.flush()
+        coalescer.add(task_atom.EVENT_UPDATE_PROGRESS, {'progress': 0.5})
+        self.assertEqual([
+            [{'event_type': 'blah', 'details': {}}],
+            [{'event_type': task_atom.EVENT_UPDATE_PROGRESS,
+              'details': {'progress': 0.3}},
+             {'event_type': 'blah', 'details': {'a': 1}},
+             {'event_type': task_atom.EVENT_UPDATE_PROGRESS,
+              'details': {'progress': 0.4}}],
+        ], sent)
+        self.assertEqual([{'event_type': task_atom.EVENT_UPDATE_PROGRESS,
+                           'details': {'progress': 0.5}}], coalescer.close())
+        coalescer.add('blah', {})
+        self.assertEqual([], coalescer.close())
+        self.assertEqual(2, len(sent))
+
+    def test_event_coalescer_flushes_later(self):
+        sent = []
+        flushed = threading_utils.Event()
+
+        def send(events):
+            sent.append(events)
+            if len(sent) == 2:
+                flushed.set()
+
+        coalescer = server._EventCoalescer(send, 0.01)
+        self.addCleanup(coalescer.close)
+        coalescer.add('blah', {})
+        coalescer.add('blah', {'a': 1})
+        self.assertTrue(flushed.wait(10))
+        self.assertEqual([[{'event_type': 'blah', 'details': {}}],
+                          [{'event_type': 'blah', 'details': {'a': 1}}]],
+                         sent)
+
     def test_process_request(self):
         # create server and process request
         s = self.server(reset_master_mock=True)
@@ -312,6 +381,23 @@ class TestServer(test.MockTestCase):
         ]
         self.master_mock.assert_has_calls(master_mock_calls)
 
+    def test_process_notify_with_load(self):
+        s = self.server(reset_master_mock=True, report_load=True, capacity=2)
+        fut = mock.MagicMock(name='future')
+        self.executor_mock.submit.return_value = fut
+        s._on_request(self.make_request(), self.message_mock)
+        s._on_request(self.make_request(), self.message_mock)
+        fut.add_done_callback.call_args[0][0](fut)
+        s._process_notify({}, self.message_mock)
+
+        notify = self.proxy_inst_mock.publish.call_args[0][0]
+        self.assertEqual({'topic': self.server_topic,
+                          'tasks': sorted(e.name for e in self.endpoints),
+                          'capacity': 2, 'in_flight': 1},
+                         dict(notify.to_dict(),
+                              tasks=sorted(notify.to_dict()['tasks'])))
+        pr.Notify.validate(notify.to_dict(), True)
+
     def test_start(self):
         self.server(reset_master_mock=True).start()
 
@@ -14,7 +14,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo.utils import reflection
+from oslo_utils import reflection
 
 from taskflow.engines.worker_based import protocol as pr
 from taskflow.engines.worker_based import types as worker_types
@@ -117,3 +117,30 @@ class TestProxyFinder(test.TestCase):
         self.assertEqual(added[-1][0].identity, w.identity)
         w = finder.get_worker_for_task(utils.DummyTask)
         self.assertIn(w.identity, [w_a[0].identity for w_a in added[0:2]])
+
+    def test_least_loaded_worker(self):
+        finder = worker_types.ProxyWorkerFinder('me', mock.MagicMock(), [])
+        w, _emit = finder._add('dummy-topic', [utils.DummyTask])
+        w2, _emit = finder._add('dummy-topic-2', [utils.DummyTask])
+        futures = [mock.MagicMock() for _i in range(0, 2)]
+        for fut in futures:
+            finder.track_request(w, fut)
+        for _i in range(0, 10):
+            w3 = finder.get_worker_for_task(utils.DummyTask)
+            self.assertEqual(w2.identity, w3.identity)
+        for fut in futures:
+            fut.add_done_callback.call_args[0][0](fut)
+        self.assertEqual({}, finder._outstanding)
+
+    def test_reported_worker_load(self):
+        finder = worker_types.ProxyWorkerFinder('me', mock.MagicMock(), [])
+        task_name = reflection.get_class_name(utils.DummyTask)
+        message = mock.MagicMock()
+        finder._process_response({'topic': 'dummy-topic',
+                                  'tasks': [task_name],
+                                  'capacity': 1, 'in_flight': 1}, message)
+        finder._process_response({'topic': 'dummy-topic-2',
+                                  'tasks': [task_name],
+                                  'capacity': 4, 'in_flight': 2}, message)
+        w = finder.get_worker_for_task(task_name)
+        self.assertEqual('dummy-topic-2', w.topic)
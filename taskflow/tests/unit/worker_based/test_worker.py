@@ -34,7 +34,7 @@ class TestWorker(test.MockTestCase):
         self.exchange = 'test-exchange'
         self.topic = 'test-topic'
         self.threads_count = 5
-        self.endpoint_count = 21
+        self.endpoint_count = 22
 
         # patch classes
         self.executor_mock, self.executor_inst_mock = self.patchClass(
@@ -68,7 +68,11 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             validate_messages=True,
+                             event_window=None,
+                             report_load=False,
+                             capacity=self.threads_count)
         ]
         self.assertEqual(self.master_mock.mock_calls, master_mock_calls)
 
@@ -90,7 +94,11 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             validate_messages=True,
+                             event_window=None,
+                             report_load=False,
+                             capacity=10)
         ]
         self.assertEqual(self.master_mock.mock_calls, master_mock_calls)
 
@@ -103,7 +111,11 @@ class TestWorker(test.MockTestCase):
                              url=self.broker_url,
                              transport_options=mock.ANY,
                              transport=mock.ANY,
-                             retry_options=mock.ANY)
+                             retry_options=mock.ANY,
+                             validate_messages=True,
+                             event_window=None,
+                             report_load=False,
+                             capacity=None)
         ]
         self.assertEqual(self.master_mock.mock_calls, master_mock_calls)
 
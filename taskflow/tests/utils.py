@@ -16,6 +16,7 @@
 
 import contextlib
 import string
+import time
 
 import six
 
@@ -188,6 +189,13 @@ class FailingTask(ProgressingTask):
         raise RuntimeError('Woot!')
 
 
+class HangingTask(ProgressingTask):
+    def execute(self, **kwargs):
+        self.update_progress(0.0)
+        time.sleep(5)
+        return 5
+
+
 class TaskWithFailure(task.Task):
 
     def execute(self, **kwargs):
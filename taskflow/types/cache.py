@@ -14,6 +14,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import threading
 
 from oslo_utils import reflection
@@ -83,3 +84,178 @@ class ExpiringCache(object):
                     on_expired_callback(k, v)
                 else:
                     on_expired_callback(v)
+
+
+class CacheStatistics(object):
+    """Holds *immutable* information about a caches usage."""
+
+    __slots__ = ['_hits', '_misses', '_evictions', '_size', '_count']
+
+    __repr_format = ("hits=%(hits)s, misses=%(misses)s, "
+                     "evictions=%(evictions)s, size=%(size)s, "
+                     "count=%(count)s")
+
+    def __init__(self, hits=0, misses=0, evictions=0, size=0, count=0):
+        self._hits = hits
+        self._misses = misses
+        self._evictions = evictions
+        self._size = size
+        self._count = count
+
+    @property
+    def hits(self):
+        """How many lookups found a (valid) value."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """How many lookups did not find a (valid) value."""
+        return self._misses
+
+    @property
+    def evictions(self):
+        """How many values were dropped to stay under the maximum size."""
+        return self._evictions
+
+    @property
+    def size(self):
+        """Total size of the values that were cached."""
+        return self._size
+
+    @property
+    def count(self):
+        """How many values were cached."""
+        return self._count
+
+    @property
+    def hit_ratio(self):
+        """The ratio of lookups that found a (valid) value.
+
+        :raises: ZeroDivisionError when no lookups have occurred.
+        """
+        return float(self._hits) / (self._hits + self._misses)
+
+    def __repr__(self):
+        r = reflection.get_class_name(self, fully_qualified=False)
+        r += "("
+        r += self.__repr_format % ({
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'size': self._size,
+            'count': self._count,
+        })
+        r += ")"
+        return r
+
+
+class LRUCache(object):
+    """Represents a thread-safe size bounded least recently used cache.
+
+    Each value is stored with a size (the units are up to the user, but
+    typically this is how many bytes the value takes up) and when the total
+    size of all values goes over the maximum size the least recently used
+    values are evicted until it no longer does (a value that on its own is
+    bigger than the maximum size is never stored).
+
+    Each value may also be stored with a validator; a lookup that provides a
+    validator that does not match (compare equal to) the one stored with
+    the value treats that value as stale, drops it and considers the lookup
+    a miss.
+
+    When provided, ``on_evict`` is called (with the key and value) for each
+    value that is evicted to make room for others (it is called while the
+    cache is locked, so it should not use the cache).
+    """
+
+    def __init__(self, max_size, on_evict=None):
+        if max_size < 0:
+            raise ValueError("Maximum size must be greater than or equal"
+                             " to zero and not '%s'" % max_size)
+        self._max_size = max_size
+        self._on_evict = on_evict
+        self._data = collections.OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        """Maximum total size of the values that will be cached."""
+        return self._max_size
+
+    @property
+    def size(self):
+        """Total size of the values that are currently cached."""
+        return self._size
+
+    @property
+    def statistics(self):
+        """:class:`.CacheStatistics` about this caches usage."""
+        with self._lock:
+            return CacheStatistics(hits=self._hits, misses=self._misses,
+                                   evictions=self._evictions,
+                                   size=self._size, count=len(self._data))
+
+    def __len__(self):
+        """Returns how many items are in this cache."""
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None, validator=None):
+        """Retrieve a (valid) value from the cache (or return the default)."""
+        with self._lock:
+            try:
+                (value, size, value_validator) = self._data.pop(key)
+            except KeyError:
+                self._misses += 1
+                return default
+            if validator is not None and validator != value_validator:
+                self._size -= size
+                self._misses += 1
+                return default
+            # Re-insert it so that it becomes the most recently used.
+            self._data[key] = (value, size, value_validator)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, size, validator=None):
+        """Set a value (of the given size) in the cache."""
+        with self._lock:
+            try:
+                (_value, old_size, _validator) = self._data.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._size -= old_size
+            if size > self._max_size:
+                return
+            self._data[key] = (value, size, validator)
+            self._size += size
+            while self._size > self._max_size:
+                (old_key, (old_value, old_size,
+                           _validator)) = self._data.popitem(last=False)
+                self._size -= old_size
+                self._evictions += 1
+                if self._on_evict is not None:
+                    self._on_evict(old_key, old_value)
+
+    def pop(self, key, default=None):
+        """Removes a value from the cache (returns default if not found)."""
+        with self._lock:
+            try:
+                (value, size, _validator) = self._data.pop(key)
+            except KeyError:
+                return default
+            self._size -= size
+            return value
+
+    def clear(self):
+        """Removes all keys & values from the cache."""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
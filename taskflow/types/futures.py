@@ -15,13 +15,18 @@
 #    under the License.
 
 import functools
+import multiprocessing
+import sys
 import threading
+import weakref
 
 from concurrent import futures as _futures
 from concurrent.futures import process as _process
 from concurrent.futures import thread as _thread
 from oslo_utils import importutils
 from oslo_utils import reflection
+import six
+from six.moves import queue as compat_queue
 
 greenpatcher = importutils.try_import('eventlet.patcher')
 greenpool = importutils.try_import('eventlet.greenpool')
@@ -30,12 +35,25 @@ greenthreading = importutils.try_import('eventlet.green.threading')
 
 from taskflow.types import timing
 from taskflow.utils import eventlet_utils as eu
+from taskflow.utils import misc
 from taskflow.utils import threading_utils as tu
 
+# Find a monotonic providing time (or fallback to using time.time()
+# which isn't *always* accurate but will suffice).
+_now = misc.find_monotonic(allow_time_time=True)
 
 # NOTE(harlowja): Allows for simpler access to this type...
 Future = _futures.Future
 
+# Process pool executors of the standard library only accept a
+# multiprocessing context and an initializer starting at this version.
+_POOL_OPTIONS_MIN_VERSION = (3, 7)
+
+# Retiring a process pool starts (and later terminates) its worker processes
+# using internals of the standard library process pool executor, which are
+# only known to work (in the form that is used) starting at this version.
+_RETIRE_MIN_VERSION = (3, 9)
+
 
 class _Gatherer(object):
     def __init__(self, submit_func,
@@ -123,17 +141,247 @@ class ThreadPoolExecutor(_thread.ThreadPoolExecutor):
         return self._gatherer.submit(fn, *args, **kwargs)
 
 
+class AutoScalingThreadPoolExecutor(_futures.Executor):
+    """Executor that uses a thread pool (that grows and shrinks) to execute.
+
+    Instead of starting a fixed number of threads this executor starts
+    threads as work backs up (never having more than ``max_workers`` or
+    less than ``min_workers`` threads) and stops threads that have been
+    idle for longer than ``idle_timeout`` seconds.
+
+    A thread is started when work is submitted and the amount of work that
+    is waiting is more than the number of idle threads and (on average,
+    recently) work has been waiting at least ``wait_ratio`` times as long
+    as it took to run (meaning that its latency is dominated by waiting for
+    a thread instead of by running); this makes pools of threads that run
+    short work stay small and pools of threads that run work that mostly
+    waits (on I/O for example) grow.
+
+    It gathers statistics about the submissions executed (and the scaling
+    decisions made) for post-analysis...
+    """
+
+    #: How much the newest wait (and run) time moves the averages.
+    SMOOTHING = 0.2
+
+    def __init__(self, max_workers=None, min_workers=1, idle_timeout=5.0,
+                 wait_ratio=1.0):
+        if max_workers is None:
+            max_workers = tu.get_optimal_thread_count() * 5
+        if max_workers <= 0:
+            raise ValueError("Max workers must be greater than zero")
+        if min_workers < 0 or min_workers > max_workers:
+            raise ValueError("Min workers must be greater than or equal to"
+                             " zero and less than or equal to max workers")
+        if idle_timeout <= 0:
+            raise ValueError("Idle timeout must be greater than zero")
+        if wait_ratio < 0:
+            raise ValueError("Wait ratio must be greater than or equal to"
+                             " zero")
+        self._max_workers = max_workers
+        self._min_workers = min_workers
+        self._idle_timeout = idle_timeout
+        self._wait_ratio = wait_ratio
+        self._work_queue = compat_queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._idle = 0
+        self._abandoned = 0
+        self._shutdown = False
+        self._average_wait = None
+        self._average_run = None
+        self._peak_workers = 0
+        self._grown = 0
+        self._shrunk = 0
+        self._gatherer = _Gatherer(self._submit)
+        with self._lock:
+            while len(self._workers) < self._min_workers:
+                self._grow()
+
+    @property
+    def alive(self):
+        """Accessor to determine if the executor is alive/active."""
+        return not self._shutdown
+
+    @property
+    def workers(self):
+        """How many threads are currently running (or waiting for work)."""
+        return len(self._workers)
+
+    @property
+    def statistics(self):
+        """:class:`.AutoScalingExecutorStatistics` about the executor."""
+        stats = self._gatherer.statistics
+        with self._lock:
+            return AutoScalingExecutorStatistics(
+                failures=stats.failures, executed=stats.executed,
+                runtime=stats.runtime, cancelled=stats.cancelled,
+                workers=len(self._workers), peak_workers=self._peak_workers,
+                grown=self._grown, shrunk=self._shrunk)
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit some work to be executed (and gather statistics)."""
+        return self._gatherer.submit(fn, *args, **kwargs)
+
+    def _submit(self, fn, *args, **kwargs):
+        f = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('Can not schedule new futures'
+                                   ' after being shutdown')
+            self._work_queue.put((_now(),
+                                  _WorkItem(f, fn, args, kwargs)))
+            if self._should_grow():
+                self._grow()
+        return f
+
+    def abandon(self, future):
+        """Stops counting the thread running a future against the pool size.
+
+        Running threads can not be interrupted, so instead (until the future
+        finishes) the thread running it is not counted as a worker when
+        deciding whether more threads can be started (and one is started
+        right away if work is waiting). Futures that have not started are
+        cancelled instead.
+        """
+        if future.cancel() or future.done():
+            return
+        with self._lock:
+            self._abandoned += 1
+            if (not self._shutdown and
+                    self._work_queue.qsize() > self._idle):
+                self._grow()
+        future.add_done_callback(self._on_abandoned_done)
+
+    def _on_abandoned_done(self, future):
+        with self._lock:
+            self._abandoned -= 1
+
+    def _should_grow(self):
+        if len(self._workers) - self._abandoned >= self._max_workers:
+            return False
+        if not self._workers or len(self._workers) < self._min_workers:
+            # Always have at least one thread (to run the submitted work).
+            return True
+        if self._work_queue.qsize() <= self._idle:
+            return False
+        if self._average_wait is None or self._average_run is None:
+            return True
+        return self._average_wait >= self._average_run * self._wait_ratio
+
+    def _grow(self):
+        worker = tu.daemon_thread(self._work, weakref.ref(self))
+        self._workers.add(worker)
+        self._idle += 1
+        self._grown += 1
+        self._peak_workers = max(self._peak_workers, len(self._workers))
+        worker.start()
+
+    def _record(self, waited, ran):
+        smoothing = self.SMOOTHING
+        if self._average_wait is None:
+            self._average_wait = waited
+            self._average_run = ran
+        else:
+            self._average_wait += smoothing * (waited - self._average_wait)
+            self._average_run += smoothing * (ran - self._average_run)
+
+    @staticmethod
+    def _work(executor_ref):
+        worker = threading.current_thread()
+        while True:
+            executor = executor_ref()
+            if executor is None:
+                return
+            work_queue = executor._work_queue
+            idle_timeout = executor._idle_timeout
+            # Avoid keeping the executor alive while waiting...
+            del executor
+            try:
+                item = work_queue.get(timeout=idle_timeout)
+            except compat_queue.Empty:
+                item = None
+            executor = executor_ref()
+            if executor is None:
+                return
+            if item is None:
+                with executor._lock:
+                    # NOTE: work may have been submitted (while this
+                    # thread was counted as idle) just before it got here.
+                    if executor._shutdown or (
+                            len(executor._workers) > executor._min_workers and
+                            not executor._work_queue.qsize()):
+                        executor._workers.discard(worker)
+                        executor._idle -= 1
+                        if not executor._shutdown:
+                            executor._shrunk += 1
+                        return
+                continue
+            (submitted_at, work) = item
+            with executor._lock:
+                executor._idle -= 1
+            started_at = _now()
+            try:
+                work.run()
+            finally:
+                ran = _now() - started_at
+                with executor._lock:
+                    executor._idle += 1
+                    executor._record(max(0.0, started_at - submitted_at),
+                                     max(0.0, ran))
+                del work, item
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+            for _worker in workers:
+                # Each of these wakes up (and stops) one thread (after all
+                # work submitted before it has been ran).
+                self._work_queue.put(None)
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+
+def _preload_modules(module_names):
+    for module_name in module_names:
+        importutils.import_module(module_name)
+
+
 class ProcessPoolExecutor(_process.ProcessPoolExecutor):
     """Executor that uses a process pool to execute calls asynchronously.
 
     It gathers statistics about the submissions executed for post-analysis...
 
+    The worker processes can be warmed up by providing the names of modules
+    to ``preload``; each worker process imports them when it starts (and
+    when the ``forkserver`` ``start_method`` is used the fork server imports
+    them once, so that the worker processes it forks start with them already
+    imported). Both of these require python 3.7 (or newer), a
+    ``ValueError`` is raised when either is provided on older versions.
+
     See: https://docs.python.org/dev/library/concurrent.futures.html
     """
-    def __init__(self, max_workers=None):
+    def __init__(self, max_workers=None, preload=None, start_method=None):
+        self.validate_options(preload=preload, start_method=start_method)
         if max_workers is None:
             max_workers = tu.get_optimal_thread_count()
-        super(ProcessPoolExecutor, self).__init__(max_workers=max_workers)
+        kwargs = {}
+        if preload:
+            if isinstance(preload, six.string_types):
+                preload = [preload]
+            preload = list(preload)
+            kwargs['initializer'] = _preload_modules
+            kwargs['initargs'] = (preload,)
+        if start_method is not None:
+            context = multiprocessing.get_context(start_method)
+            if start_method == 'forkserver' and preload:
+                context.set_forkserver_preload(preload)
+            kwargs['mp_context'] = context
+        super(ProcessPoolExecutor, self).__init__(max_workers=max_workers,
+                                                  **kwargs)
         if self._max_workers <= 0:
             raise ValueError("Max workers must be greater than zero")
         self._gatherer = _Gatherer(
@@ -141,11 +389,35 @@ class ProcessPoolExecutor(_process.ProcessPoolExecutor):
             # the parent submit, bound to this instance (which is what we
             # really want to use anyway).
             super(ProcessPoolExecutor, self).submit)
+        # The work that is not done yet (and the work of that which was
+        # abandoned, which is not waited on when retiring).
+        self._outstanding = set()
+        self._abandoned = set()
+        self._retiring = False
+        self._terminated = False
+        self._retire_lock = threading.Lock()
 
     @property
     def alive(self):
         """Accessor to determine if the executor is alive/active."""
-        return not self._shutdown_thread
+        # A pool becomes broken (and unusable) when a worker process dies
+        # abruptly (newer versions of python track this).
+        return (not self._shutdown_thread and not self._retiring and
+                not getattr(self, '_broken', False))
+
+    @staticmethod
+    def validate_options(preload=None, start_method=None):
+        """Raises a ``ValueError`` if the options can not be used here."""
+        if ((preload or start_method is not None) and
+                sys.version_info < _POOL_OPTIONS_MIN_VERSION):
+            raise ValueError("The preload and start method options of"
+                             " process pools require python %s.%s or newer"
+                             % _POOL_OPTIONS_MIN_VERSION)
+
+    @property
+    def retirable(self):
+        """Whether this pool can be retired (see :meth:`.retire`)."""
+        return sys.version_info >= _RETIRE_MIN_VERSION
 
     @property
     def statistics(self):
@@ -154,7 +426,61 @@ class ProcessPoolExecutor(_process.ProcessPoolExecutor):
 
     def submit(self, fn, *args, **kwargs):
         """Submit some work to be executed (and gather statistics)."""
-        return self._gatherer.submit(fn, *args, **kwargs)
+        fut = self._gatherer.submit(fn, *args, **kwargs)
+        with self._retire_lock:
+            self._outstanding.add(fut)
+        fut.add_done_callback(self._on_done)
+        return fut
+
+    def retire(self, future):
+        """Retires this pool since the given (running) work was abandoned.
+
+        The pool stops being alive (so that new work can be submitted to
+        another pool instead), starts another worker process (so that the
+        work queued behind the abandoned work is not stuck behind it) and
+        once all the work submitted to it (other than the abandoned work) is
+        done its worker processes are terminated (which stops the abandoned
+        work, even when it is blocked somewhere it can not be interrupted).
+
+        This requires python 3.9 (or newer), a ``NotImplementedError`` is
+        raised on older versions (see :attr:`.retirable`).
+        """
+        if not self.retirable:
+            raise NotImplementedError("Retiring process pools requires"
+                                      " python %s.%s or newer"
+                                      % _RETIRE_MIN_VERSION)
+        with self._retire_lock:
+            self._retiring = True
+            self._abandoned.add(future)
+        self._add_worker()
+        self._maybe_terminate()
+
+    def _add_worker(self):
+        with self._shutdown_lock:
+            if self._shutdown_thread or self._broken:
+                return
+            self._max_workers += 1
+            self._spawn_process()
+
+    def _on_done(self, future):
+        with self._retire_lock:
+            self._outstanding.discard(future)
+            self._abandoned.discard(future)
+        self._maybe_terminate()
+
+    def _maybe_terminate(self):
+        with self._retire_lock:
+            if not self._retiring or self._terminated:
+                return
+            if self._outstanding.difference(self._abandoned):
+                return
+            self._terminated = True
+        # Shutting down drops these (so there is nothing left to terminate).
+        processes = self._processes or {}
+        for process in list(processes.values()):
+            if process.is_alive():
+                process.terminate()
+        self.shutdown(wait=False)
 
 
 class _WorkItem(object):
@@ -387,3 +713,48 @@ class ExecutorStatistics(object):
         })
         r += ")"
         return r
+
+
+class AutoScalingExecutorStatistics(ExecutorStatistics):
+    """Holds *immutable* information about a autoscaling executor.
+
+    Besides the information about its executions this also has the
+    information about the scaling decisions it has made.
+    """
+
+    __slots__ = ['_workers', '_peak_workers', '_grown', '_shrunk']
+
+    def __init__(self, workers=0, peak_workers=0, grown=0, shrunk=0,
+                 **kwargs):
+        super(AutoScalingExecutorStatistics, self).__init__(**kwargs)
+        self._workers = workers
+        self._peak_workers = peak_workers
+        self._grown = grown
+        self._shrunk = shrunk
+
+    @property
+    def workers(self):
+        """How many threads were running (or idle)."""
+        return self._workers
+
+    @property
+    def peak_workers(self):
+        """The most threads that were running (or idle) at the same time."""
+        return self._peak_workers
+
+    @property
+    def grown(self):
+        """How many times a thread was started (to run backed up work)."""
+        return self._grown
+
+    @property
+    def shrunk(self):
+        """How many times a thread was stopped (since it was idle)."""
+        return self._shrunk
+
+    def __repr__(self):
+        r = super(AutoScalingExecutorStatistics, self).__repr__()[:-1]
+        r += (", workers=%s, peak_workers=%s, grown=%s, shrunk=%s)"
+              % (self._workers, self._peak_workers, self._grown,
+                 self._shrunk))
+        return r
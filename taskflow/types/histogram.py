@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2014 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from oslo_utils import reflection
+import six
+
+
+class Histogram(object):
+    """Fixed memory (log-linear bucketed) histogram of durations.
+
+    Inspired by `HdrHistogram`_ this records durations (in seconds) into
+    buckets whose widths grow with the magnitude of the values they hold,
+    so that the (relative) error of reported values stays bounded (the
+    ``precision`` is the number of bits of each value that are retained,
+    five bits being around a 3% error) while the memory used stays fixed no
+    matter how many values are recorded.
+
+    Values lower than ``resolution`` seconds are recorded as zero and values
+    higher than ``highest`` seconds are recorded in the last bucket (the
+    minimum, maximum and sum of recorded values are always exact).
+
+    .. _HdrHistogram: http://hdrhistogram.org/
+    """
+
+    #: Percentiles that :py:meth:`.to_dict` includes.
+    PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+    def __init__(self, resolution=1e-6, highest=3600.0, precision=5):
+        if resolution <= 0:
+            raise ValueError("Resolution must be greater than zero")
+        if highest < resolution:
+            raise ValueError("Highest value must be greater than or equal"
+                             " to the resolution")
+        if precision < 1:
+            raise ValueError("Precision must be greater than zero")
+        self._resolution = float(resolution)
+        self._precision = precision
+        self._lock = threading.Lock()
+        units = int(highest / self._resolution)
+        self._counts = [0] * (self._index(units) + 1)
+        self._clear()
+
+    def _clear(self):
+        self._counts[:] = [0] * len(self._counts)
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+
+    def _index(self, units):
+        # The first 2^precision buckets hold single values, after that each
+        # power of two range is split into 2^(precision - 1) buckets.
+        shift = units.bit_length() - self._precision
+        if shift <= 0:
+            return units
+        half = 1 << (self._precision - 1)
+        return (1 << self._precision) + (shift - 1) * half + (
+            (units >> shift) - half)
+
+    def _bounds(self, index):
+        # The (inclusive) lowest and highest units a bucket holds.
+        if index < (1 << self._precision):
+            return (index, index)
+        half = 1 << (self._precision - 1)
+        (shift, offset) = divmod(index - (1 << self._precision), half)
+        shift += 1
+        lowest = (half + offset) << shift
+        return (lowest, lowest + (1 << shift) - 1)
+
+    def record(self, value):
+        """Records a duration (in seconds)."""
+        units = int(value / self._resolution) if value > 0 else 0
+        index = min(self._index(units), len(self._counts) - 1)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def clear(self):
+        """Forgets all recorded values."""
+        with self._lock:
+            self._clear()
+
+    @property
+    def count(self):
+        """How many values were recorded."""
+        return self._count
+
+    @property
+    def total(self):
+        """The sum of all recorded values."""
+        return self._total
+
+    @property
+    def minimum(self):
+        """The lowest value recorded (or ``None`` if none were)."""
+        return self._min
+
+    @property
+    def maximum(self):
+        """The highest value recorded (or ``None`` if none were)."""
+        return self._max
+
+    @property
+    def mean(self):
+        """The mean of the recorded values (or ``None`` if none were)."""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._total / self._count
+
+    def percentile(self, percentile):
+        """Returns the value below which the given percent of values are.
+
+        The returned value is the middle of the bucket that holds the value
+        (clamped to the recorded minimum and maximum) or ``None`` if no
+        values were recorded.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError("Percentile must be between 0 and 100")
+        with self._lock:
+            return self._percentile(percentile)
+
+    def _percentile(self, percentile):
+        if not self._count:
+            return None
+        wanted = max(1, int(round(self._count * percentile / 100.0)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= wanted:
+                if index == len(self._counts) - 1:
+                    # Holds all the values higher than it can hold...
+                    return self._max
+                (lowest, highest) = self._bounds(index)
+                value = (lowest + highest) / 2.0 * self._resolution
+                return min(max(value, self._min), self._max)
+        return self._max
+
+    def to_dict(self):
+        """Returns a dictionary snapshot of the histograms summary."""
+        with self._lock:
+            data = {
+                'count': self._count,
+                'total': self._total,
+                'minimum': self._min,
+                'maximum': self._max,
+                'mean': None,
+            }
+            if self._count:
+                data['mean'] = self._total / self._count
+            for percentile in self.PERCENTILES:
+                key = 'p%s' % ('%g' % percentile).replace('.', '')
+                data[key] = self._percentile(percentile)
+            return data
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __repr__(self):
+        r = reflection.get_class_name(self, fully_qualified=False)
+        r += "("
+        r += ", ".join("%s=%s" % (k, v)
+                       for k, v in sorted(six.iteritems(self.to_dict())))
+        r += ")"
+        return r
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import importutils
+
+asyncio = importutils.try_import('asyncio')
+
+ASYNCIO_AVAILABLE = bool(asyncio)
+
+
+def check_for_asyncio(exc=None):
+    """Check if asyncio is available and if not raise a runtime error.
+
+    :param exc: exception to raise instead of raising a runtime error
+    :type exc: exception
+    """
+    if not ASYNCIO_AVAILABLE:
+        if exc is None:
+            raise RuntimeError('Asyncio is not currently available')
+        else:
+            raise exc
+
+
+def make_completed_future(loop, functor, *args, **kwargs):
+    """Calls the functor and returns an asyncio future with its outcome.
+
+    The future is already done when returned; it either has the result
+    of the call or the exception the call raised.
+    """
+    future = asyncio.Future(loop=loop)
+    try:
+        result = functor(*args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+    return future
+
+
+def iscoroutinefunction(func):
+    """Checks if a function (or method) is a coroutine function."""
+    if not ASYNCIO_AVAILABLE:
+        return False
+    return asyncio.iscoroutinefunction(func)
+
+
+def ensure_future(coro_or_future, loop=None):
+    """Wraps a coroutine in a task (scheduling it to run on the loop)."""
+    try:
+        ensure = asyncio.ensure_future
+    except AttributeError:
+        # Python 3.4.3 (and older) call this ``async`` instead.
+        ensure = getattr(asyncio, 'async')
+    return ensure(coro_or_future, loop=loop)
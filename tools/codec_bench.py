@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares the size & throughput of the persisted atom detail codecs."""
+
+import optparse
+import os
+import random
+import sys
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from oslo_utils import uuidutils
+
+from taskflow.persistence import base
+from taskflow.persistence import codec
+from taskflow.persistence import logbook
+from taskflow.types import timing as tt
+
+
+def make_payloads(size):
+    rnd = random.Random(0)
+    payloads = {
+        'small': {'status': 'ok', 'count': 3},
+        'integers': [rnd.randint(0, 2 ** 31) for _i in range(0, size)],
+        'floats': [rnd.random() for _i in range(0, size)],
+        'strings': ['item-%s' % rnd.randint(0, 100) for _i in range(0, size)],
+        'nested': [{'id': i, 'name': 'n-%s' % i, 'weight': i * 0.5,
+                    'tags': ['a', 'b']} for i in range(0, size // 4)],
+    }
+    return payloads
+
+
+def make_atom_data(results):
+    ad = logbook.TaskDetail('bench', uuid=uuidutils.generate_uuid())
+    ad.results = results
+    return base._format_atom(ad)
+
+
+def make_codecs():
+    codecs = [('json', codec.Codec())]
+    compressions = ['zlib']
+    if codec.lz4_frame is not None:
+        compressions.append('lz4')
+    serializers = ['json']
+    if codec.msgpack is not None:
+        serializers.append('msgpack')
+    for s in serializers:
+        if s != 'json':
+            codecs.append((s, codec.Codec(serializer=s)))
+        for c in compressions:
+            codecs.append(("%s+%s" % (s, c),
+                           codec.Codec(serializer=s, compression=c)))
+    return codecs
+
+
+def timed(func, arg, iterations):
+    watch = tt.StopWatch()
+    watch.start()
+    for _i in range(0, iterations):
+        func(arg)
+    watch.stop()
+    return watch.elapsed()
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-s", "--size", dest="size", type="int",
+                      help="number of items in each generated result"
+                           " (default: %default)",
+                      default=10000)
+    parser.add_option("-i", "--iterations", dest="iterations", type="int",
+                      help="number of encodes/decodes to time"
+                           " (default: %default)",
+                      default=100)
+    (options, args) = parser.parse_args()
+
+    codecs = make_codecs()
+    print("%-10s %-14s %12s %8s %12s %12s" % ('payload', 'codec', 'bytes',
+                                              'ratio', 'encode/s',
+                                              'decode/s'))
+    for (name, results) in sorted(make_payloads(options.size).items()):
+        data = make_atom_data(results)
+        baseline_size = None
+        for (codec_name, c) in codecs:
+            blob = c.encode(data)
+            if baseline_size is None:
+                baseline_size = len(blob)
+            encode_secs = timed(c.encode, data, options.iterations)
+            decode_secs = timed(c.decode, blob, options.iterations)
+            print("%-10s %-14s %12s %8.2f %12.1f %12.1f"
+                  % (name, codec_name, len(blob),
+                     float(len(blob)) / baseline_size,
+                     options.iterations / max(encode_secs, 1e-9),
+                     options.iterations / max(decode_secs, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures the speed & memory usage of the logbook model objects."""
+
+import gc
+import optparse
+import os
+import sys
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from oslo_utils import importutils
+from oslo_utils import uuidutils
+
+from taskflow.persistence import logbook
+from taskflow import states
+from taskflow.types import timing as tt
+
+tracemalloc = importutils.try_import('tracemalloc')
+
+
+def make_flow_detail(size):
+    flow_detail = logbook.FlowDetail('bench', uuidutils.generate_uuid())
+    for i in range(0, size):
+        if i % 10 == 0:
+            atom_detail = logbook.RetryDetail('retry-%s' % i,
+                                              uuidutils.generate_uuid())
+            atom_detail.put(states.SUCCESS, i)
+        else:
+            atom_detail = logbook.TaskDetail('task-%s' % i,
+                                             uuidutils.generate_uuid())
+            atom_detail.put(states.SUCCESS, {'index': i})
+        atom_detail.version = (1, 0)
+        flow_detail.add(atom_detail)
+    return flow_detail
+
+
+def measure_memory(size):
+    if tracemalloc is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        uuids = [uuidutils.generate_uuid() for _i in range(0, size)]
+        before = tracemalloc.get_traced_memory()[0]
+        flow_detail = logbook.FlowDetail('bench', uuidutils.generate_uuid())
+        for uuid in uuids:
+            flow_detail.add(logbook.TaskDetail('task', uuid))
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before
+
+
+def timed(func, iterations):
+    watch = tt.StopWatch()
+    watch.start()
+    for _i in range(0, iterations):
+        func()
+    watch.stop()
+    return watch.elapsed() / iterations
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-s", "--size", dest="size", type="int",
+                      help="number of atom details in the flow detail"
+                           " (default: %default)",
+                      default=100000)
+    parser.add_option("-i", "--iterations", dest="iterations", type="int",
+                      help="number of times each operation is timed"
+                           " (default: %default)",
+                      default=3)
+    (options, args) = parser.parse_args()
+
+    flow_detail = make_flow_detail(options.size)
+    atom_details = list(flow_detail)
+    dicts = [(type(ad), ad.to_dict()) for ad in atom_details]
+    others = [ad.copy() for ad in atom_details]
+
+    def _to_dict():
+        for ad in atom_details:
+            ad.to_dict()
+
+    def _from_dict():
+        for (cls, data) in dicts:
+            cls.from_dict(data)
+
+    def _copy():
+        for ad in atom_details:
+            ad.copy()
+
+    def _merge():
+        for (ad, other) in zip(atom_details, others):
+            ad.merge(other)
+
+    def _flow_copy():
+        flow_detail.copy()
+
+    print("%-18s %12s %14s" % ('operation', 'seconds', 'atoms/s'))
+    for (name, func) in [('to_dict', _to_dict), ('from_dict', _from_dict),
+                         ('copy', _copy), ('merge', _merge)]:
+        secs = timed(func, options.iterations)
+        print("%-18s %12.4f %14.1f" % (name, secs,
+                                       options.size / max(secs, 1e-9)))
+    secs = timed(_flow_copy, options.iterations)
+    print("%-18s %12.4f %14.1f" % ('flow_detail.copy', secs,
+                                   options.size / max(secs, 1e-9)))
+    used = measure_memory(options.size)
+    if used is not None:
+        print("%-18s %12s %14.1f" % ('bytes/atom', used,
+                                     float(used) / options.size))
+
+
+if __name__ == '__main__':
+    main()
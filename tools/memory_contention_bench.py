@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures memory backend throughput with many engines running at once."""
+
+import contextlib
+import optparse
+import os
+import sys
+import threading
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from oslo_utils import uuidutils
+
+from taskflow import engines
+from taskflow.patterns import linear_flow as lf
+from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import logbook
+from taskflow import task
+from taskflow.types import timing as tt
+from taskflow.utils import persistence_utils as p_utils
+
+
+class NoopTask(task.Task):
+    def execute(self):
+        return 1
+
+
+def make_flow(size):
+    flow = lf.Flow('bench')
+    for i in range(0, size):
+        flow.add(NoopTask('task-%s' % i))
+    return flow
+
+
+def run_engines(backend, engine_count, flow_size, repeat):
+    def _run():
+        for _i in range(0, repeat):
+            flow = make_flow(flow_size)
+            book = logbook.LogBook('bench-%s' % uuidutils.generate_uuid())
+            flow_detail = p_utils.create_flow_detail(flow, book=book,
+                                                     backend=backend)
+            engines.run(flow, flow_detail=flow_detail, book=book,
+                        backend=backend)
+
+    threads = [threading.Thread(target=_run)
+               for _i in range(0, engine_count)]
+    watch = tt.StopWatch()
+    watch.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    watch.stop()
+    return watch.elapsed()
+
+
+def run_updates(backend, engine_count, flow_size, repeat):
+    def _make():
+        book = logbook.LogBook('bench-%s' % uuidutils.generate_uuid())
+        flow_detail = logbook.FlowDetail('bench', uuidutils.generate_uuid())
+        for i in range(0, flow_size):
+            flow_detail.add(logbook.TaskDetail('task-%s' % i,
+                                               uuidutils.generate_uuid()))
+        book.add(flow_detail)
+        with contextlib.closing(backend.get_connection()) as conn:
+            conn.save_logbook(book)
+        return flow_detail
+
+    def _run(flow_detail):
+        with contextlib.closing(backend.get_connection()) as conn:
+            for i in range(0, repeat):
+                for atom_detail in flow_detail:
+                    atom_detail.results = i
+                    conn.update_atom_details(atom_detail)
+
+    threads = [threading.Thread(target=_run, args=(_make(),))
+               for _i in range(0, engine_count)]
+    watch = tt.StopWatch()
+    watch.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    watch.stop()
+    return watch.elapsed()
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-e", "--engines", dest="engines", type="int",
+                      help="maximum number of concurrent engines"
+                           " (default: %default)",
+                      default=16)
+    parser.add_option("-s", "--size", dest="size", type="int",
+                      help="number of tasks in each flow"
+                           " (default: %default)",
+                      default=20)
+    parser.add_option("-r", "--repeat", dest="repeat", type="int",
+                      help="number of times each engine runs its flow"
+                           " (default: %default)",
+                      default=10)
+    (options, args) = parser.parse_args()
+
+    print("%-8s %-8s %10s %14s" % ('mode', 'engines', 'seconds',
+                                   'atoms/s'))
+    engine_count = 1
+    while engine_count <= options.engines:
+        for (mode, runner) in [('engines', run_engines),
+                               ('updates', run_updates)]:
+            with contextlib.closing(impl_memory.MemoryBackend()) as backend:
+                elapsed = runner(backend, engine_count, options.size,
+                                 options.repeat)
+            atoms = engine_count * options.size * options.repeat
+            print("%-8s %-8s %10.3f %14.1f" % (mode, engine_count, elapsed,
+                                               atoms / max(elapsed, 1e-9)))
+        engine_count *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmarks the persistence backends (without any external services).
+
+Each backend is driven through the same workload for each requested atom
+count and number of concurrent writers: the logbooks are saved, each flow
+detail and then each atom detail is updated, each logbook is read back and
+then all logbooks are listed (a few times). The throughput and latency
+percentiles of each operation are reported (as a table or as json lines
+when ``--json`` is given, which is handy for tracking regressions).
+"""
+
+import contextlib
+import json
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import timeit
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from oslo_utils import importutils
+from oslo_utils import uuidutils
+
+from taskflow.persistence.backends import impl_dir
+from taskflow.persistence.backends import impl_log
+from taskflow.persistence.backends import impl_memory
+from taskflow.persistence import logbook
+from taskflow import states
+
+impl_sqlalchemy = importutils.try_import(
+    'taskflow.persistence.backends.impl_sqlalchemy')
+impl_zookeeper = importutils.try_import(
+    'taskflow.persistence.backends.impl_zookeeper')
+fake_client = importutils.try_import('zake.fake_client')
+
+OPERATIONS = ('save_logbook', 'update_flow_details', 'update_atom_details',
+              'get_logbook', 'get_logbooks')
+
+
+def make_memory(tmp_dir):
+    return impl_memory.MemoryBackend()
+
+
+def make_dir(tmp_dir):
+    return impl_dir.DirBackend({'path': tmp_dir})
+
+
+def make_log(tmp_dir):
+    return impl_log.LogBackend({'path': tmp_dir})
+
+
+def make_sqlite(tmp_dir):
+    return impl_sqlalchemy.SQLAlchemyBackend({
+        'connection': 'sqlite:///%s' % os.path.join(tmp_dir, 'bench.db'),
+    })
+
+
+def make_sqlite_fast(tmp_dir):
+    return impl_sqlalchemy.SQLAlchemyBackend({
+        'connection': 'sqlite:///%s' % os.path.join(tmp_dir, 'bench.db'),
+        'sqlite_fast': True,
+    })
+
+
+def make_zookeeper(tmp_dir):
+    client = fake_client.FakeClient()
+    client.start()
+    return impl_zookeeper.ZkBackend({'path': '/taskflow'}, client=client)
+
+
+def available_backends():
+    backends = [('memory', make_memory), ('dir', make_dir), ('log', make_log)]
+    if impl_sqlalchemy is not None:
+        backends.append(('sqlite', make_sqlite))
+        backends.append(('sqlite_fast', make_sqlite_fast))
+    if impl_zookeeper is not None and fake_client is not None:
+        backends.append(('zookeeper', make_zookeeper))
+    return backends
+
+
+def make_books(atom_count, flows_per_book, atoms_per_flow):
+    books = []
+    atoms_left = atom_count
+    while atoms_left > 0:
+        book = logbook.LogBook('bench', uuid=uuidutils.generate_uuid())
+        for _i in range(0, flows_per_book):
+            if atoms_left <= 0:
+                break
+            flow_detail = logbook.FlowDetail('bench',
+                                             uuidutils.generate_uuid())
+            for j in range(0, min(atoms_per_flow, atoms_left)):
+                atom_detail = logbook.TaskDetail('task-%s' % j,
+                                                 uuidutils.generate_uuid())
+                atom_detail.results = {'index': j, 'data': 'x' * 64}
+                flow_detail.add(atom_detail)
+            atoms_left -= len(flow_detail)
+            book.add(flow_detail)
+        books.append(book)
+    return books
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = int(round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    ordered = sorted(latencies)
+    return {
+        'count': len(ordered),
+        'seconds': elapsed,
+        'ops_per_second': len(ordered) / max(elapsed, 1e-9),
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p90_ms': percentile(ordered, 0.90) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'max_ms': percentile(ordered, 1.0) * 1000,
+    }
+
+
+def run_concurrently(backend, writers, items, functor):
+    """Splits the items among writer threads that each call the functor."""
+    latencies = []
+    lock = threading.Lock()
+
+    def _run(my_items):
+        my_latencies = []
+        with contextlib.closing(backend.get_connection()) as conn:
+            for item in my_items:
+                start = timeit.default_timer()
+                functor(conn, item)
+                my_latencies.append(timeit.default_timer() - start)
+        with lock:
+            latencies.extend(my_latencies)
+
+    threads = [threading.Thread(target=_run, args=(items[i::writers],))
+               for i in range(0, writers)]
+    start = timeit.default_timer()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(latencies, timeit.default_timer() - start)
+
+
+def run_workload(backend, books, writers, list_repeat):
+    flow_details = [fd for book in books for fd in book]
+    atom_details = [ad for fd in flow_details for ad in fd]
+
+    def _update_flow_details(conn, fd):
+        fd.state = states.RUNNING
+        conn.update_flow_details(fd)
+
+    def _update_atom_details(conn, ad):
+        ad.state = states.SUCCESS
+        conn.update_atom_details(ad)
+
+    def _get_logbooks(conn, _i):
+        for _book in conn.get_logbooks():
+            pass
+
+    results = {}
+    results['save_logbook'] = run_concurrently(
+        backend, writers, books,
+        lambda conn, book: conn.save_logbook(book))
+    results['update_flow_details'] = run_concurrently(
+        backend, writers, flow_details, _update_flow_details)
+    results['update_atom_details'] = run_concurrently(
+        backend, writers, atom_details, _update_atom_details)
+    results['get_logbook'] = run_concurrently(
+        backend, writers, books,
+        lambda conn, book: conn.get_logbook(book.uuid))
+    results['get_logbooks'] = run_concurrently(
+        backend, writers, list(range(0, list_repeat)), _get_logbooks)
+    return results
+
+
+def as_int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    backends = available_backends()
+    parser = optparse.OptionParser()
+    parser.add_option("-b", "--backends", dest="backends",
+                      help="comma separated backends to run (default: %s)"
+                           % ",".join(name for (name, _f) in backends),
+                      default=",".join(name for (name, _f) in backends))
+    parser.add_option("-a", "--atoms", dest="atoms",
+                      help="comma separated total atom counts"
+                           " (default: %default)",
+                      default="1000,10000,100000")
+    parser.add_option("-w", "--writers", dest="writers",
+                      help="comma separated concurrent writer counts"
+                           " (default: %default)",
+                      default="1,4,16")
+    parser.add_option("--atoms-per-flow", dest="atoms_per_flow",
+                      type="int", help="atoms in each flow detail"
+                                       " (default: %default)",
+                      default=10)
+    parser.add_option("--flows-per-book", dest="flows_per_book",
+                      type="int", help="flow details in each logbook"
+                                       " (default: %default)",
+                      default=10)
+    parser.add_option("--list-repeat", dest="list_repeat", type="int",
+                      help="number of times all logbooks are listed"
+                           " (default: %default)",
+                      default=3)
+    parser.add_option("--json", dest="json", action="store_true",
+                      help="emit one json document per result line",
+                      default=False)
+    (options, args) = parser.parse_args()
+
+    factories = dict(backends)
+    selected = [b.strip() for b in options.backends.split(",") if b.strip()]
+    for name in selected:
+        if name not in factories:
+            parser.error("Unknown (or unavailable) backend '%s'" % name)
+    if not options.json:
+        print("%-12s %8s %7s %-20s %10s %10s %9s %9s %9s"
+              % ('backend', 'atoms', 'writers', 'operation', 'ops/s',
+                 'seconds', 'p50 ms', 'p99 ms', 'max ms'))
+    for atom_count in as_int_list(options.atoms):
+        for writers in as_int_list(options.writers):
+            for name in selected:
+                books = make_books(atom_count, options.flows_per_book,
+                                   options.atoms_per_flow)
+                tmp_dir = tempfile.mkdtemp()
+                try:
+                    backend = factories[name](tmp_dir)
+                    with contextlib.closing(backend):
+                        with contextlib.closing(
+                                backend.get_connection()) as conn:
+                            conn.upgrade()
+                        results = run_workload(backend, books, writers,
+                                               options.list_repeat)
+                finally:
+                    shutil.rmtree(tmp_dir)
+                for operation in OPERATIONS:
+                    result = results[operation]
+                    if options.json:
+                        result = dict(result, backend=name, atoms=atom_count,
+                                      writers=writers, operation=operation)
+                        print(json.dumps(result, sort_keys=True))
+                    else:
+                        print("%-12s %8s %7s %-20s %10.1f %10.3f %9.2f %9.2f"
+                              " %9.2f" % (name, atom_count, writers,
+                                          operation,
+                                          result['ops_per_second'],
+                                          result['seconds'],
+                                          result['p50_ms'],
+                                          result['p99_ms'],
+                                          result['max_ms']))
+                    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
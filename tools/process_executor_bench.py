@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures the overhead of running tasks using the process executor."""
+
+import optparse
+import os
+import sys
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from taskflow import engines
+from taskflow.patterns import unordered_flow as uf
+from taskflow import task
+from taskflow.types import timing as tt
+
+
+class ProgressTask(task.Task):
+    def execute(self, updates):
+        for i in range(0, updates):
+            self.update_progress(float(i) / updates)
+
+
+class NoopTask(task.Task):
+    def execute(self):
+        pass
+
+
+class PayloadTask(task.Task):
+    def execute(self, payload):
+        return payload
+
+
+def run(flow, workers, store=None, **options):
+    engine = engines.load(flow, engine='parallel', executor='processes',
+                          max_workers=workers, store=store, **options)
+    seen = []
+    for atom in flow:
+        atom.notifier.register(task.EVENT_UPDATE_PROGRESS,
+                               lambda *args, **kwargs: seen.append(1))
+    watch = tt.StopWatch()
+    watch.start()
+    engine.run()
+    watch.stop()
+    return (watch.elapsed(), len(seen))
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-t", "--tasks", dest="tasks", type="int",
+                      help="number of tasks in each flow"
+                           " (default: %default)",
+                      default=200)
+    parser.add_option("-u", "--updates", dest="updates", type="int",
+                      help="progress updates each progress task sends"
+                           " (default: %default)",
+                      default=100)
+    parser.add_option("-w", "--workers", dest="workers", type="int",
+                      help="number of worker processes"
+                           " (default: %default)",
+                      default=4)
+    parser.add_option("-p", "--payload", dest="payload", type="int",
+                      help="size (in bytes) of the payload each payload task"
+                           " receives and returns (default: %default)",
+                      default=4 * 1024 * 1024)
+    (options, args) = parser.parse_args()
+
+    print("%-10s %10s %14s %14s" % ('workload', 'seconds', 'tasks/s',
+                                    'events/s'))
+    flow = uf.Flow('noop')
+    for i in range(0, options.tasks):
+        flow.add(NoopTask('noop-%s' % i))
+    (elapsed, _events) = run(flow, options.workers)
+    print("%-10s %10.3f %14.1f %14s" % ('noop', elapsed,
+                                        options.tasks / elapsed, '-'))
+    flow = uf.Flow('progress')
+    for i in range(0, options.tasks):
+        flow.add(ProgressTask('progress-%s' % i))
+    (elapsed, events) = run(flow, options.workers,
+                            store={'updates': options.updates})
+    print("%-10s %10.3f %14.1f %14.1f" % ('progress', elapsed,
+                                          options.tasks / elapsed,
+                                          events / elapsed))
+    for (name, threshold) in [('payload', None), ('payload-sm', 1024)]:
+        flow = uf.Flow(name)
+        for i in range(0, options.tasks):
+            flow.add(PayloadTask('%s-%s' % (name, i)))
+        (elapsed, _events) = run(flow, options.workers,
+                                 store={'payload': b'x' * options.payload},
+                                 shared_memory_threshold=threshold)
+        print("%-10s %10.3f %14.1f %14s" % (name, elapsed,
+                                            options.tasks / elapsed, '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares sqlite write throughput with and without ``sqlite_fast``."""
+
+import contextlib
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+from oslo_utils import uuidutils
+
+from taskflow import exceptions as exc
+from taskflow.persistence.backends import impl_sqlalchemy
+from taskflow.persistence import logbook
+from taskflow.types import timing as tt
+
+
+def make_flow_detail(backend, size):
+    book = logbook.LogBook('bench-%s' % uuidutils.generate_uuid())
+    flow_detail = logbook.FlowDetail('bench', uuidutils.generate_uuid())
+    for i in range(0, size):
+        flow_detail.add(logbook.TaskDetail('task-%s' % i,
+                                           uuidutils.generate_uuid()))
+    book.add(flow_detail)
+    with contextlib.closing(backend.get_connection()) as conn:
+        conn.save_logbook(book)
+    return flow_detail
+
+
+def run_updates(backend, thread_count, flow_size, repeat):
+    failures = []
+
+    def _run(flow_detail):
+        with contextlib.closing(backend.get_connection()) as conn:
+            for i in range(0, repeat):
+                for atom_detail in flow_detail:
+                    atom_detail.results = i
+                    try:
+                        conn.update_atom_details(atom_detail)
+                    except exc.StorageFailure:
+                        failures.append(atom_detail.uuid)
+
+    threads = [threading.Thread(target=_run,
+                                args=(make_flow_detail(backend, flow_size),))
+               for _i in range(0, thread_count)]
+    watch = tt.StopWatch()
+    watch.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    watch.stop()
+    return (watch.elapsed(), len(failures))
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-t", "--threads", dest="threads", type="int",
+                      help="maximum number of concurrent writers"
+                           " (default: %default)",
+                      default=16)
+    parser.add_option("-s", "--size", dest="size", type="int",
+                      help="number of atoms each writer updates"
+                           " (default: %default)",
+                      default=10)
+    parser.add_option("-r", "--repeat", dest="repeat", type="int",
+                      help="number of times each atom is updated"
+                           " (default: %default)",
+                      default=20)
+    (options, args) = parser.parse_args()
+
+    print("%-8s %-8s %10s %14s %8s" % ('mode', 'threads', 'seconds',
+                                       'writes/s', 'failed'))
+    thread_count = 1
+    while thread_count <= options.threads:
+        for mode in ('default', 'fast'):
+            tmp_dir = tempfile.mkdtemp()
+            try:
+                conf = {
+                    'connection': 'sqlite:///%s' % os.path.join(tmp_dir,
+                                                                'bench.db'),
+                    'sqlite_fast': mode == 'fast',
+                }
+                backend = impl_sqlalchemy.SQLAlchemyBackend(conf)
+                with contextlib.closing(backend):
+                    with contextlib.closing(backend.get_connection()) as conn:
+                        conn.upgrade()
+                    elapsed, failed = run_updates(backend, thread_count,
+                                                  options.size,
+                                                  options.repeat)
+            finally:
+                shutil.rmtree(tmp_dir)
+            writes = thread_count * options.size * options.repeat
+            print("%-8s %-8s %10.3f %14.1f %8s"
+                  % (mode, thread_count, elapsed,
+                     writes / max(elapsed, 1e-9), failed))
+        thread_count *= 2
+
+
+if __name__ == '__main__':
+    main()
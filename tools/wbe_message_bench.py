@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+#    Copyright (C) 2015 Yahoo! Inc. All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures how fast worker-based engine messages are dispatched."""
+
+import optparse
+import os
+import sys
+
+top_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                       os.pardir))
+sys.path.insert(0, top_dir)
+
+import jsonschema
+
+from taskflow.engines.worker_based import dispatcher
+from taskflow.engines.worker_based import protocol as pr
+from taskflow import task
+from taskflow.types import timing as tt
+
+
+class NoopTask(task.Task):
+    def execute(self):
+        pass
+
+
+class Message(object):
+    """Just enough of a kombu message for the dispatcher to process it."""
+
+    def __init__(self, message_type):
+        self.properties = {'type': message_type}
+        self.delivery_tag = 1
+        self.acknowledged = False
+
+    def ack_log_error(self, logger, errors):
+        self.acknowledged = True
+
+    def reject_log_error(self, logger, errors):
+        pass
+
+
+def uncached_validator(schema):
+    # How messages were validated before validators were reused.
+    def validate(data):
+        jsonschema.validate(data, schema, types=pr._SCHEMA_TYPES)
+    return validate
+
+
+def run(message_type, data, validator, messages):
+    seen = []
+
+    def on_message(data, message):
+        seen.append(1)
+
+    if validator is not None:
+        handler = [on_message, validator]
+    else:
+        handler = on_message
+    d = dispatcher.TypeDispatcher(type_handlers={message_type: handler})
+    watch = tt.StopWatch()
+    watch.start()
+    for _i in range(0, messages):
+        d.on_message(data, Message(message_type))
+    watch.stop()
+    assert len(seen) == messages
+    return watch.elapsed()
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-m", "--messages", dest="messages", type="int",
+                      help="number of messages of each kind to dispatch"
+                           " (default: %default)",
+                      default=5000)
+    (options, args) = parser.parse_args()
+
+    kinds = [
+        ('progress', pr.RESPONSE, pr.Response.SCHEMA,
+         pr.Response(pr.EVENT, event_type=task.EVENT_UPDATE_PROGRESS,
+                     details={'progress': 0.5}).to_dict()),
+        ('result', pr.RESPONSE, pr.Response.SCHEMA,
+         pr.Response(pr.SUCCESS, result=[1, 2, 3]).to_dict()),
+        ('request', pr.REQUEST, pr.Request.SCHEMA,
+         pr.Request(NoopTask(), 'a', pr.EXECUTE, {'x': 1},
+                    pr.REQUEST_TIMEOUT).to_dict()),
+    ]
+    print("%-10s %-12s %10s %14s" % ('message', 'validation', 'seconds',
+                                     'messages/s'))
+    for (name, message_type, schema, data) in kinds:
+        modes = [
+            ('uncached', uncached_validator(schema)),
+            ('cached', pr._fetch_validator(schema).validate),
+            ('none', None),
+        ]
+        for (mode, validator) in modes:
+            elapsed = run(message_type, data, validator, options.messages)
+            print("%-10s %-12s %10.3f %14.1f" % (name, mode, elapsed,
+                                                 options.messages / elapsed))
+
+
+if __name__ == '__main__':
+    main()